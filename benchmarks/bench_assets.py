@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark des images de l'interface : PNG 512 px d'origine contre atlas par densité
+Mesure la mémoire de texture des avatars et du logo, et le temps de création
+des bulles de chat avec chacune des deux sources
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from kivy.base import EventLoop
+from kivy.cache import Cache
+from kivy.core.image import Image as CoreImage
+
+from src.ui import chat_view
+from src.ui.assets import FALLBACK, image_source
+
+def texture_memory(sources) -> dict:
+    """Textures distinctes chargées (une région d'atlas compte pour sa texture parente)"""
+    textures = {}
+    for source in sources:
+        texture = CoreImage(source).texture
+        owner = getattr(texture, 'owner', None) or texture
+        textures[owner.id] = owner.width * owner.height * 4
+    return {'textures': len(textures), 'bytes': sum(textures.values())}
+
+def bubble_creation(user_source, bot_source, count) -> float:
+    """Durée moyenne (ms) de création d'une bulle, caches d'images vidés au départ"""
+    Cache.remove('kv.image')
+    Cache.remove('kv.texture')
+    Cache.remove('kv.atlas')
+    chat_view.USER_AVATAR = user_source
+    chat_view.BOT_AVATAR = bot_source
+
+    start = time.perf_counter()
+    for i in range(count):
+        (chat_view.UserBubble if i % 2 else chat_view.BotBubble)()
+    return (time.perf_counter() - start) / count * 1000
+
+def run(count):
+    EventLoop.ensure_window()
+    variants = {
+        'png': {name: FALLBACK[name] for name in ('user', 'wolf', 'logo')},
+        'atlas': {name: image_source(name) for name in ('user', 'wolf', 'logo')},
+    }
+    if not variants['atlas']['user'].startswith('atlas://'):
+        raise SystemExit("Atlas absent : lancer d'abord create_assets.py")
+
+    results = {}
+    for name, sources in variants.items():
+        results[name] = {
+            'texture_memory': texture_memory(sources.values()),
+            'bubble_ms': bubble_creation(sources['user'], sources['wolf'], count),
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--bubbles', type=int, default=200, help="Bulles créées par variante")
+    parser.add_argument('--json', help="Fichier où enregistrer les résultats")
+    args = parser.parse_args()
+
+    results = run(args.bubbles)
+    print(f"{'source':>7} {'textures':>9} {'mémoire (Ko)':>13} {'bulle (ms)':>11}")
+    for name, result in results.items():
+        memory = result['texture_memory']
+        print(f"{name:>7} {memory['textures']:>9} {memory['bytes'] / 1024:>13.0f} {result['bubble_ms']:>11.3f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'assets': results}, f, indent=2, ensure_ascii=False)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark AsyncGeminiClient : N requêtes concurrentes contre le serveur simulé
+Avec une latence serveur fixe, N requêtes doivent prendre ~ le temps d'une seule
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('GEMINI_API_KEY', 'mock-key')
+
+from benchmarks.mock_gemini_server import MockGeminiServer
+from src.async_gemini_client import AsyncGeminiClient
+
+async def run(base_url, concurrency):
+    async with AsyncGeminiClient(api_key="mock-key", base_url=base_url) as client:
+        start = time.perf_counter()
+        await client.generate_text("Échauffement")
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        replies = await asyncio.gather(*(
+            client.generate_text(f"Question {i}") for i in range(concurrency)
+        ))
+        together = time.perf_counter() - start
+
+    errors = sum(1 for reply in replies if reply.startswith("❌"))
+    return single, together, errors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--latency', type=float, default=0.3)
+    args = parser.parse_args()
+
+    server = MockGeminiServer(latency=args.latency).start()
+    try:
+        single, together, errors = asyncio.run(run(server.base_url, args.concurrency))
+    finally:
+        server.stop()
+
+    print(f"1 requête           : {single * 1000:.0f} ms")
+    print(f"{args.concurrency} requêtes concurrentes : {together * 1000:.0f} ms ({together / single:.2f}x)")
+    print(f"Connexions TCP      : {len(server.connections)} pour {server.request_count} requêtes")
+    print(f"Erreurs             : {errors}")
+
+if __name__ == '__main__':
+    main()
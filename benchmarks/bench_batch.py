@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark du traitement par lots contre le serveur simulé
+Compare une boucle séquentielle à run_batch (concurrence + limite de débit),
+puis vérifie la reprise depuis un point de contrôle
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_gemini_server import MockGeminiServer
+from src import gemini_rest
+from src.batch_runner import run_batch
+from src.http_transport import HttpTransport
+
+def make_generate(transport, base_url):
+    """Même chemin REST que GeminiClient._generate_via_rest_api, sans le SDK"""
+    url = gemini_rest.generate_url(base_url)
+
+    def generate(prompt):
+        response = transport.post(url, headers=gemini_rest.headers("mock-key"),
+                                  json=gemini_rest.prompt_payload(prompt))
+        if response.status_code != 200:
+            return f"❌ Erreur: API Error {response.status_code}"
+        return gemini_rest.extract_text(response.json())
+    return generate
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--prompts', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rpm', type=float, default=None, help="limite requêtes/minute")
+    parser.add_argument('--latency', type=float, default=0.2)
+    args = parser.parse_args()
+
+    prompts = [f"Question {i}" for i in range(args.prompts)]
+    server = MockGeminiServer(latency=args.latency).start()
+    transport = HttpTransport(pool_size=args.concurrency)
+    generate = make_generate(transport, server.base_url)
+
+    try:
+        start = time.perf_counter()
+        for prompt in prompts:
+            generate(prompt)
+        serial = time.perf_counter() - start
+
+        checkpoint_path = os.path.join(tempfile.mkdtemp(), 'batch.jsonl')
+        start = time.perf_counter()
+        first_result = None
+        ordered = [None] * len(prompts)
+        for result in run_batch(generate, prompts, args.concurrency, args.rpm, checkpoint_path):
+            if first_result is None:
+                first_result = time.perf_counter() - start
+            ordered[result.index] = result.text
+        batch = time.perf_counter() - start
+
+        # Reprise : tout est déjà dans le point de contrôle
+        requests_before = server.request_count
+        start = time.perf_counter()
+        resumed = list(run_batch(generate, prompts, args.concurrency, args.rpm, checkpoint_path))
+        resume = time.perf_counter() - start
+        replayed = server.request_count - requests_before
+    finally:
+        transport.close()
+        server.stop()
+
+    in_order = all(text.endswith(prompt) for text, prompt in zip(ordered, prompts))
+    print(f"Séquentiel          : {serial:.2f} s ({args.prompts / serial:.1f} req/s)")
+    print(f"Lot (x{args.concurrency})           : {batch:.2f} s ({args.prompts / batch:.1f} req/s, {serial / batch:.1f}x)")
+    print(f"Premier résultat    : {first_result * 1000:.0f} ms")
+    print(f"Ordre préservé      : {'oui' if in_order else 'NON'}")
+    print(f"Reprise             : {resume * 1000:.0f} ms, {len(resumed)} résultats, {replayed} requêtes rejouées")
+
+if __name__ == '__main__':
+    main()
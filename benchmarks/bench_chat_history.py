@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'historique de chat : conversation synthétique de N messages
+Mesure le nombre de bulles instanciées, la mémoire Python, le temps de frame
+et le coût d'un add_message jusqu'à la frame affichée
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kivy.base import EventLoop
+from kivy.core.window import Window
+
+from src.metrics import metrics
+from src.ui.chat_view import ChatBubble, ChatView
+from src.ui.update_queue import UIUpdateQueue
+
+SAMPLE_TEXTS = [
+    "Bonjour Okit, peux-tu m'aider ?",
+    "Bien sûr ! Voici une réponse un peu plus longue pour remplir la bulle "
+    "et forcer un retour à la ligne sur un écran de téléphone.",
+    "Merci 🐺",
+]
+
+def frame_time(view, frames=30):
+    """Durée moyenne d'une frame (ms) en défilant dans l'historique"""
+    start = time.perf_counter()
+    for i in range(frames):
+        view.scroll_y = 1 - (i % 10) / 10
+        EventLoop.idle()
+    return (time.perf_counter() - start) / frames * 1000
+
+def add_message_cost(view, count=200):
+    """Durée d'add_message seul, et d'add_message jusqu'à la frame affichée"""
+    metrics.reset()
+    add_seconds = []
+    for i in range(count):
+        start = time.perf_counter()
+        view.add_message(f"#{i} {SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]}", i % 2 == 0, i)
+        add_seconds.append(time.perf_counter() - start)
+        view.scroll_to_bottom()
+        EventLoop.idle()
+
+    add_seconds.sort()
+    to_frame = metrics.histogram('ui_add_message_to_frame_seconds').snapshot()
+    return {
+        'add_message_p50_ms': add_seconds[len(add_seconds) // 2] * 1000,
+        'add_message_p99_ms': add_seconds[int(len(add_seconds) * 0.99)] * 1000,
+        'to_frame_p50_ms': (to_frame.get('p50') or 0) * 1000,
+        'to_frame_p99_ms': (to_frame.get('p99') or 0) * 1000,
+    }
+
+def burst_frame_time(view, per_frame=(1, 10, 50), frames=20):
+    """Durée de frame (ms) quand per_frame messages/fragments arrivent entre deux frames"""
+    updates = UIUpdateQueue(view)
+    results = {}
+    for count in per_frame:
+        bubble = updates.add_message('', False)
+        EventLoop.idle()
+        start = time.perf_counter()
+        for frame in range(frames):
+            for i in range(count):
+                if i % 2:
+                    updates.append_text(bubble, f"fragment {i} ")
+                else:
+                    updates.add_message(f"Message système #{frame}.{i}", False)
+            EventLoop.idle()
+        results[f"{count}_per_frame_ms"] = (time.perf_counter() - start) / frames * 1000
+    return results
+
+def run(sizes):
+    EventLoop.ensure_window()
+    view = ChatView(size_hint=(1, 1))
+    Window.add_widget(view)
+
+    results = []
+    for size in sizes:
+        tracemalloc.start()
+        view.load_messages(
+            (f"#{i} {SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]}", i % 2 == 0, i)
+            for i in range(size)
+        )
+        EventLoop.idle()
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        bubbles = sum(1 for w in view.walk(restrict=True) if isinstance(w, ChatBubble))
+        results.append((size, bubbles, memory / 1024, frame_time(view)))
+
+    view.load_messages([])
+    EventLoop.idle()
+    cost = add_message_cost(view)
+    view.load_messages([])
+    EventLoop.idle()
+    cost['burst'] = burst_frame_time(view)
+
+    Window.remove_widget(view)
+    return results, cost
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--json', help="Fichier où enregistrer les résultats")
+    args = parser.parse_args()
+
+    results, cost = run(args.sizes)
+    print(f"{'messages':>9} {'bulles':>7} {'mémoire (Ko)':>13} {'frame (ms)':>11}")
+    for size, bubbles, memory_kb, frame_ms in results:
+        print(f"{size:>9} {bubbles:>7} {memory_kb:>13.0f} {frame_ms:>11.2f}")
+    bursts = ', '.join(f"{key.split('_')[0]}/frame {value:.2f} ms" for key, value in cost['burst'].items())
+    print(f"Rafales (file par frame) : {bursts}")
+    print(f"add_message : p50 {cost['add_message_p50_ms']:.2f} ms, "
+          f"jusqu'à la frame : p50 {cost['to_frame_p50_ms']:.2f} ms / p99 {cost['to_frame_p99_ms']:.2f} ms")
+
+    if args.json:
+        report = {
+            'history': [
+                {'messages': size, 'bubbles': bubbles, 'memory_kb': memory_kb, 'frame_ms': frame_ms}
+                for size, bubbles, memory_kb, frame_ms in results
+            ],
+            'add_message': cost,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+if __name__ == '__main__':
+    main()
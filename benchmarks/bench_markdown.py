@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark du rendu Markdown des réponses en streaming
+Réponses synthétiques de plusieurs Ko reçues par fragments : coût d'analyse
+et de balisage (sans Kivy), puis coût de mesure des blocs (Kivy), en
+incrémental avec cache de blocs comparé à un re-rendu complet à chaque fragment
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ui.markdown import CODE, IncrementalMarkdown, MarkdownRenderer, block_markup, parse_markdown
+
+FONT_SIZE = 14
+TEXT_WIDTH = 300
+
+SECTIONS = [
+    "## Étape {n}\n\n",
+    "Voici une explication **détaillée** avec du `code en ligne` et un peu d'*emphase*, "
+    "assez longue pour être repliée sur plusieurs lignes d'un écran de téléphone.\n\n",
+    "- premier point à retenir\n- second point, avec **gras**\n- troisième point\n\n",
+    "```python\ndef etape_{n}(valeurs):\n    total = sum(v * v for v in valeurs if v is not None)  # ligne longue\n"
+    "    return total / max(len(valeurs), 1)\n```\n\n",
+    "> Remarque : cette citation résume l'étape {n}.\n\n",
+]
+
+def synthetic_answer(size: int) -> str:
+    """Réponse Markdown d'environ `size` octets"""
+    parts = []
+    length = 0
+    n = 0
+    while length < size:
+        part = SECTIONS[n % len(SECTIONS)].format(n=n // len(SECTIONS) + 1)
+        parts.append(part)
+        length += len(part.encode('utf-8'))
+        n += 1
+    return ''.join(parts)
+
+def chunks(text: str, chunk_size: int):
+    return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+def _summary(seconds) -> dict:
+    seconds = sorted(seconds)
+    return {
+        'total_ms': sum(seconds) * 1000,
+        'chunk_p50_ms': seconds[len(seconds) // 2] * 1000,
+        'chunk_p99_ms': seconds[min(int(len(seconds) * 0.99), len(seconds) - 1)] * 1000,
+    }
+
+def parse_cost(text: str, chunk_size: int) -> dict:
+    """Analyse + balisage par fragment : incrémental (cache) contre re-analyse complète"""
+    parser = IncrementalMarkdown()
+    renderer = MarkdownRenderer(FONT_SIZE)
+    incremental = []
+    for chunk in chunks(text, chunk_size):
+        start = time.perf_counter()
+        parser.feed(chunk)
+        blocks = parser.blocks
+        open_from = len(parser.finished)
+        for i, block in enumerate(blocks):
+            renderer.render(block, i < open_from)
+        incremental.append(time.perf_counter() - start)
+
+    full = []
+    received = ''
+    for chunk in chunks(text, chunk_size):
+        received += chunk
+        start = time.perf_counter()
+        for block in parse_markdown(received):
+            block_markup(block, FONT_SIZE)
+        full.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    blocks = parse_markdown(text)
+    for block in blocks:
+        block_markup(block, FONT_SIZE)
+    once = time.perf_counter() - start
+
+    return {
+        'blocks': len(blocks),
+        'single_pass_ms': once * 1000,
+        'incremental': _summary(incremental),
+        'full_reparse': _summary(full),
+        'render_cache_hits': renderer.hits,
+    }
+
+def layout_cost(text: str, chunk_size: int) -> dict:
+    """Mesure des blocs par fragment (CoreLabel) : cache par bloc contre texte entier"""
+    from src.ui.text_layout import TextMeasurer
+
+    renderer = MarkdownRenderer(FONT_SIZE)
+    text_measurer = TextMeasurer(FONT_SIZE, markup=True)
+    code_measurer = TextMeasurer(FONT_SIZE, font_name='RobotoMono-Regular', markup=True)
+
+    parser = IncrementalMarkdown()
+    incremental = []
+    for chunk in chunks(text, chunk_size):
+        start = time.perf_counter()
+        parser.feed(chunk)
+        open_from = len(parser.finished)
+        for i, block in enumerate(parser.blocks):
+            store = i < open_from
+            markup = renderer.render(block, store)
+            if block.kind == CODE:
+                code_measurer.measure(markup or ' ', None, store)
+            else:
+                text_measurer.measure(markup, TEXT_WIDTH, store)
+        incremental.append(time.perf_counter() - start)
+
+    # Référence : un seul Label pour tout le texte, re-mis en page à chaque fragment
+    plain_measurer = TextMeasurer(FONT_SIZE)
+    full = []
+    received = ''
+    for chunk in chunks(text, chunk_size):
+        received += chunk
+        start = time.perf_counter()
+        plain_measurer.measure(received, TEXT_WIDTH, store=False)
+        full.append(time.perf_counter() - start)
+
+    return {
+        'incremental': _summary(incremental),
+        'single_label': _summary(full),
+        'measure_cache_hits': text_measurer.hits + code_measurer.hits,
+    }
+
+def run(sizes, chunk_size, with_layout):
+    results = []
+    for size in sizes:
+        text = synthetic_answer(size)
+        result = {'bytes': len(text.encode('utf-8')), 'parse': parse_cost(text, chunk_size)}
+        if with_layout:
+            try:
+                result['layout'] = layout_cost(text, chunk_size)
+            except ImportError as e:
+                result['layout'] = {'error': f"Kivy indisponible: {e}"}
+        results.append(result)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[2000, 8000, 32000])
+    parser.add_argument('--chunk-size', type=int, default=40, help="Caractères par fragment de streaming")
+    parser.add_argument('--no-layout', action='store_true', help="Analyse seule, sans mesure Kivy")
+    parser.add_argument('--json', help="Fichier où enregistrer les résultats")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.chunk_size, not args.no_layout)
+    print(f"{'octets':>7} {'blocs':>6} {'incr. total':>12} {'incr. p99':>10} {'complet total':>14} {'complet p99':>12}")
+    for result in results:
+        parse = result['parse']
+        print(f"{result['bytes']:>7} {parse['blocks']:>6} "
+              f"{parse['incremental']['total_ms']:>10.1f}ms {parse['incremental']['chunk_p99_ms']:>8.3f}ms "
+              f"{parse['full_reparse']['total_ms']:>12.1f}ms {parse['full_reparse']['chunk_p99_ms']:>10.3f}ms")
+        layout = result.get('layout')
+        if layout and 'error' not in layout:
+            print(f"{'':>7} mise en page : incrémental p99 {layout['incremental']['chunk_p99_ms']:.2f} ms, "
+                  f"label unique p99 {layout['single_label']['chunk_p99_ms']:.2f} ms")
+        elif layout:
+            print(f"{'':>7} mise en page : {layout['error']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'markdown': results}, f, indent=2, ensure_ascii=False)
+
+if __name__ == '__main__':
+    main()
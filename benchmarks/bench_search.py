@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la recherche dans l'historique : N messages synthétiques en français
+Mesure le coût d'ajout avec index FTS5, la latence des recherches (mot exact,
+préfixe, sans accents, plusieurs mots) et la compare à un balayage LIKE
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.conversation_store import ConversationStore
+
+VOCABULARY = (
+    "bonjour merci réponse question été hiver programme fonction données réseau écran "
+    "mémoire fenêtre requête erreur résultat paramètre modèle vidéo musique cuisine recette "
+    "voyage météo français anglais traduction élève école université santé médecin pharmacie "
+    "thé café pâtes crème gâteau forêt montagne rivière océan île château église théâtre "
+    "cinéma série épisode saison joueur équipe match stade vélo voiture train avion "
+    "téléphone ordinateur clavier souris caméra photo image dessin peinture sculpture"
+).split()
+FILLER = "le la les un une des de du et à en pour avec sur dans par que qui est sont il elle nous vous".split()
+
+QUERIES = {
+    'word': ["château", "médecin", "recette", "stade"],
+    'prefix': ["prog", "tél", "équ", "ma"],
+    'no_accents': ["ete", "theatre", "requete", "ecole"],
+    'multi_word': ["café crème", "train voyage", "erreur réseau", "pâtes recette"],
+    'absent': ["zèbre", "xylophone"],
+}
+
+def synthetic_message(rng: random.Random) -> str:
+    words = []
+    for _ in range(rng.randint(5, 40)):
+        words.append(rng.choice(VOCABULARY) if rng.random() < 0.4 else rng.choice(FILLER))
+    return ' '.join(words).capitalize() + '.'
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+def run(size: int, repeats: int) -> dict:
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        store = ConversationStore(os.path.join(directory, 'conversations.db'))
+
+        start = time.perf_counter()
+        for i in range(size):
+            store.append('user' if i % 2 == 0 else 'model', synthetic_message(rng))
+        append_us = (time.perf_counter() - start) / size * 1e6
+
+        results = {'messages': size, 'append_us': append_us}
+        for kind, queries in QUERIES.items():
+            latencies = []
+            matches = 0
+            for _ in range(repeats):
+                for query in queries:
+                    start = time.perf_counter()
+                    matches = len(store.search(query))
+                    latencies.append(time.perf_counter() - start)
+            results[kind] = {
+                'p50_ms': _percentile(latencies, 0.5) * 1000,
+                'p99_ms': _percentile(latencies, 0.99) * 1000,
+                'last_matches': matches,
+            }
+
+        # Référence : balayage LIKE (sensible aux accents), complet pour un mot absent
+        latencies = []
+        for query in QUERIES['absent']:
+            start = time.perf_counter()
+            store._db.execute(
+                "SELECT id FROM messages WHERE text LIKE ? ORDER BY id DESC LIMIT 100", (f'%{query}%',)
+            ).fetchall()
+            latencies.append(time.perf_counter() - start)
+        results['like_scan_p50_ms'] = _percentile(latencies, 0.5) * 1000
+        store.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--json', help="Fichier où enregistrer les résultats")
+    args = parser.parse_args()
+
+    results = [run(size, args.repeats) for size in args.sizes]
+    for r in results:
+        print(f"{r['messages']} messages — ajout {r['append_us']:.0f} µs/message, "
+              f"balayage LIKE (mot absent) p50 {r['like_scan_p50_ms']:.1f} ms")
+        for kind in QUERIES:
+            print(f"  {kind:>11} : p50 {r[kind]['p50_ms']:.2f} ms, p99 {r[kind]['p99_ms']:.2f} ms")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'search': results}, f, indent=2, ensure_ascii=False)
+
+if __name__ == '__main__':
+    main()
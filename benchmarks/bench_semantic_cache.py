@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Benchmark du cache sémantique : corpus synthétique de N questions distinctes
+Mesure la latence de recherche, le taux de succès sur des reformulations
+proches (casse, accents, ponctuation, faute de frappe, formule de politesse)
+et le taux de faux positifs sur des questions nouvelles et sur des questions
+connues dont le sens a changé (précision ajoutée, nombre, négation)
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.semantic_cache import HashingEmbedder, SemanticCache
+
+TEMPLATES = [
+    "Quelle est la différence entre {a} et {b} ?",
+    "Comment utiliser {a} avec {b} ?",
+    "Peux-tu m'expliquer {a} pour {b} ?",
+    "Donne-moi un exemple de {a} dans {b}.",
+    "Pourquoi {a} est-il plus lent que {b} ?",
+    "Quels sont les avantages de {a} par rapport à {b} ?",
+    "Écris une fonction qui combine {a} et {b}.",
+    "Résume l'histoire de {a} en lien avec {b}.",
+    "Est-ce que {a} fonctionne sur {b} ?",
+    "Quelle est la meilleure façon d'apprendre {a} avec {b} ?",
+    "Quelles erreurs éviter avec {a} sous {b} ?",
+    "Comment déboguer {a} dans {b} ?",
+    "Fais un tutoriel sur {a} appliqué à {b}.",
+    "Quel livre recommandes-tu sur {a} et {b} ?",
+    "Comment tester {a} quand on travaille avec {b} ?",
+    "Compare les performances de {a} sur {b}.",
+    "Quelles alternatives à {a} existent pour {b} ?",
+    "Explique {a} à un débutant qui connaît {b}.",
+    "Comment optimiser {a} dans le contexte de {b} ?",
+    "Quelles sont les limites de {a} avec {b} ?",
+    "Traduis la documentation de {a} pour {b}.",
+    "Liste trois cas d'usage de {a} en {b}.",
+]
+
+SUBJECTS_A = [
+    "les listes", "les dictionnaires", "la récursion", "les threads", "asyncio", "les générateurs",
+    "les décorateurs", "les closures", "SQLite", "les index", "les transactions", "le cache HTTP",
+    "TCP", "UDP", "les websockets", "le JSON", "le XML", "les expressions régulières", "Unicode",
+    "les tests unitaires", "le profilage", "la compression", "le chiffrement", "les certificats",
+    "les conteneurs", "Kubernetes", "les files de messages", "le hachage", "les arbres B",
+    "les graphes", "le tri rapide", "la programmation dynamique", "les tableaux NumPy",
+    "la vectorisation", "les GPU", "la mémoire virtuelle", "le ramasse-miettes", "les pointeurs",
+    "les exceptions", "la journalisation", "les métriques", "les histogrammes", "les percentiles",
+    "le rendu OpenGL", "les textures", "les atlas", "les polices", "le Markdown", "les widgets",
+    "les animations",
+]
+
+SUBJECTS_B = [
+    "Python", "Kotlin", "Java", "Rust", "Go", "C", "C++", "JavaScript", "TypeScript", "Swift",
+    "Android", "iOS", "Linux", "Windows", "macOS", "un Raspberry Pi", "un serveur web", "une API REST",
+    "une base de données", "un jeu vidéo", "une application mobile", "un script shell", "Kivy",
+    "Django", "Flask", "FastAPI", "aiohttp", "PostgreSQL", "Redis", "Docker", "un microcontrôleur",
+    "un navigateur", "un tableur", "un notebook Jupyter", "un pipeline de données", "le cloud",
+    "une montre connectée", "un téléviseur", "une voiture", "un drone", "un robot", "un chatbot",
+    "la recherche plein texte", "le traitement d'images", "la reconnaissance vocale",
+    "la synthèse vocale", "la traduction automatique", "les recommandations", "la cartographie",
+    "la météo", "la finance", "la santé", "l'éducation", "la musique", "la photographie",
+    "le streaming vidéo", "les réseaux sociaux", "le commerce en ligne", "la logistique",
+    "l'agriculture", "l'énergie", "les transports", "la domotique", "la sécurité", "les jeux de société",
+    "la bureautique", "le journalisme", "la comptabilité", "le droit", "la chimie", "la physique",
+    "l'astronomie", "la biologie", "la géologie", "les mathématiques", "les statistiques",
+    "l'apprentissage automatique", "la vision par ordinateur", "les compilateurs", "les interpréteurs",
+    "les systèmes embarqués", "le temps réel", "la haute disponibilité", "la sauvegarde",
+    "la virtualisation", "les réseaux mobiles", "le Bluetooth", "le Wi-Fi", "la 5G", "les satellites",
+    "la réalité virtuelle", "la réalité augmentée", "l'impression 3D", "les capteurs", "les batteries",
+    "les API Gemini", "les LLM", "les embeddings", "la recherche vectorielle", "les bases vectorielles",
+]
+
+def corpus(size: int, seed: int = 0):
+    """`size` questions distinctes, et des questions nouvelles (hors corpus)"""
+    combos = [(t, a, b) for t in TEMPLATES for a in SUBJECTS_A for b in SUBJECTS_B]
+    random.Random(seed).shuffle(combos)
+    if size > len(combos) - 1000:
+        raise SystemExit(f"Corpus limité à {len(combos) - 1000} questions")
+    prompts = [t.format(a=a, b=b) for t, a, b in combos[:size]]
+    novel = [t.format(a=a, b=b) for t, a, b in combos[-1000:]]
+    return prompts, novel
+
+def paraphrase(prompt: str, rng: random.Random) -> str:
+    """Variante proche d'une question (ce qu'un cache exact manque)"""
+    variant = rng.choice(['lower', 'accents', 'punctuation', 'typo', 'polite'])
+    if variant == 'lower':
+        return prompt.lower()
+    if variant == 'accents':
+        return prompt.translate(str.maketrans('éèêàùç', 'eeeauc'))
+    if variant == 'punctuation':
+        return prompt.rstrip(' ?.!') + ' ??'
+    if variant == 'typo':
+        i = rng.randrange(len(prompt) - 1)
+        return prompt[:i] + prompt[i + 1] + prompt[i] + prompt[i + 2:]
+    return rng.choice(["Bonjour, ", "Stp, ", "Dis-moi : "]) + prompt
+
+QUALIFIERS = [" pour les enfants", " demain", " en 2025", " sans bibliothèque", " en moins de 10 lignes"]
+
+def change_meaning(prompt: str, rng: random.Random) -> str:
+    """Question proche en surface mais de sens différent (la réponse en cache serait fausse)"""
+    if rng.random() < 0.5:
+        return prompt.rstrip(' ?.') + rng.choice(QUALIFIERS) + ' ?'
+    words = prompt.split(' ')
+    i = rng.randrange(1, len(words))
+    return ' '.join(words[:i] + ['pas'] + words[i:])
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+def run_size(size: int, threshold: float, queries: int, dim: int, lexical_check: bool) -> dict:
+    prompts, novel = corpus(size)
+    cache = SemanticCache(HashingEmbedder(dim=dim), threshold=threshold, max_entries=size,
+                          lexical_check=lexical_check)
+
+    start = time.perf_counter()
+    for i, prompt in enumerate(prompts):
+        cache.put(prompt, f"réponse {i}")
+    fill_seconds = time.perf_counter() - start
+
+    rng = random.Random(1)
+    latencies = []
+    hits = correct = 0
+    for _ in range(queries):
+        i = rng.randrange(size)
+        start = time.perf_counter()
+        answer = cache.get(paraphrase(prompts[i], rng))
+        latencies.append(time.perf_counter() - start)
+        hits += answer is not None
+        correct += answer == f"réponse {i}"
+
+    false_positives = sum(cache.get(prompt) is not None for prompt in novel[:queries])
+    changed_hits = sum(cache.get(change_meaning(prompts[rng.randrange(size)], rng)) is not None
+                       for _ in range(queries))
+
+    return {
+        'entries': size,
+        'index_mb': cache.index.vectors.nbytes / 1e6,
+        'fill_us_per_entry': fill_seconds / size * 1e6,
+        'lookup_p50_ms': _percentile(latencies, 0.5) * 1000,
+        'lookup_p99_ms': _percentile(latencies, 0.99) * 1000,
+        'paraphrase_hit_rate': hits / queries,
+        'paraphrase_correct_rate': correct / queries,
+        'novel_false_positive_rate': false_positives / min(queries, len(novel)),
+        'changed_meaning_false_positive_rate': changed_hits / queries,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--threshold', type=float, default=0.85)
+    parser.add_argument('--dim', type=int, default=256)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--no-lexical-check', action='store_true',
+                        help="Similarité vectorielle seule, sans vérification lexicale")
+    parser.add_argument('--json', help="Fichier où enregistrer les résultats")
+    args = parser.parse_args()
+
+    results = [run_size(size, args.threshold, args.queries, args.dim, not args.no_lexical_check)
+               for size in args.sizes]
+    print(f"{'entrées':>8} {'index (Mo)':>11} {'p50 (ms)':>9} {'p99 (ms)':>9} "
+          f"{'succès':>7} {'corrects':>9} {'faux +':>7} {'sens changé':>12}")
+    for r in results:
+        print(f"{r['entries']:>8} {r['index_mb']:>11.1f} {r['lookup_p50_ms']:>9.2f} {r['lookup_p99_ms']:>9.2f} "
+              f"{r['paraphrase_hit_rate']:>7.1%} {r['paraphrase_correct_rate']:>9.1%} "
+              f"{r['novel_false_positive_rate']:>7.1%} {r['changed_meaning_false_positive_rate']:>12.1%}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'semantic_cache': results, 'threshold': args.threshold, 'dim': args.dim,
+                       'lexical_check': not args.no_lexical_check},
+                      f, indent=2, ensure_ascii=False)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark du service HTTP (src.service) contre le serveur Gemini simulé
+N clients simultanés mêlant génération, streaming SSE et sessions de chat :
+débit, latences, connexions vers Gemini, puis durée d'un arrêt propre
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('GEMINI_API_KEY', 'mock-key')
+
+import aiohttp
+from aiohttp import web
+
+from benchmarks.mock_gemini_server import MockGeminiServer
+from src.async_gemini_client import AsyncGeminiClient
+from src.response_cache import ResponseCache
+from src.service import OkitService
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+async def _generate(http, base, rng):
+    # Un tiers de questions reposées : servies par le cache partagé
+    prompt = f"Question {rng.randrange(50)}" if rng.random() < 0.33 else f"Question unique {rng.random()}"
+    async with http.post(f"{base}/v1/generate", json={'prompt': prompt}) as response:
+        await response.json()
+        return 'generate', response.status
+
+async def _stream(http, base, rng):
+    async with http.post(f"{base}/v1/generate", json={'prompt': f"Flux {rng.random()}", 'stream': True}) as response:
+        async for _ in response.content:
+            pass
+        return 'stream', response.status
+
+async def _chat(http, base, rng):
+    async with http.post(f"{base}/v1/sessions") as response:
+        session_id = (await response.json())['session_id']
+    status = 200
+    for turn in range(3):
+        async with http.post(f"{base}/v1/sessions/{session_id}/messages",
+                             json={'message': f"Tour {turn}"}) as response:
+            await response.json()
+            status = max(status, response.status)
+    async with http.delete(f"{base}/v1/sessions/{session_id}"):
+        pass
+    return 'chat', status
+
+async def run(clients: int, requests_per_client: int, latency: float, pool_size: int):
+    upstream = MockGeminiServer(latency=latency, chunk_delay=0.002).start()
+    service = OkitService(
+        AsyncGeminiClient(api_key='mock-key', base_url=upstream.base_url, pool_size=pool_size),
+        cache=ResponseCache(),
+        max_concurrency=pool_size
+    )
+    runner = web.AppRunner(service.create_app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base = f"http://127.0.0.1:{port}"
+
+    latencies = {'generate': [], 'stream': [], 'chat': []}
+    failures = 0
+
+    async def client(index):
+        nonlocal failures
+        rng = random.Random(index)
+        connector = aiohttp.TCPConnector(limit=1)
+        async with aiohttp.ClientSession(connector=connector) as http:
+            for _ in range(requests_per_client):
+                scenario = rng.choice((_generate, _generate, _stream, _chat))
+                start = time.perf_counter()
+                kind, status = await scenario(http, base, rng)
+                latencies[kind].append(time.perf_counter() - start)
+                failures += status >= 400
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(i) for i in range(clients)))
+        elapsed = time.perf_counter() - start
+
+        async with aiohttp.ClientSession() as http:
+            async with http.get(f"{base}/metrics") as response:
+                exported = await response.text()
+
+        # Arrêt propre avec une requête en cours : elle doit se terminer
+        async with aiohttp.ClientSession() as http:
+            pending = asyncio.ensure_future(http.post(f"{base}/v1/generate", json={'prompt': "Dernière"}))
+            await asyncio.sleep(latency / 2)
+            shutdown_start = time.perf_counter()
+            await runner.cleanup()
+            shutdown = time.perf_counter() - shutdown_start
+            last = await pending
+            drained = last.status == 200
+            last.release()
+    finally:
+        upstream.stop()
+
+    total = sum(len(values) for values in latencies.values())
+    return {
+        'clients': clients,
+        'requests': total,
+        'requests_per_second': total / elapsed,
+        'failures': failures,
+        'upstream_requests': upstream.request_count,
+        'upstream_connections': len(upstream.connections),
+        'cache_hits': service.cache.stats['memory_hits'],
+        'metrics_lines': exported.count('\n'),
+        'shutdown_seconds': shutdown,
+        'in_flight_request_completed': drained,
+        'latency_ms': {
+            kind: {'p50': _percentile(values, 0.5) * 1000, 'p99': _percentile(values, 0.99) * 1000}
+            for kind, values in latencies.items() if values
+        },
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=5, help="Scénarios par client")
+    parser.add_argument('--latency', type=float, default=0.1, help="Latence du serveur simulé (s)")
+    parser.add_argument('--pool-size', type=int, default=32)
+    parser.add_argument('--json', help="Fichier où enregistrer les résultats")
+    args = parser.parse_args()
+
+    r = asyncio.run(run(args.clients, args.requests, args.latency, args.pool_size))
+    print(f"{r['clients']} clients, {r['requests']} scénarios : {r['requests_per_second']:.0f}/s, "
+          f"{r['failures']} échecs")
+    for kind, latency in r['latency_ms'].items():
+        print(f"  {kind:>8} : p50 {latency['p50']:.0f} ms, p99 {latency['p99']:.0f} ms")
+    print(f"Gemini : {r['upstream_requests']} requêtes sur {r['upstream_connections']} connexions, "
+          f"{r['cache_hits']} réponses servies par le cache")
+    print(f"Arrêt propre : {r['shutdown_seconds'] * 1000:.0f} ms, "
+          f"requête en cours {'terminée' if r['in_flight_request_completed'] else 'perdue'}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'service': r}, f, indent=2, ensure_ascii=False)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark des conversations multiples : N conversations de M messages
+Mesure le passage à une conversation encore en mémoire, le rechargement
+d'une conversation évincée et la mémoire Python par session hydratée
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kivy.base import EventLoop
+from kivy.core.window import Window
+
+from src.conversation_store import ConversationStore
+from src.session_manager import SessionManager
+from src.ui.chat_view import ChatView
+from src.ui.update_queue import UIUpdateQueue
+
+SAMPLE_TEXTS = [
+    "Bonjour Okit, peux-tu m'aider ?",
+    "Bien sûr ! Voici une réponse **un peu plus longue** pour remplir la bulle :\n\n"
+    "- un premier point\n- un second point\n\n```python\nprint('bonjour')\n```",
+    "Merci 🐺",
+]
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+def run(conversations: int, messages: int, max_hydrated: int, switches: int) -> dict:
+    EventLoop.ensure_window()
+
+    def create_view():
+        view = ChatView(size_hint=(1, 1))
+        return view, UIUpdateQueue(view)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = ConversationStore(os.path.join(directory, 'conversations.db'))
+        ids = []
+        for c in range(conversations):
+            conversation_id = store.create_conversation(f"Conversation {c}")
+            for i in range(messages):
+                store.append('user' if i % 2 == 0 else 'model',
+                             f"#{c}.{i} {SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]}", conversation_id)
+            ids.append(conversation_id)
+
+        sessions = SessionManager(store, create_view, max_hydrated=max_hydrated)
+        shown = None
+
+        def show(conversation_id):
+            nonlocal shown
+            start = time.perf_counter()
+            session = sessions.activate(conversation_id)
+            if shown is not session.view:
+                if shown is not None:
+                    Window.remove_widget(shown)
+                Window.add_widget(session.view)
+                shown = session.view
+            EventLoop.idle()
+            return time.perf_counter() - start
+
+        tracemalloc.start()
+        show(ids[0])
+        memory = tracemalloc.get_traced_memory()[0]
+        show(ids[1])
+        session_kb = (tracemalloc.get_traced_memory()[0] - memory) / 1024
+        tracemalloc.stop()
+
+        # Aller-retour entre conversations en mémoire
+        warm = [show(ids[i % 2]) for i in range(switches)]
+        # Parcours de toutes les conversations : chacune a été évincée entre deux passages
+        cold = [show(ids[i % conversations]) for i in range(2, 2 + switches)]
+
+        Window.remove_widget(shown)
+        hydrated = len(sessions.hydrated())
+        store.close()
+
+    return {
+        'conversations': conversations,
+        'messages_per_conversation': messages,
+        'hydrated_sessions': hydrated,
+        'session_memory_kb': session_kb,
+        'warm_switch_p50_ms': _percentile(warm, 0.5) * 1000,
+        'warm_switch_p99_ms': _percentile(warm, 0.99) * 1000,
+        'cold_switch_p50_ms': _percentile(cold, 0.5) * 1000,
+        'cold_switch_p99_ms': _percentile(cold, 0.99) * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--conversations', type=int, default=20)
+    parser.add_argument('--messages', type=int, default=500)
+    parser.add_argument('--max-hydrated', type=int, default=3)
+    parser.add_argument('--switches', type=int, default=40)
+    parser.add_argument('--json', help="Fichier où enregistrer les résultats")
+    args = parser.parse_args()
+
+    r = run(args.conversations, args.messages, args.max_hydrated, args.switches)
+    print(f"{r['conversations']} conversations de {r['messages_per_conversation']} messages, "
+          f"{r['hydrated_sessions']} en mémoire (~{r['session_memory_kb']:.0f} Ko chacune)")
+    print(f"  en mémoire : p50 {r['warm_switch_p50_ms']:.2f} ms, p99 {r['warm_switch_p99_ms']:.2f} ms")
+    print(f"  rechargée  : p50 {r['cold_switch_p50_ms']:.2f} ms, p99 {r['cold_switch_p99_ms']:.2f} ms")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'sessions': r}, f, indent=2, ensure_ascii=False)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark du démarrage : coût d'import de chaque phase, mesuré dans un
+processus neuf avec `python -X importtime`
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Phases dans l'ordre du démarrage de l'app
+PHASES = [
+    ("Imports UI (avant première frame)", "src.startup_timing, src.config, src.request_scheduler, src.ui.chat_view"),
+    ("Client Gemini (module)", "src.gemini_client"),
+    ("SDK Gemini", "google.generativeai"),
+    ("Transport HTTP", "requests"),
+]
+
+def _importtime(statement: str) -> list:
+    """Modules de premier niveau importés et leur coût cumulé (µs)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, KIVY_NO_ARGS="1", KIVY_NO_CONSOLELOG="1"),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    entries = []
+    for line in result.stderr.splitlines():
+        fields = line[len("import time:"):].split("|")
+        if not line.startswith("import time:") or len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        # Premier niveau : un seul espace après la barre (les dépendances sont indentées)
+        if fields[2].startswith("  "):
+            continue
+        entries.append((fields[2].strip(), int(fields[1])))
+    return entries
+
+def import_cost(modules: str, baseline: set) -> dict:
+    """Durée totale d'import (ms) et modules les plus coûteux"""
+    try:
+        entries = [(name, us) for name, us in _importtime(f"import {modules}") if name not in baseline]
+    except RuntimeError as e:
+        return {"error": str(e)}
+
+    return {
+        "total_ms": round(sum(us for _, us in entries) / 1000, 1),
+        "slowest": [
+            {"module": name, "ms": round(us / 1000, 1)}
+            for name, us in sorted(entries, key=lambda e: e[1], reverse=True)[:5]
+        ],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--json', help="Fichier où enregistrer les résultats")
+    args = parser.parse_args()
+
+    # Modules déjà chargés par l'interpréteur lui-même (site, encodings...)
+    baseline = {name for name, _ in _importtime("pass")}
+
+    report = {}
+    for phase, modules in PHASES:
+        report[phase] = import_cost(modules, baseline)
+        cost = report[phase]
+        if "error" in cost:
+            print(f"{phase:<36} indisponible ({cost['error']})")
+        else:
+            print(f"{phase:<36} {cost['total_ms']:>8.1f} ms")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la synthèse vocale en flux : délai avant le début de la parole
+Compare la lecture phrase par phrase pendant la génération à la lecture
+de la réponse complète, avec un moteur de synthèse simulé
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.metrics import metrics
+from src.speech_output import FakeTTSBackend, SpeechPipeline
+
+REPLY = (
+    "Bien sûr, voici une réponse détaillée. Le loup gris vit en meute de six à dix individus. "
+    "Il parcourt jusqu'à cinquante kilomètres par jour pour chasser. "
+    "Son hurlement sert à rassembler la meute et à marquer le territoire. "
+) * 3
+
+def generate(chunk_delay, words_per_chunk=3):
+    """Réponse produite par fragments, comme generate_text_stream"""
+    words = REPLY.split(' ')
+    for i in range(0, len(words), words_per_chunk):
+        time.sleep(chunk_delay)
+        yield ' '.join(words[i:i + words_per_chunk]) + ' '
+
+def speech_start(streaming, args):
+    metrics.reset()
+    backend = FakeTTSBackend(chars_per_second=1000, setup_delay=args.setup_delay)
+    pipeline = SpeechPipeline(backend)
+    requested_at = time.perf_counter()
+    time.sleep(args.ttfb)
+
+    pipeline.begin(requested_at)
+    if streaming:
+        for chunk in generate(args.chunk_delay):
+            pipeline.feed(chunk)
+    else:
+        pipeline.feed(''.join(generate(args.chunk_delay)))
+    pipeline.finish()
+
+    while not metrics.histogram('tts_speech_start_seconds').count:
+        time.sleep(0.005)
+    pipeline.close()
+    return metrics.histogram('tts_speech_start_seconds').max
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ttfb', type=float, default=0.4, help="délai avant le premier fragment")
+    parser.add_argument('--chunk-delay', type=float, default=0.05)
+    parser.add_argument('--setup-delay', type=float, default=0.05, help="latence du moteur de synthèse")
+    args = parser.parse_args()
+
+    full = speech_start(False, args)
+    streamed = speech_start(True, args)
+    print(f"Réponse complète puis lecture : parole à {full * 1000:.0f} ms")
+    print(f"Lecture phrase par phrase     : parole à {streamed * 1000:.0f} ms ({full / streamed:.1f}x plus tôt)")
+
+if __name__ == '__main__':
+    main()
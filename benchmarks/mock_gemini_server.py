@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Serveur local imitant l'API REST Gemini (generateContent / streamGenerateContent)
+Utilisé par les benchmarks, sans réseau ni clé API
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class MockGeminiHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 : connexions keep-alive comme l'API réelle
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        server = self.server
+        server.record_request(self.client_address)
+
+        try:
+            payload = json.loads(body or b'{}')
+            prompt = payload['contents'][-1]['parts'][0].get('text', '')
+        except (ValueError, KeyError, IndexError):
+            self._send_json(400, {"error": {"message": "Requête invalide"}})
+            return
+
+        time.sleep(server.latency)
+
+        if server.should_fail():
+            # Erreur injectée, comme une surcharge ou un quota dépassé
+            self._send_json(server.error_status, {"error": {"message": "Erreur simulée"}},
+                            retry_after=server.retry_after)
+            return
+
+        reply = server.reply_text or f"Réponse simulée : {prompt[:40]}"
+        if server.reply_bytes and len(reply) < server.reply_bytes:
+            # Remplissage en mots pour garder un streaming réaliste
+            filler = ' '.join(['lorem'] * ((server.reply_bytes - len(reply)) // 6 + 1))
+            reply = f"{filler} {reply}"
+
+        if ':streamGenerateContent' in self.path:
+            self._send_stream(reply)
+        elif ':generateContent' in self.path:
+            self._send_json(200, _candidate(reply))
+        else:
+            self._send_json(404, {"error": {"message": "Endpoint inconnu"}})
+
+    def _send_json(self, status, data, retry_after=None):
+        raw = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(raw)))
+        if retry_after is not None:
+            self.send_header('Retry-After', f"{retry_after:g}")
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _send_stream(self, reply):
+        # Corps découpé (chunked) : un évènement SSE par fragment
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        words = reply.split(' ')
+        for i, word in enumerate(words):
+            text = word if i == 0 else ' ' + word
+            event = f"data: {json.dumps(_candidate(text))}\r\n\r\n".encode('utf-8')
+            self.wfile.write(f"{len(event):X}\r\n".encode('ascii') + event + b"\r\n")
+            self.wfile.flush()
+            time.sleep(self.server.chunk_delay)
+        self.wfile.write(b"0\r\n\r\n")
+
+def _candidate(text):
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+class MockGeminiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # File d'attente d'écoute large : avec la valeur par défaut (5), les connexions
+    # simultanées au-delà sont refusées puis retentées ~1 s plus tard
+    request_queue_size = 128
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, chunk_delay=0.0, reply_text=None,
+                 reply_bytes=None, error_rate=0.0, error_status=503, retry_after=None, seed=None):
+        """
+        latency: attente avant chaque réponse (secondes)
+        chunk_delay: attente entre deux fragments SSE
+        reply_bytes: taille minimale des réponses (remplissage)
+        error_rate: proportion de requêtes en erreur error_status (Retry-After optionnel)
+        """
+        super().__init__((host, port), MockGeminiHandler)
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.reply_text = reply_text
+        self.reply_bytes = reply_bytes
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+
+        self._stats_lock = threading.Lock()
+        self.request_count = 0
+        self.error_count = 0
+        self.connections = set()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1beta"
+
+    def record_request(self, client_address):
+        with self._stats_lock:
+            self.request_count += 1
+            # Un port client distinct = une nouvelle connexion TCP
+            self.connections.add(client_address)
+
+    def should_fail(self):
+        with self._stats_lock:
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.error_count += 1
+                return True
+            return False
+
+    def start(self):
+        """Démarre le serveur dans un thread d'arrière-plan"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur Gemini simulé")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--chunk-delay', type=float, default=0.02)
+    parser.add_argument('--reply-bytes', type=int, default=None)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--retry-after', type=float, default=None)
+    args = parser.parse_args()
+
+    server = MockGeminiServer(port=args.port, latency=args.latency, chunk_delay=args.chunk_delay,
+                              reply_bytes=args.reply_bytes, error_rate=args.error_rate,
+                              error_status=args.error_status, retry_after=args.retry_after)
+    print(f"🧪 Serveur Gemini simulé sur {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks Okit AI
+- client : débit et percentiles de latence de GeminiClient contre le serveur simulé
+- ui : coût de rendu de l'historique et d'add_message (sous-processus Kivy)
+- startup : coût d'import des phases de démarrage (sous-processus)
+
+Les résultats sont enregistrés en JSON (benchmarks/results/) et peuvent être
+comparés à une exécution précédente avec --compare
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_gemini_server import MockGeminiServer
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+# Métriques pour lesquelles une hausse est une amélioration
+HIGHER_IS_BETTER = ('_rps',)
+
+def _percentiles(snapshot: dict, name: str, **labels) -> dict:
+    """p50/p90/p99 (ms) d'un histogramme du registre de métriques"""
+    for entry in snapshot['histograms'].get(name, []):
+        if all(entry['labels'].get(key) == value for key, value in labels.items()) and entry['count']:
+            return {f"{p}_ms": round(entry[p] * 1000, 2) for p in ('p50', 'p90', 'p99')}
+    return {}
+
+def bench_client(args) -> dict:
+    """GeminiClient sur le chemin REST (le SDK ne peut pas viser un serveur local)"""
+    from src.gemini_client import GeminiClient
+    from src.metrics import metrics
+    from src.path_health import PathSelector
+    from src.retry_policy import RetryPolicy
+
+    server = MockGeminiServer(latency=args.latency, chunk_delay=args.chunk_delay,
+                              reply_bytes=args.reply_bytes, error_rate=args.error_rate,
+                              retry_after=0 if args.error_rate else None, seed=0).start()
+    prompts = [f"Question {i}" for i in range(args.requests)]
+    try:
+        client = GeminiClient(
+            api_key="mock-key",
+            base_url=server.base_url,
+            path_selector=PathSelector(('rest',), failure_threshold=10 ** 6),
+            retry_policy=RetryPolicy(base_delay=0.01, deadline=10.0),
+        )
+        metrics.reset()
+
+        start = time.perf_counter()
+        replies = client.generate_batch(prompts, max_concurrency=args.concurrency)
+        unary_elapsed = time.perf_counter() - start
+
+        def stream_one(prompt, errors):
+            if any(chunk.startswith("❌") or "\n❌" in chunk for chunk in client.generate_text_stream(prompt)):
+                errors.append(prompt)
+
+        stream_errors = []
+        start = time.perf_counter()
+        for offset in range(0, len(prompts), args.concurrency):
+            threads = [threading.Thread(target=stream_one, args=(prompt, stream_errors))
+                       for prompt in prompts[offset:offset + args.concurrency]]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        stream_elapsed = time.perf_counter() - start
+
+        snapshot = metrics.snapshot()
+        client.close()
+    finally:
+        server.stop()
+
+    retries = sum(entry['value'] for entry in snapshot['counters'].get('gemini_retries_total', []))
+    return {
+        'rest_unary': dict(
+            requests_rps=round(len(prompts) / unary_elapsed, 2),
+            errors=sum(1 for reply in replies if reply.startswith("❌")),
+            **_percentiles(snapshot, 'gemini_request_seconds', path='rest', mode='unary'),
+        ),
+        'rest_stream': dict(
+            requests_rps=round(len(prompts) / stream_elapsed, 2),
+            errors=len(stream_errors),
+            ttfb=_percentiles(snapshot, 'gemini_ttfb_seconds', path='rest'),
+            **_percentiles(snapshot, 'gemini_request_seconds', path='rest', mode='stream'),
+        ),
+        'retries': retries,
+        'server_requests': server.request_count,
+        'server_errors': server.error_count,
+    }
+
+def _run_script(script: str, *script_args) -> dict:
+    """Lance un benchmark dans un processus neuf et relit son JSON"""
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, 'result.json')
+        result = subprocess.run(
+            [sys.executable, os.path.join(ROOT, 'benchmarks', script), *script_args, '--json', output],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            env=dict(os.environ, KIVY_NO_ARGS="1", KIVY_NO_CONSOLELOG="1"),
+        )
+        if result.returncode != 0:
+            lines = result.stderr.strip().splitlines()
+            raise RuntimeError(lines[-1] if lines else f"code {result.returncode}")
+        with open(output, encoding='utf-8') as f:
+            return json.load(f)
+
+def bench_ui(args) -> dict:
+    return _run_script('bench_chat_history.py', '--sizes', *map(str, args.ui_sizes))
+
+def bench_startup(args) -> dict:
+    return _run_script('bench_startup.py')
+
+def bench_markdown(args) -> dict:
+    return _run_script('bench_markdown.py')
+
+def bench_assets(args) -> dict:
+    return _run_script('bench_assets.py')
+
+def bench_search(args) -> dict:
+    return _run_script('bench_search.py', '--sizes', '100000', '--repeats', '5')
+
+def bench_semantic_cache(args) -> dict:
+    return _run_script('bench_semantic_cache.py', '--sizes', '1000', '10000')
+
+def bench_sessions(args) -> dict:
+    return _run_script('bench_sessions.py')
+
+def bench_service(args) -> dict:
+    return _run_script('bench_service.py', '--clients', '100', '--requests', '4')
+
+SECTIONS = {
+    'client': bench_client,
+    'ui': bench_ui,
+    'startup': bench_startup,
+    'markdown': bench_markdown,
+    'assets': bench_assets,
+    'semantic_cache': bench_semantic_cache,
+    'search': bench_search,
+    'sessions': bench_sessions,
+    'service': bench_service,
+}
+
+def _flatten(data, prefix='') -> dict:
+    """{'a': {'b': 1}} -> {'a.b': 1} (valeurs numériques seulement)"""
+    flat = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            flat.update(_flatten(value, f"{prefix}{key}."))
+    elif isinstance(data, list):
+        for i, value in enumerate(data):
+            flat.update(_flatten(value, f"{prefix}{i}."))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        flat[prefix[:-1]] = data
+    return flat
+
+def compare(previous: dict, current: dict, threshold: float):
+    """Affiche les écarts et retourne le nombre de régressions"""
+    before = _flatten(previous.get('results', {}))
+    after = _flatten(current['results'])
+    regressions = 0
+    print(f"\n{'métrique':<55} {'avant':>10} {'après':>10} {'écart':>8}")
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        if not old:
+            continue
+        change = (new - old) / abs(old)
+        worse = -change if any(key.endswith(suffix) for suffix in HIGHER_IS_BETTER) else change
+        flag = ''
+        if worse > threshold:
+            flag = ' ⚠️'
+            regressions += 1
+        print(f"{key:<55} {old:>10.2f} {new:>10.2f} {change:>+7.0%}{flag}")
+    return regressions
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sections', nargs='+', choices=SECTIONS, default=list(SECTIONS))
+    parser.add_argument('--requests', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.1)
+    parser.add_argument('--chunk-delay', type=float, default=0.005)
+    parser.add_argument('--reply-bytes', type=int, default=2048)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--ui-sizes', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--output', help="Fichier JSON (défaut : benchmarks/results/<date>.json)")
+    parser.add_argument('--compare', help="Résultats précédents à comparer")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Écart signalé comme régression")
+    args = parser.parse_args()
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {key: value for key, value in vars(args).items()
+                       if key not in ('output', 'compare', 'sections')},
+        'results': {},
+    }
+
+    for name in args.sections:
+        print(f"▶️  {name}...")
+        try:
+            report['results'][name] = SECTIONS[name](args)
+        except Exception as e:
+            # Section indisponible (dépendance absente, pas d'affichage...) : on continue
+            print(f"   indisponible ({e})")
+            report['results'][name] = {'error': str(e)}
+        else:
+            print(json.dumps(report['results'][name], indent=2, ensure_ascii=False))
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Résultats : {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        if regressions:
+            print(f"\n{regressions} régression(s) au-delà de {args.threshold:.0%}")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
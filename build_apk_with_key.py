@@ -36,6 +36,17 @@ class AppConfig:
     # Clé API intégrée lors du build
     GEMINI_API_KEY = "{api_key}"
     
+    # Cache sémantique (réponses réutilisées pour des questions proches) : désactivé par défaut
+    SEMANTIC_CACHE = False
+    
+    @classmethod
+    def semantic_cache_enabled(cls) -> bool:
+        """Variable OKIT_SEMANTIC_CACHE (1/0), sinon la configuration intégrée"""
+        env_value = os.getenv('OKIT_SEMANTIC_CACHE')
+        if env_value is not None:
+            return env_value.strip().lower() in ('1', 'true', 'yes', 'on')
+        return cls.SEMANTIC_CACHE
+    
     @classmethod
     def get_api_key(cls):
         """Récupère la clé API avec fallback"""
@@ -57,13 +68,10 @@ class AppConfig:
     
     @classmethod
     def setup(cls):
-        """Configuration de l'application"""
+        """Configuration de l'application (appelée explicitement à l'initialisation des services)"""
         api_key = cls.get_api_key()
         os.environ["GEMINI_API_KEY"] = api_key
         logger.info("✅ Configuration Okit AI chargée avec Gemini 2.0 Flash")
-
-# Configuration automatique au démarrage
-setup()
 '''
     
     # Écrire le fichier
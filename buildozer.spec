@@ -14,7 +14,7 @@ orientation = portrait
 [buildozer]
 log_level = 2
 
-presplash.filename = assets/wolf_icon.png
+presplash.filename = assets/presplash.png
 icon.filename = assets/icon.png
 
 android.permissions = INTERNET,RECORD_AUDIO,WRITE_EXTERNAL_STORAGE,READ_EXTERNAL_STORAGE
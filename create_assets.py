@@ -4,8 +4,27 @@ Crée les assets par défaut pour Okit AI
 """
 
 from PIL import Image, ImageDraw
+import json
 import os
 
+# Densités Android (facteur dp -> px), comme les dossiers drawable-*
+DENSITIES = {
+    'mdpi': 1.0,
+    'hdpi': 1.5,
+    'xhdpi': 2.0,
+    'xxhdpi': 3.0,
+    'xxxhdpi': 4.0,
+}
+
+# Entrées de l'atlas : nom -> (image source, taille en dp)
+ATLAS_ENTRIES = {
+    'wolf': ('assets/wolf_icon.png', 48),   # Avatar bot (45 dp)
+    'user': ('assets/user_icon.png', 48),   # Avatar utilisateur (45 dp)
+    'logo': ('assets/wolf_icon.png', 64),   # Logo de l'en-tête (60 dp)
+}
+ATLAS_PADDING = 2
+PRESPLASH_SIZE = 256
+
 def create_wolf_icon():
     """Crée une icône de loup stylisée"""
     size = (512, 512)
@@ -72,6 +91,51 @@ def create_app_icon():
     img.save('assets/icon.png', 'PNG')
     print("✅ Icône app créée")
 
+def write_atlas(name, images):
+    """
+    Regroupe des images dans un atlas Kivy (une texture, un fichier .atlas)
+    images: {id: Image PIL} ; rangées de gauche à droite sur une seule ligne
+    """
+    width = sum(img.width + 2 * ATLAS_PADDING for img in images.values())
+    height = max(img.height for img in images.values()) + 2 * ATLAS_PADDING
+    sheet = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+
+    regions = {}
+    x = 0
+    for uid, img in images.items():
+        sheet.paste(img, (x + ATLAS_PADDING, ATLAS_PADDING))
+        # Coordonnées Kivy : origine en bas à gauche
+        y = height - ATLAS_PADDING - img.height
+        regions[uid] = [x + ATLAS_PADDING, y, img.width, img.height]
+        x += img.width + 2 * ATLAS_PADDING
+
+    png_name = f'{name}-0.png'
+    sheet.save(os.path.join('assets', png_name), 'PNG', optimize=True)
+    with open(os.path.join('assets', f'{name}.atlas'), 'w', encoding='utf-8') as f:
+        json.dump({png_name: regions}, f)
+    return sheet.size
+
+def create_density_atlases():
+    """Variantes réduites par densité, regroupées dans un atlas par densité"""
+    sources = {}
+    for path, _ in ATLAS_ENTRIES.values():
+        if path not in sources:
+            sources[path] = Image.open(path).convert('RGBA')
+
+    for density, scale in DENSITIES.items():
+        images = {}
+        for uid, (path, size_dp) in ATLAS_ENTRIES.items():
+            size = round(size_dp * scale)
+            images[uid] = sources[path].resize((size, size), Image.LANCZOS)
+        width, height = write_atlas(f'okit-{density}', images)
+        print(f"✅ Atlas {density} créé ({width}×{height})")
+
+def create_presplash():
+    """Écran de démarrage réduit (l'icône 512 px est inutilement lourde)"""
+    img = Image.open('assets/wolf_icon.png').convert('RGBA')
+    img.resize((PRESPLASH_SIZE, PRESPLASH_SIZE), Image.LANCZOS).save('assets/presplash.png', 'PNG', optimize=True)
+    print("✅ Écran de démarrage créé")
+
 def main():
     """Crée tous les assets"""
     os.makedirs('assets', exist_ok=True)
@@ -79,6 +143,8 @@ def main():
     create_wolf_icon()
     create_user_icon()
     create_app_icon()
+    create_density_atlases()
+    create_presplash()
     
     print("🎉 Tous les assets créés avec succès !")
 
@@ -1,128 +1,44 @@
+from src.startup_timing import startup_timer
+
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.scrollview import ScrollView
 from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
 from kivy.uix.button import Button
+from kivy.uix.spinner import Spinner
 from kivy.uix.image import Image
 from kivy.clock import Clock
-from kivy.graphics import Color, RoundedRectangle
+from kivy.graphics import Color, Rectangle
 from kivy.core.window import Window
 from kivy.metrics import dp
-from kivy.utils import get_color_from_hex
-import threading
+from kivy.utils import get_color_from_hex, platform
+import time
 import os
 import logging
 
-from src.gemini_client import GeminiClient
-from src.voice_handler_android import VoiceHandlerAndroid
+# Le client Gemini (et son SDK) est importé dans initialize_services,
+# après l'affichage de la première frame
+from src.config import AppConfig
+from src.conversation_store import DEFAULT_TITLE, ConversationStore
+from src.request_scheduler import RequestScheduler, SchedulerBusyError
+from src.metrics import metrics
+from src.session_manager import SessionManager
+from src.ui.assets import image_source
+from src.ui.chat_view import ChatView
+from src.ui.update_queue import UIUpdateQueue
+
+startup_timer.mark("Imports UI")
+
+# Nombre de messages chargés à l'ouverture et à chaque page d'historique
+HISTORY_PAGE_SIZE = 30
+# Conversations gardées en mémoire (vue et contexte), la conversation affichée comprise
+MAX_HYDRATED_SESSIONS = 3
+NEW_CONVERSATION = '➕ Nouvelle conversation'
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class ChatBubble(BoxLayout):
-    def __init__(self, text, is_user=False, **kwargs):
-        super().__init__(**kwargs)
-        self.orientation = 'horizontal'
-        self.size_hint_y = None
-        self.height = dp(90)
-        self.padding = [dp(10), dp(5)]
-        self.spacing = dp(10)
-        
-        if is_user:
-            self.build_user_message(text)
-        else:
-            self.build_bot_message(text)
-    
-    def build_user_message(self, text):
-        """Message utilisateur (à droite)"""
-        self.add_widget(BoxLayout(size_hint_x=0.1))
-        
-        bubble = BoxLayout(
-            orientation='vertical',
-            size_hint_x=0.7
-        )
-        
-        with bubble.canvas.before:
-            Color(0.1, 0.5, 0.9, 1)  # Bleu Okit
-            self.rect = RoundedRectangle(
-                pos=bubble.pos,
-                size=bubble.size,
-                radius=[dp(20), dp(20), dp(5), dp(20)]
-            )
-        
-        bubble.bind(pos=self.update_rect, size=self.update_rect)
-        
-        message = Label(
-            text=text,
-            text_size=(Window.width * 0.5, None),
-            size_hint_y=None,
-            height=dp(80),
-            halign='right',
-            valign='middle',
-            color=(1, 1, 1, 1),
-            padding=[dp(15), dp(10)],
-            font_size='14sp'
-        )
-        message.bind(texture_size=message.setter('size'))
-        bubble.add_widget(message)
-        
-        self.add_widget(bubble)
-        
-        avatar = Image(
-            source='assets/user_icon.png',
-            size_hint=(None, None),
-            size=(dp(45), dp(45))
-        )
-        self.add_widget(avatar)
-    
-    def build_bot_message(self, text):
-        """Message bot (à gauche)"""
-        avatar = Image(
-            source='assets/wolf_icon.png',
-            size_hint=(None, None),
-            size=(dp(45), dp(45))
-        )
-        self.add_widget(avatar)
-        
-        bubble = BoxLayout(
-            orientation='vertical',
-            size_hint_x=0.7
-        )
-        
-        with bubble.canvas.before:
-            Color(0.9, 0.9, 0.9, 1)  # Gris clair
-            self.rect = RoundedRectangle(
-                pos=bubble.pos,
-                size=bubble.size,
-                radius=[dp(5), dp(20), dp(20), dp(20)]
-            )
-        
-        bubble.bind(pos=self.update_rect, size=self.update_rect)
-        
-        message = Label(
-            text=text,
-            text_size=(Window.width * 0.5, None),
-            size_hint_y=None,
-            height=dp(80),
-            halign='left',
-            valign='middle',
-            color=(0.1, 0.1, 0.1, 1),
-            padding=[dp(15), dp(10)],
-            font_size='14sp'
-        )
-        message.bind(texture_size=message.setter('size'))
-        bubble.add_widget(message)
-        
-        self.add_widget(bubble)
-        self.add_widget(BoxLayout(size_hint_x=0.1))
-    
-    def update_rect(self, *args):
-        if hasattr(self, 'rect'):
-            self.rect.pos = self.pos
-            self.rect.size = self.size
-
 class OkitAIApp(App):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -130,13 +46,27 @@ class OkitAIApp(App):
         self.voice_handler = None
         self.is_voice_active = False
         self.title = "Okit AI 🐺"
+        # Pool borné partagé : résultats remis au Clock dans l'ordre de soumission
+        self.scheduler = RequestScheduler(
+            max_workers=3,
+            max_queue=8,
+            dispatch=lambda callback: Clock.schedule_once(lambda dt: callback(), 0)
+        )
+        # Conversation affichée (voir SessionManager)
+        self.sessions = None
+        self.session = None
+        self._conversation_ids = {}
+        # Résultats de la recherche en cours (du plus récent au plus ancien)
+        self.search_query = ''
+        self.search_hits = []
+        self.search_position = 0
         
     def build(self):
         # Configuration de la fenêtre
         Window.clearcolor = get_color_from_hex('#f8f9fa')
         
         # Layout principal
-        main_layout = BoxLayout(
+        main_layout = self.main_layout = BoxLayout(
             orientation='vertical', 
             spacing=dp(10), 
             padding=[dp(15), dp(15), dp(15), dp(10)]
@@ -155,7 +85,7 @@ class OkitAIApp(App):
             Rectangle(pos=header.pos, size=header.size)
         
         logo = Image(
-            source='assets/wolf_icon.png',
+            source=image_source('logo'),
             size_hint=(None, None),
             size=(dp(60), dp(60))
         )
@@ -178,23 +108,69 @@ class OkitAIApp(App):
         title_layout.add_widget(title)
         title_layout.add_widget(subtitle)
         
+        search_btn = Button(
+            text='🔍',
+            size_hint=(None, None),
+            size=(dp(50), dp(50)),
+            pos_hint={'center_y': 0.5},
+            background_color=(1, 1, 1, 0.2),
+            background_normal=''
+        )
+        search_btn.bind(on_press=self.toggle_search)
+        
+        # Choix de la conversation (les plus récemment actives en premier)
+        self.conversation_spinner = Spinner(
+            size_hint=(None, None),
+            size=(dp(160), dp(50)),
+            pos_hint={'center_y': 0.5},
+            font_size='12sp',
+            shorten=True,
+            background_color=(1, 1, 1, 0.2),
+            background_normal=''
+        )
+        self.conversation_spinner.bind(text=self.on_conversation_selected)
+        
         header.add_widget(logo)
         header.add_widget(title_layout)
         header.add_widget(BoxLayout())  # Espace flexible
+        header.add_widget(self.conversation_spinner)
+        header.add_widget(search_btn)
         
-        # Zone de chat
-        self.chat_scroll = ScrollView(
-            size_hint=(1, 1),
-            do_scroll_x=False
-        )
-        self.chat_layout = BoxLayout(
-            orientation='vertical',
-            spacing=dp(10),
+        # Barre de recherche, affichée sous l'en-tête à la demande
+        self.search_bar = BoxLayout(
+            orientation='horizontal',
             size_hint_y=None,
-            padding=[dp(5), dp(10)]
+            height=dp(45),
+            spacing=dp(10)
+        )
+        self.search_input = TextInput(
+            hint_text="Rechercher dans l'historique...",
+            multiline=False,
+            text_validate_unfocus=False,
+            padding=[dp(12), dp(10)],
+            font_size='14sp'
         )
-        self.chat_layout.bind(minimum_height=self.chat_layout.setter('height'))
-        self.chat_scroll.add_widget(self.chat_layout)
+        self.search_input.bind(on_text_validate=self.search_messages)
+        self.search_status = Label(
+            size_hint_x=None,
+            width=dp(90),
+            font_size='12sp',
+            color=(0.3, 0.3, 0.3, 1)
+        )
+        close_search_btn = Button(
+            text='✕',
+            size_hint_x=None,
+            width=dp(45),
+            background_color=(0.6, 0.6, 0.6, 1),
+            background_normal=''
+        )
+        close_search_btn.bind(on_press=self.close_search)
+        self.search_bar.add_widget(self.search_input)
+        self.search_bar.add_widget(self.search_status)
+        self.search_bar.add_widget(close_search_btn)
+        
+        # Zone de chat : reçoit la vue de la conversation affichée
+        self.chat_container = BoxLayout()
         
         # Zone de saisie
         input_layout = BoxLayout(
@@ -208,7 +184,6 @@ class OkitAIApp(App):
             hint_text='Tapez votre message...',
             size_hint_x=0.65,
             multiline=False,
-            background_color=(1, 1, 1, 1),
             foreground_color=(0.1, 0.1, 0.1, 1),
             padding=[dp(15), dp(12)],
             font_size='14sp',
@@ -240,9 +215,11 @@ class OkitAIApp(App):
         input_layout.add_widget(self.voice_btn)
         input_layout.add_widget(self.send_btn)
         
+        self.restore_history()
+        
         # Assemblage final
         main_layout.add_widget(header)
-        main_layout.add_widget(self.chat_scroll)
+        main_layout.add_widget(self.chat_container)
         main_layout.add_widget(input_layout)
         
         # Initialisation différée
@@ -250,42 +227,241 @@ class OkitAIApp(App):
         
         return main_layout
     
+    def restore_history(self):
+        """Afficher le dernier écran de la conversation la plus récente"""
+        with startup_timer.phase("Reprise historique"):
+            self.store = ConversationStore(os.path.join(self.user_data_dir, 'conversations.db'))
+            self.sessions = SessionManager(
+                self.store,
+                self.create_chat_view,
+                max_hydrated=MAX_HYDRATED_SESSIONS,
+                page_size=HISTORY_PAGE_SIZE
+            )
+            self.switch_conversation(self.store.conversations(limit=1)[0].id)
+    
+    def create_chat_view(self):
+        """Vue virtualisée d'une conversation : seules les bulles visibles sont des widgets"""
+        chat_view = ChatView(size_hint=(1, 1))
+        chat_view.bind(
+            on_reach_top=self.load_older_messages,
+            on_reach_bottom=self.load_newer_messages
+        )
+        # Ajouts et compléments de messages appliqués une fois par frame
+        return chat_view, UIUpdateQueue(chat_view)
+    
+    def switch_conversation(self, conversation_id):
+        """Afficher une conversation ; sa vue est réutilisée si elle est encore en mémoire"""
+        if self.search_bar.parent:
+            self.close_search()
+        hydrated = self.sessions.get(conversation_id) is not None
+        self.show_session(self.sessions.activate(conversation_id))
+        if not hydrated:
+            Clock.schedule_once(self.scroll_to_bottom, 0)
+    
+    def new_conversation(self):
+        if self.search_bar.parent:
+            self.close_search()
+        self.show_session(self.sessions.create())
+    
+    def show_session(self, session):
+        self.session = session
+        self.chat_view = session.view
+        self.ui_queue = session.queue
+        self.chat_container.clear_widgets()
+        self.chat_container.add_widget(session.view)
+        self.update_send_button()
+        self.refresh_conversations()
+    
+    def refresh_conversations(self):
+        """Liste des conversations ; • signale une réponse arrivée en arrière-plan"""
+        self._conversation_ids = {}
+        active_label = ''
+        for conversation in self.store.conversations():
+            session = self.sessions.get(conversation.id)
+            label = conversation.title
+            if session is not None and session.unread:
+                label += ' •'
+            if label in self._conversation_ids:
+                label += f' ({conversation.id})'
+            self._conversation_ids[label] = conversation.id
+            if conversation.id == self.session.conversation_id:
+                active_label = label
+        self.conversation_spinner.values = list(self._conversation_ids) + [NEW_CONVERSATION]
+        self.conversation_spinner.text = active_label
+    
+    def on_conversation_selected(self, spinner, text):
+        if text == NEW_CONVERSATION:
+            self.new_conversation()
+            return
+        conversation_id = self._conversation_ids.get(text)
+        # Les mises à jour de la liste réaffichent la conversation courante : rien à faire
+        if conversation_id is not None and conversation_id != self.session.conversation_id:
+            self.switch_conversation(conversation_id)
+    
+    def load_older_messages(self, instance):
+        """Charger la page précédente quand on remonte en haut du chat"""
+        messages = self.store.before(self.chat_view.oldest_message_id(), HISTORY_PAGE_SIZE,
+                                     self.session.conversation_id)
+        self.ui_queue.prepend_messages(
+            [(m.text, m.role == 'user', m.id) for m in messages],
+            has_older=len(messages) == HISTORY_PAGE_SIZE
+        )
+    
+    def load_newer_messages(self, instance):
+        """Charger la page suivante quand on descend en bas d'une fenêtre de recherche"""
+        messages = self.store.after(self.chat_view.newest_message_id() or 0, HISTORY_PAGE_SIZE,
+                                    self.session.conversation_id)
+        self.ui_queue.append_page(
+            [(m.text, m.role == 'user', m.id) for m in messages],
+            has_newer=len(messages) == HISTORY_PAGE_SIZE
+        )
+    
+    def show_latest_messages(self):
+        """Revenir aux derniers messages après une recherche"""
+        messages = self.store.tail(HISTORY_PAGE_SIZE, self.session.conversation_id)
+        self.ui_queue.load_messages(
+            [(m.text, m.role == 'user', m.id) for m in messages],
+            has_older=len(messages) == HISTORY_PAGE_SIZE
+        )
+    
+    def toggle_search(self, instance):
+        if self.search_bar.parent:
+            self.close_search()
+        else:
+            # Sous l'en-tête (les enfants d'un BoxLayout sont en ordre inverse)
+            self.main_layout.add_widget(self.search_bar, index=len(self.main_layout.children) - 1)
+            self.search_input.focus = True
+    
+    def close_search(self, *args):
+        if self.search_bar.parent:
+            self.main_layout.remove_widget(self.search_bar)
+        self.search_query = ''
+        self.search_hits = []
+        self.search_status.text = ''
+        if self.chat_view.has_newer:
+            self.show_latest_messages()
+    
+    def search_messages(self, instance):
+        """Entrée : résultat le plus récent, puis les plus anciens à chaque nouvel appui"""
+        query = self.search_input.text.strip()
+        if query != self.search_query:
+            self.search_query = query
+            self.search_hits = (self.store.search(query, conversation_id=self.session.conversation_id)
+                                if query else [])
+            self.search_position = 0
+        elif self.search_hits:
+            self.search_position = (self.search_position + 1) % len(self.search_hits)
+        
+        if not self.search_hits:
+            self.search_status.text = 'Aucun résultat' if query else ''
+            return
+        self.search_status.text = f"{self.search_position + 1}/{len(self.search_hits)}"
+        self.jump_to_message(self.search_hits[self.search_position].id)
+    
+    def jump_to_message(self, message_id):
+        """Afficher un message : défilement s'il est chargé, sinon fenêtre autour de lui"""
+        if self.chat_view.scroll_to_message(message_id):
+            return
+        if self.session.active_requests:
+            # Recharger la vue effacerait la bulle de la réponse en cours (pas encore sauvegardée)
+            self.search_status.text = 'Réponse en cours...'
+            return
+        half = HISTORY_PAGE_SIZE // 2
+        before = self.store.before(message_id + 1, half + 1, self.session.conversation_id)
+        after = self.store.after(message_id, half, self.session.conversation_id)
+        self.ui_queue.load_messages(
+            [(m.text, m.role == 'user', m.id) for m in before + after],
+            has_older=len(before) == half + 1,
+            has_newer=len(after) == half,
+            focus_id=message_id
+        )
+    
+    def on_start(self):
+        startup_timer.mark("Construction UI")
+        Clock.schedule_once(lambda dt: startup_timer.mark("Première frame"), 0)
+    
+    def on_stop(self):
+        """Exporter les métriques de la session (JSON et Prometheus)"""
+        try:
+            with open(os.path.join(self.user_data_dir, 'metrics.json'), 'w') as f:
+                f.write(metrics.to_json(indent=2))
+            with open(os.path.join(self.user_data_dir, 'metrics.prom'), 'w') as f:
+                f.write(metrics.to_prometheus())
+        except OSError as e:
+            logger.warning(f"Export des métriques impossible: {e}")
+        
+        # Index sémantique conservé pour la prochaine session
+        if self.gemini_client and self.gemini_client.semantic_cache is not None:
+            self.gemini_client.semantic_cache.close()
+    
     def initialize_services(self, dt):
         """Initialiser Gemini et Voice"""
-        def init_services():
-            try:
-                self.gemini_client = GeminiClient()
-                self.voice_handler = VoiceHandlerAndroid()
-                Clock.schedule_once(lambda dt: self.add_message(
-                    "🐺 Bonjour ! Je suis Okit AI, propulsé par Gemini 2.0 Flash. " +
-                    "Comment puis-je vous aider aujourd'hui ?", False
-                ), 0)
-                logger.info("✅ Services initialisés avec succès")
-            except Exception as e:
-                error_msg = f"❌ Erreur d'initialisation: {str(e)}"
-                logger.error(error_msg)
-                Clock.schedule_once(lambda dt: self.add_message(error_msg, False), 0)
-        
-        threading.Thread(target=init_services, daemon=True).start()
+        def init_services(token):
+            with startup_timer.phase("Configuration"):
+                AppConfig.setup()
+            
+            with startup_timer.phase("Import client Gemini"):
+                from src.gemini_client import GeminiClient
+                from src.response_cache import ResponseCache
+                from src.voice_handler_android import VoiceHandlerAndroid
+                from src.voice_capture import GeminiTranscriber
+                from src.speech_output import AndroidTTSBackend
+            
+            with startup_timer.phase("Initialisation client Gemini"):
+                cache = ResponseCache(db_path=os.path.join(self.user_data_dir, 'response_cache.db'))
+                semantic_cache = None
+                if AppConfig.semantic_cache_enabled():
+                    try:
+                        from src.semantic_cache import SemanticCache
+                        semantic_cache = SemanticCache(path=os.path.join(self.user_data_dir, 'semantic_cache.npz'))
+                    except ImportError as e:
+                        logger.warning(f"Cache sémantique demandé mais indisponible: {e}")
+                self.gemini_client = GeminiClient(cache=cache, semantic_cache=semantic_cache)
+                # Contexte de chaque conversation repris de ses derniers échanges, à son premier message
+                self.sessions.context_factory = self.gemini_client.create_context
+            
+            with startup_timer.phase("Initialisation voix"):
+                tts_backend = None
+                if platform == 'android':
+                    try:
+                        tts_backend = AndroidTTSBackend()
+                    except Exception as e:
+                        logger.warning(f"Synthèse vocale indisponible: {e}")
+                self.voice_handler = VoiceHandlerAndroid(
+                    scheduler=self.scheduler,
+                    transcriber=GeminiTranscriber(self.gemini_client),
+                    tts_backend=tts_backend
+                )
+            
+            logger.info(f"✅ Services initialisés avec succès {startup_timer.report()}")
+        
+        def on_ready(_):
+            self.add_message(
+                "🐺 Bonjour ! Je suis Okit AI, propulsé par Gemini 2.0 Flash. " +
+                "Comment puis-je vous aider aujourd'hui ?", False
+            )
+        
+        def on_error(e):
+            error_msg = f"❌ Erreur d'initialisation: {str(e)}"
+            logger.error(error_msg)
+            self.add_message(error_msg, False)
+        
+        self.scheduler.submit(init_services, on_result=on_ready, on_error=on_error, block=True)
     
-    def add_message(self, text, is_user=False):
-        """Ajouter un message au chat"""
-        def add_msg(dt):
-            message = ChatBubble(text, is_user)
-            self.chat_layout.add_widget(message)
-            Clock.schedule_once(self.scroll_to_bottom, 0.1)
-        
-        Clock.schedule_once(add_msg, 0)
+    def add_message(self, text, is_user=False, message_id=None):
+        """Ajouter un message au chat (depuis n'importe quel thread)"""
+        return self.ui_queue.add_message(text, is_user, message_id)
     
     def scroll_to_bottom(self, dt):
         """Scroller vers le bas"""
-        if len(self.chat_layout.children) > 0:
-            self.chat_scroll.scroll_to(self.chat_layout.children[0])
+        self.chat_view.scroll_to_bottom()
     
     def send_message(self, instance):
         """Envoyer un message à Gemini"""
         message = self.message_input.text.strip()
         if not message:
+            # Bouton ■ : arrêter la génération en cours
+            self.stop_generation()
             return
         
         if not self.gemini_client:
@@ -293,17 +469,114 @@ class OkitAIApp(App):
             return
         
         self.message_input.text = ''
-        self.add_message(message, True)
-        
-        def get_response():
+        if self.chat_view.has_newer:
+            # Fenêtre de recherche affichée : retour aux derniers messages avant l'envoi
+            self.show_latest_messages()
+        session = self.session
+        if session.title == DEFAULT_TITLE and self.store.count(session.conversation_id) == 0:
+            # Une nouvelle conversation prend le nom de son premier message
+            session.title = message[:40]
+            self.store.rename_conversation(session.conversation_id, session.title)
+        # Contexte chargé depuis le store avant d'y ajouter le message : il ne doit
+        # pas y figurer, build(message) l'ajoute à la requête
+        self.sessions.context(session)
+        self.add_message(message, True, self.store.append('user', message, session.conversation_id))
+        self.refresh_conversations()
+        
+        self.stream_response(message)
+    
+    def stream_response(self, message):
+        """
+        Afficher la réponse de Gemini au fil de l'eau dans une seule bulle
+        La réponse appartient à la conversation courante : elle continue
+        si l'utilisateur passe à une autre conversation
+        """
+        session = self.session
+        queue = session.queue
+        context = self.sessions.context(session)
+        # Historique borné par le budget de tokens de la conversation
+        history, tokens = context.build(message)
+        metrics.histogram('chat_request_tokens').record(tokens)
+        logger.info(f"🧮 Requête chat: ~{tokens} tokens ({len(history)} tours d'historique)")
+        # Bulle créée dans la même frame que le message utilisateur, après lui
+        bubble = queue.add_message('', False)
+        # En mode vocal, la réponse est lue phrase par phrase pendant sa génération
+        voice = self.voice_handler if self.is_voice_active else None
+        if voice is not None:
+            voice.begin_reply(time.perf_counter())
+        
+        def get_response(token):
+            received = []
+            # ■ coupe la connexion ou le flux SDK, même avant le premier fragment
+            stream = self.gemini_client.generate_text_stream(message, history=history, cancel=token)
             try:
-                response = self.gemini_client.generate_text(message)
-                Clock.schedule_once(lambda dt: self.add_message(response, False), 0)
-            except Exception as e:
-                error_msg = f"❌ Erreur: {str(e)}"
-                Clock.schedule_once(lambda dt: self.add_message(error_msg, False), 0)
+                for chunk in stream:
+                    if token.cancelled:
+                        return None
+                    received.append(chunk)
+                    # Fragments fusionnés : un seul ajout de texte par frame
+                    queue.append_text(bubble, chunk)
+                    if voice is not None:
+                        voice.feed_reply(chunk)
+                if token.cancelled:
+                    return None
+                if voice is not None:
+                    voice.end_reply()
+            finally:
+                # Ferme la connexion HTTP sous-jacente en cas d'arrêt anticipé
+                stream.close()
+            
+            # Seules les réponses complètes sont sauvegardées
+            reply = ''.join(received)
+            if reply and "❌ Erreur" not in reply:
+                context.add('user', message)
+                context.add('model', reply)
+                return self.store.append('model', reply, session.conversation_id)
+            return None
+        
+        def on_result(message_id):
+            if message_id is not None:
+                queue.set_message_id(bubble, message_id)
+                if session is not self.session:
+                    session.unread += 1
+                    self.refresh_conversations()
+            finish()
+        
+        def finish(note=''):
+            if note:
+                queue.append_text(bubble, note)
+            if handle in session.active_requests:
+                session.active_requests.remove(handle)
+            # Une conversation en arrière-plan terminée peut quitter la mémoire
+            self.sessions.evict_idle()
+            self.update_send_button()
+        
+        try:
+            handle = self.scheduler.submit(
+                get_response,
+                on_result=on_result,
+                on_error=lambda e: finish(f"❌ Erreur: {str(e)}"),
+                on_cancel=lambda: finish("\n⏹️ Génération arrêtée"),
+                # Ordre de remise par conversation : une réponse courte n'attend pas une longue ailleurs
+                channel=f"chat-{session.conversation_id}"
+            )
+        except SchedulerBusyError:
+            queue.append_text(bubble, "⏳ Trop de requêtes en cours, patientez...")
+            return
         
-        threading.Thread(target=get_response, daemon=True).start()
+        session.active_requests.append(handle)
+        self.update_send_button()
+    
+    def stop_generation(self):
+        """Annuler les réponses en cours de la conversation affichée"""
+        for handle in self.session.active_requests:
+            handle.cancel()
+        if self.voice_handler:
+            self.voice_handler.interrupt()
+    
+    def update_send_button(self):
+        """Le bouton d'envoi devient ■ pendant une génération"""
+        self.send_btn.text = '■' if self.session.active_requests else '➤'
     
     def toggle_voice(self, instance):
         """Activer/désactiver la reconnaissance vocale"""
@@ -311,21 +584,35 @@ class OkitAIApp(App):
             self.add_message("❌ Service vocal non disponible", False)
             return
         
+        # Appui sur le micro : la lecture en cours s'arrête (barge-in)
+        self.voice_handler.interrupt()
+        
         if self.is_voice_active:
             self.voice_handler.stop_listening()
             self.voice_btn.background_color = (0.8, 0.2, 0.2, 1)
             self.is_voice_active = False
             self.add_message("🔇 Reconnaissance vocale désactivée", False)
         else:
-            def on_voice_result(text):
-                if text and "Erreur" not in text and "compris" not in text:
-                    self.message_input.text = text
+            def on_voice_result(text, is_final):
+                # Transcriptions partielles : affichées dans le champ de saisie
+                self.message_input.text = text
+                if is_final:
                     self.send_message(None)
             
-            self.voice_handler.start_listening(on_voice_result)
+            def on_mic_denied():
+                # Réponse de la demande de permission : hors du thread Kivy
+                Clock.schedule_once(lambda dt: self.voice_denied(), 0)
+            
+            self.voice_handler.start_listening(on_voice_result, on_denied=on_mic_denied)
             self.voice_btn.background_color = (0.2, 0.8, 0.2, 1)
             self.is_voice_active = True
             self.add_message("🎤 Parlez maintenant...", False)
 
+    def voice_denied(self):
+        """Accès au micro refusé : le bouton revient à l'état inactif"""
+        self.voice_btn.background_color = (0.8, 0.2, 0.2, 1)
+        self.is_voice_active = False
+        self.add_message("❌ Accès au micro refusé : autorisez-le dans les paramètres Android", False)
+
 if __name__ == '__main__':
     OkitAIApp().run()
\ No newline at end of file
@@ -0,0 +1,30 @@
+"""
+Okit AI - Package principal
+IA multimodale avec Gemini 2.0 Flash et interface vocale
+"""
+
+import importlib
+
+__version__ = "2.0.0"
+__author__ = "Okit AI Team"
+__description__ = "Assistant IA multimodal avec Gemini 2.0 Flash"
+
+# Imports différés : le SDK réseau n'est chargé qu'au premier accès,
+# pour que la première frame s'affiche avant
+_LAZY_ATTRIBUTES = {
+    'GeminiClient': '.gemini_client',
+    'VoiceHandlerAndroid': '.voice_handler_android',
+}
+
+__all__ = ['GeminiClient', 'VoiceHandlerAndroid']
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
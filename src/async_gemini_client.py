@@ -0,0 +1,237 @@
+"""
+Client Gemini asynchrone (asyncio)
+Toutes les requêtes partagent une boucle d'événements et un pool de connexions.
+Intégration Kivy : lancer l'app avec `await app.async_run(async_lib='asyncio')`.
+"""
+import asyncio
+import os
+import logging
+import time
+from typing import AsyncIterator, List, Optional
+
+from .config import AppConfig
+from . import gemini_rest
+from .gemini_rest import DEFAULT_BASE_URL
+from .image_pipeline import ImagePipeline, UnreadableImageError
+from .errors import InvalidRequestError, NetworkError, classify_exception, error_from_status
+from .retry_policy import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+class AsyncGeminiClient:
+    def __init__(self, api_key: Optional[str] = None,
+                 base_url: str = DEFAULT_BASE_URL,
+                 pool_size: int = 32,
+                 connect_timeout: float = 5.0,
+                 read_timeout: float = 30.0,
+                 keepalive_timeout: float = 60.0,
+                 image_pipeline: Optional[ImagePipeline] = None,
+                 retry_policy: Optional[RetryPolicy] = None):
+        """Initialise le client asynchrone Gemini 2.0 Flash (API REST)"""
+        if api_key is None:
+            AppConfig.setup()
+
+        # Priorité: paramètre > environnement > config intégrée
+        self.api_key = api_key or os.getenv('GEMINI_API_KEY')
+
+        if not self.api_key:
+            raise ValueError(
+                "Clé API Gemini non trouvée. "
+                "Le build GitHub doit inclure la clé API."
+            )
+
+        self.api_url = gemini_rest.generate_url(base_url)
+        self.stream_api_url = gemini_rest.stream_url(base_url)
+
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.keepalive_timeout = keepalive_timeout
+
+        # Session créée à la première requête, dans la boucle active
+        self._session = None
+        self.history: List[dict] = []
+        self.image_pipeline = image_pipeline or ImagePipeline()
+        self.retry_policy = retry_policy or RetryPolicy()
+
+        logger.info("✅ Client Gemini 2.0 Flash asynchrone initialisé")
+
+    async def _get_session(self):
+        """Retourne la session HTTP partagée (pool keep-alive)"""
+        if self._session is None or self._session.closed:
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            timeout = aiohttp.ClientTimeout(
+                sock_connect=self.connect_timeout,
+                sock_read=self.read_timeout
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    async def generate_text(self, prompt: str, image_path: Optional[str] = None) -> str:
+        """
+        Génère du texte avec Gemini 2.0 Flash
+        """
+        try:
+            return await self.complete(prompt, image_path)
+        except Exception as e:
+            logger.error(f"❌ Erreur génération: {e}")
+            return f"❌ Erreur: {str(e)}"
+
+    async def complete(self, prompt: str, image_path: Optional[str] = None,
+                       history: Optional[List[dict]] = None) -> str:
+        """
+        Comme generate_text, mais les erreurs sont levées (GeminiError)
+        history: tours précédents d'une session, au format start_chat
+        """
+        start_time = time.time()
+        extra_parts = []
+        if image_path and os.path.exists(image_path):
+            logger.info(f"🖼️  Analyse d'image: {image_path}")
+            extra_parts.append(await self._load_image_part(image_path))
+        else:
+            logger.info(f"💬 Prompt: {prompt[:80]}...")
+
+        response = await self._post(gemini_rest.prompt_payload(prompt, extra_parts, history))
+
+        response_time = time.time() - start_time
+        logger.info(f"⏱️  Réponse reçue en {response_time:.2f}s")
+        return response
+
+    async def generate_text_stream(self, prompt: str, image_path: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Génère du texte en streaming (SSE)
+        Les fragments sont produits dès leur réception
+        """
+        has_emitted = False
+
+        try:
+            async for chunk in self.stream(prompt, image_path):
+                has_emitted = True
+                yield chunk
+
+        except Exception as e:
+            logger.error(f"❌ Erreur génération (stream): {e}")
+            prefix = "\n" if has_emitted else ""
+            yield f"{prefix}❌ Erreur: {str(e)}"
+
+    async def stream(self, prompt: str, image_path: Optional[str] = None,
+                     history: Optional[List[dict]] = None) -> AsyncIterator[str]:
+        """Comme generate_text_stream, mais les erreurs sont levées (GeminiError)"""
+        start_time = time.time()
+        extra_parts = []
+        if image_path and os.path.exists(image_path):
+            extra_parts.append(await self._load_image_part(image_path))
+
+        has_emitted = False
+        async for chunk in self._stream(gemini_rest.prompt_payload(prompt, extra_parts, history)):
+            if not has_emitted:
+                logger.info(f"⚡ Premier fragment reçu en {time.time() - start_time:.2f}s")
+                has_emitted = True
+            yield chunk
+
+    async def _post(self, payload: dict) -> str:
+        """POST generateContent, rejoué sur 429/503 et erreurs réseau"""
+        return await self.retry_policy.call_async(lambda: self._post_once(payload))
+
+    async def _post_once(self, payload: dict) -> str:
+        session = await self._get_session()
+        try:
+            async with session.post(self.api_url, headers=gemini_rest.headers(self.api_key), json=payload) as response:
+                if response.status != 200:
+                    detail = await response.text()
+                    logger.error(f"API Error {response.status}: {detail}")
+                    raise error_from_status(response.status, detail, response.headers)
+                return gemini_rest.extract_text(await response.json())
+        except Exception as e:
+            raise _classify_client_error(e) from e
+
+    async def _stream(self, payload: dict) -> AsyncIterator[str]:
+        """POST streamGenerateContent et lecture des lignes SSE"""
+        session = await self._get_session()
+
+        async def open_stream():
+            # Seule l'ouverture est rejouée : aucun fragment n'a encore été produit
+            try:
+                response = await session.post(self.stream_api_url, headers=gemini_rest.headers(self.api_key), json=payload)
+            except Exception as e:
+                raise _classify_client_error(e) from e
+            if response.status != 200:
+                detail = await response.text()
+                logger.error(f"API Error {response.status}: {detail}")
+                response.release()
+                raise error_from_status(response.status, detail, response.headers)
+            return response
+
+        response = await self.retry_policy.call_async(open_stream)
+        try:
+            async for raw_line in response.content:
+                text = gemini_rest.parse_sse_line(raw_line.decode('utf-8').strip())
+                if text:
+                    yield text
+        except Exception as e:
+            raise _classify_client_error(e) from e
+        finally:
+            response.release()
+
+    async def _load_image_part(self, image_path: str) -> dict:
+        """Réduit et encode l'image hors de la boucle, en partie inline_data"""
+        loop = asyncio.get_running_loop()
+        try:
+            prepared = await loop.run_in_executor(None, self.image_pipeline.prepare, image_path)
+        except UnreadableImageError as e:
+            # Erreur du client (400), pas du service
+            raise InvalidRequestError(str(e)) from e
+        return gemini_rest.image_part(prepared.data, prepared.mime_type)
+
+    def start_chat(self, history: Optional[List[dict]] = None):
+        """Démarrer une session de chat"""
+        self.history = list(history or [])
+        logger.info("💬 Session de chat démarrée")
+
+    async def send_message(self, message: str) -> str:
+        """Envoyer un message dans le chat"""
+        turn = {"role": "user", "parts": [gemini_rest.text_part(message)]}
+
+        try:
+            reply = await self._post(gemini_rest.build_payload(self.history + [turn]))
+        except Exception as e:
+            return f"Erreur chat: {str(e)}"
+
+        # L'historique n'est mis à jour qu'après une réponse valide
+        self.history.append(turn)
+        self.history.append({"role": "model", "parts": [gemini_rest.text_part(reply)]})
+        return reply
+
+    async def check_api_status(self) -> bool:
+        """Vérifier si l'API fonctionne"""
+        try:
+            test_response = await self.generate_text("Réponds juste par 'OK'")
+            return "OK" in test_response.upper()
+        except Exception:
+            return False
+
+    async def close(self):
+        """Ferme le pool de connexions"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self.image_pipeline.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+def _classify_client_error(error: Exception):
+    """Erreurs aiohttp (dont déconnexions hors OSError) en GeminiError"""
+    import aiohttp
+
+    if isinstance(error, (aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+        return NetworkError(f"Erreur API REST: {error}")
+    return classify_exception(error, "Erreur API REST")
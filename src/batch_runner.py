@@ -0,0 +1,119 @@
+"""
+Traitement par lots de prompts (scripts, traitements hors ligne)
+Requêtes concurrentes sous limite de débit, résultats produits dès leur
+arrivée, reprise possible grâce à un fichier de points de contrôle JSONL
+"""
+import hashlib
+import json
+import os
+import threading
+import logging
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, Optional, Sequence
+
+from .rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+BatchResult = namedtuple('BatchResult', ['index', 'prompt', 'text', 'ok'])
+
+def _prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16]
+
+class BatchCheckpoint:
+    def __init__(self, path: str):
+        """
+        Journal JSONL des résultats réussis : une ligne par prompt terminé
+        Une ligne tronquée par une interruption est ignorée à la relecture
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self, prompts: Sequence[str]) -> Dict[int, str]:
+        """Résultats déjà obtenus, par index (seulement si le prompt est identique)"""
+        done = {}
+        if not os.path.exists(self.path):
+            return done
+
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    index = entry['index']
+                except (ValueError, KeyError):
+                    continue
+                if 0 <= index < len(prompts) and entry.get('hash') == _prompt_hash(prompts[index]):
+                    done[index] = entry['text']
+        return done
+
+    def record(self, index: int, prompt: str, text: str):
+        line = json.dumps(
+            {'index': index, 'hash': _prompt_hash(prompt), 'text': text},
+            ensure_ascii=False
+        )
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+def run_batch(fn: Callable[[str], str], prompts: Sequence[str],
+              max_concurrency: int = 4,
+              requests_per_minute: Optional[float] = None,
+              checkpoint_path: Optional[str] = None,
+              is_error: Callable[[str], bool] = lambda text: text.startswith("❌")) -> Iterator[BatchResult]:
+    """
+    Exécute fn(prompt) pour chaque prompt et produit les BatchResult dans
+    l'ordre d'achèvement (les résultats repris du point de contrôle d'abord)
+
+    Les résultats en erreur ne sont pas enregistrés : une reprise les retente.
+    """
+    prompts = list(prompts)
+    checkpoint = BatchCheckpoint(checkpoint_path) if checkpoint_path else None
+    done = checkpoint.load(prompts) if checkpoint else {}
+    if done:
+        logger.info(f"📦 Reprise du lot : {len(done)}/{len(prompts)} déjà traités")
+
+    for index in sorted(done):
+        yield BatchResult(index, prompts[index], done[index], True)
+
+    limiter = TokenBucket.per_minute(requests_per_minute) if requests_per_minute else None
+    pending_indexes = iter([i for i in range(len(prompts)) if i not in done])
+
+    def call(index):
+        if limiter is not None:
+            limiter.acquire()
+        return fn(prompts[index])
+
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+    in_flight = {}
+    try:
+        # Au plus max_concurrency requêtes soumises : le débit est lissé par le seau
+        for index in pending_indexes:
+            in_flight[executor.submit(call, index)] = index
+            if len(in_flight) >= max_concurrency:
+                break
+
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index = in_flight.pop(future)
+                try:
+                    text = future.result()
+                    ok = not is_error(text)
+                except Exception as e:
+                    text, ok = f"❌ Erreur: {str(e)}", False
+
+                if ok and checkpoint is not None:
+                    checkpoint.record(index, prompts[index], text)
+                yield BatchResult(index, prompts[index], text, ok)
+
+                next_index = next(pending_indexes, None)
+                if next_index is not None:
+                    in_flight[executor.submit(call, next_index)] = next_index
+    finally:
+        # Générateur abandonné : les requêtes non démarrées sont annulées
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -0,0 +1,127 @@
+"""
+Fenêtre de contexte des sessions de chat
+Garde l'historique envoyé au modèle sous un budget de tokens :
+tours épinglés, fenêtre glissante et résumé optionnel des anciens tours
+"""
+import re
+import logging
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Coût fixe approximatif d'un tour (rôle, séparateurs)
+TURN_OVERHEAD = 4
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimation locale rapide du nombre de tokens
+    Un token par mot ou signe, les mots longs comptant ~1 token par 4 caractères
+    """
+    count = 0
+    for match in _TOKEN_PATTERN.finditer(text):
+        count += 1 + (len(match.group()) - 1) // 4
+    return count
+
+class _Turn:
+    __slots__ = ('role', 'text', 'tokens')
+
+    def __init__(self, role: str, text: str):
+        self.role = role
+        self.text = text
+        self.tokens = estimate_tokens(text) + TURN_OVERHEAD
+
+    def to_content(self) -> dict:
+        return {'role': self.role, 'parts': [self.text]}
+
+class ContextWindow:
+    def __init__(self, token_budget: int = 8000, pinned: Optional[List[dict]] = None,
+                 summarizer: Optional[Callable[[str, List[dict]], str]] = None):
+        """
+        token_budget: tokens maximum envoyés par requête (historique + message)
+        pinned: tours toujours envoyés en tête (persona, consignes)
+        summarizer: summarizer(résumé_précédent, tours_évincés) -> nouveau résumé
+        """
+        self.token_budget = token_budget
+        self.pinned = [_Turn(turn['role'], _content_text(turn)) for turn in pinned or []]
+        self.summarizer = summarizer
+        self.summary = ''
+        self.turns: List[_Turn] = []
+
+    @classmethod
+    def from_history(cls, history: Optional[List[dict]], **kwargs) -> 'ContextWindow':
+        """Crée une fenêtre à partir d'un historique au format start_chat"""
+        window = cls(**kwargs)
+        # Pas de résumé à la reprise : la fenêtre glissante suffit pour l'envoi
+        window.turns = [_Turn(turn['role'], _content_text(turn)) for turn in history or []]
+        return window
+
+    def add(self, role: str, text: str):
+        """Ajoute un tour ('user' ou 'model')"""
+        self.turns.append(_Turn(role, text))
+        self._compact()
+
+    def _header(self) -> List[_Turn]:
+        header = list(self.pinned)
+        if self.summary:
+            header.append(_Turn('user', f"Résumé de notre conversation précédente : {self.summary}"))
+            header.append(_Turn('model', "Compris, je garde ce contexte en tête."))
+        return header
+
+    def _compact(self):
+        """Résume les anciens tours quand l'historique dépasse le budget"""
+        # Au moins deux échanges, pour toujours garder le dernier intact
+        if self.summarizer is None or len(self.turns) < 4:
+            return
+
+        header_tokens = sum(turn.tokens for turn in self._header())
+        total = header_tokens + sum(turn.tokens for turn in self.turns)
+        if total <= self.token_budget:
+            return
+
+        # Évince la moitié la plus ancienne, par paires question/réponse
+        evict = len(self.turns) // 2
+        evict -= evict % 2
+        evicted, remaining = self.turns[:evict], self.turns[evict:]
+        try:
+            self.summary = self.summarizer(self.summary, [turn.to_content() for turn in evicted])
+            self.turns = remaining
+            logger.info(f"🧾 {len(evicted)} tours résumés")
+        except Exception as e:
+            # Sans résumé, la fenêtre glissante reste la seule protection
+            logger.warning(f"Résumé impossible: {e}")
+
+    def build(self, message: str) -> Tuple[List[dict], int]:
+        """
+        Historique à envoyer avec `message` et estimation des tokens de la requête
+
+        Les tours les plus récents sont gardés tant que le budget le permet ;
+        l'historique commence toujours par un tour utilisateur.
+        """
+        header = self._header()
+        used = sum(turn.tokens for turn in header) + estimate_tokens(message) + TURN_OVERHEAD
+
+        window = []
+        for turn in reversed(self.turns):
+            if used + turn.tokens > self.token_budget:
+                break
+            window.append(turn)
+            used += turn.tokens
+        window.reverse()
+
+        while window and window[0].role != 'user':
+            used -= window.pop(0).tokens
+
+        return [turn.to_content() for turn in header + window], used
+
+    def clear(self):
+        self.turns = []
+        self.summary = ''
+
+def _content_text(turn: dict) -> str:
+    """Texte d'un tour {'role', 'parts'} (parties texte seulement)"""
+    return ''.join(
+        part if isinstance(part, str) else part.get('text', '')
+        for part in turn.get('parts', [])
+    )
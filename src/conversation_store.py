@@ -0,0 +1,225 @@
+"""
+Historique persistant des conversations Okit AI
+Journal SQLite en mode WAL : ajouts seulement, résistant aux crashs,
+lecture paginée par index (conversation_id, id)
+Recherche plein texte par index inversé FTS5, tenu à jour par trigger
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+import logging
+from collections import namedtuple
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONVERSATION = 1
+
+StoredMessage = namedtuple('StoredMessage', ['id', 'role', 'text', 'created_at'])
+Conversation = namedtuple('Conversation', ['id', 'title', 'updated_at'])
+
+DEFAULT_TITLE = "Conversation"
+
+_SEARCH_TERM = re.compile(r'\w+')
+
+def fts_query(text: str) -> str:
+    """
+    Requête FTS5 : chaque mot saisi devient un préfixe (« pro » trouve « programme »),
+    tous requis ; les guillemets neutralisent la syntaxe FTS5
+    """
+    return ' '.join(f'"{term}"*' for term in _SEARCH_TERM.findall(text))
+
+class ConversationStore:
+    def __init__(self, db_path: str):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        # WAL : écritures atomiques sans bloquer les lectures ; NORMAL suffit en WAL
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "conversation_id INTEGER NOT NULL, "
+            "role TEXT NOT NULL, "
+            "text TEXT NOT NULL, "
+            "created_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS messages_conversation ON messages (conversation_id, id)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS conversations ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "title TEXT NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "updated_at REAL NOT NULL)"
+        )
+        # Conversation historique (messages antérieurs aux conversations multiples)
+        now = time.time()
+        self._db.execute(
+            "INSERT OR IGNORE INTO conversations (id, title, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            (DEFAULT_CONVERSATION, DEFAULT_TITLE, now, now)
+        )
+        self.search_enabled = self._create_search_index()
+        self._db.commit()
+        logger.info(f"🗄️  Historique ouvert: {db_path}")
+
+    def _create_search_index(self) -> bool:
+        """
+        Index inversé des messages (table FTS5 à contenu externe)
+        unicode61 sans diacritiques : « ete » trouve « été » ; index de préfixes
+        de 2 et 3 caractères pour les recherches pendant la saisie
+        """
+        exists = self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'"
+        ).fetchone()
+        # remove_diacritics 2 (SQLite >= 3.27) gère aussi les lettres composées
+        for remove_diacritics in (2, 1):
+            try:
+                self._db.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5("
+                    "text, content='messages', content_rowid='id', "
+                    f"tokenize='unicode61 remove_diacritics {remove_diacritics}', prefix='2 3')"
+                )
+                break
+            except sqlite3.OperationalError as e:
+                error = e
+        else:
+            logger.warning(f"Recherche plein texte indisponible (FTS5): {error}")
+            return False
+
+        # Mise à jour incrémentale : chaque message ajouté est indexé dans la même transaction
+        self._db.execute(
+            "CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN "
+            "INSERT INTO messages_fts (rowid, text) VALUES (new.id, new.text); END"
+        )
+        self._db.execute(
+            "CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN "
+            "INSERT INTO messages_fts (messages_fts, rowid, text) VALUES ('delete', old.id, old.text); END"
+        )
+        if not exists:
+            # Historique antérieur à l'index
+            self._db.execute("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')")
+        return True
+
+    def append(self, role: str, text: str, conversation_id: int = DEFAULT_CONVERSATION) -> int:
+        """Ajoute un message ('user' ou 'model') et retourne son id"""
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO messages (conversation_id, role, text, created_at) VALUES (?, ?, ?, ?)",
+                (conversation_id, role, text, now)
+            )
+            self._db.execute("UPDATE conversations SET updated_at = ? WHERE id = ?", (now, conversation_id))
+            self._db.commit()
+            return cursor.lastrowid
+
+    def create_conversation(self, title: str = DEFAULT_TITLE) -> int:
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO conversations (title, created_at, updated_at) VALUES (?, ?, ?)",
+                (title, now, now)
+            )
+            self._db.commit()
+            return cursor.lastrowid
+
+    def rename_conversation(self, conversation_id: int, title: str):
+        with self._lock:
+            self._db.execute("UPDATE conversations SET title = ? WHERE id = ?", (title, conversation_id))
+            self._db.commit()
+
+    def conversations(self, limit: int = 50) -> List[Conversation]:
+        """Conversations, de la plus récemment active à la plus ancienne"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, title, updated_at FROM conversations ORDER BY updated_at DESC, id DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [Conversation(*row) for row in rows]
+
+    def conversation(self, conversation_id: int):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, title, updated_at FROM conversations WHERE id = ?", (conversation_id,)
+            ).fetchone()
+        return Conversation(*row) if row else None
+
+    def tail(self, limit: int = 30, conversation_id: int = DEFAULT_CONVERSATION) -> List[StoredMessage]:
+        """Derniers messages, du plus ancien au plus récent"""
+        return self._page(
+            "SELECT id, role, text, created_at FROM messages WHERE conversation_id = ? "
+            "ORDER BY id DESC LIMIT ?",
+            (conversation_id, limit)
+        )
+
+    def before(self, message_id: int, limit: int = 30,
+               conversation_id: int = DEFAULT_CONVERSATION) -> List[StoredMessage]:
+        """Page de messages antérieurs à message_id, du plus ancien au plus récent"""
+        return self._page(
+            "SELECT id, role, text, created_at FROM messages WHERE conversation_id = ? AND id < ? "
+            "ORDER BY id DESC LIMIT ?",
+            (conversation_id, message_id, limit)
+        )
+
+    def after(self, message_id: int, limit: int = 30,
+              conversation_id: int = DEFAULT_CONVERSATION) -> List[StoredMessage]:
+        """Page de messages postérieurs à message_id, du plus ancien au plus récent"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, role, text, created_at FROM messages WHERE conversation_id = ? AND id > ? "
+                "ORDER BY id LIMIT ?",
+                (conversation_id, message_id, limit)
+            ).fetchall()
+        return [StoredMessage(*row) for row in rows]
+
+    def search(self, query: str, limit: int = 100,
+               conversation_id: int = DEFAULT_CONVERSATION) -> List[StoredMessage]:
+        """
+        Messages contenant tous les mots de `query` (préfixes, sans accents),
+        du plus récent au plus ancien
+        """
+        match = fts_query(query)
+        if not match or not self.search_enabled:
+            return []
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT m.id, m.role, m.text, m.created_at FROM messages_fts "
+                "JOIN messages m ON m.id = messages_fts.rowid "
+                "WHERE messages_fts MATCH ? AND m.conversation_id = ? "
+                "ORDER BY messages_fts.rowid DESC LIMIT ?",
+                (match, conversation_id, limit)
+            ).fetchall()
+        return [StoredMessage(*row) for row in rows]
+
+    def _page(self, query: str, params: tuple) -> List[StoredMessage]:
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [StoredMessage(*row) for row in reversed(rows)]
+
+    def chat_history(self, max_messages: int = 20,
+                     conversation_id: int = DEFAULT_CONVERSATION) -> List[dict]:
+        """Historique au format start_chat(history=...), limité aux derniers échanges"""
+        messages = self.tail(max_messages, conversation_id)
+        # L'historique Gemini doit commencer par un tour utilisateur
+        while messages and messages[0].role != 'user':
+            messages.pop(0)
+        return [{'role': m.role, 'parts': [m.text]} for m in messages]
+
+    def count(self, conversation_id: int = DEFAULT_CONVERSATION) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM messages WHERE conversation_id = ?", (conversation_id,)
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,87 @@
+"""
+Erreurs de l'API Gemini classées en réessayables et fatales
+"""
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+class GeminiError(Exception):
+    """Erreur d'appel à Gemini ; `retryable` indique si un nouvel essai a un sens"""
+    retryable = False
+
+    def __init__(self, message: str, status: Optional[int] = None,
+                 retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+class RateLimitError(GeminiError):
+    """429 : quota ou débit dépassé"""
+    retryable = True
+
+class ServiceUnavailableError(GeminiError):
+    """500/502/503/504 : surcharge ou panne temporaire du service"""
+    retryable = True
+
+class NetworkError(GeminiError):
+    """Connexion refusée, coupée ou délai dépassé"""
+    retryable = True
+
+class CancelledError(GeminiError):
+    """Requête abandonnée par l'appelant (CancellationToken) : jamais rejouée"""
+
+class AuthenticationError(GeminiError):
+    """401/403 : clé API invalide ou non autorisée"""
+
+class InvalidRequestError(GeminiError):
+    """400/404/413 : requête refusée, inutile de la rejouer"""
+
+RETRYABLE_STATUSES = {429: RateLimitError, 500: ServiceUnavailableError,
+                      502: ServiceUnavailableError, 503: ServiceUnavailableError,
+                      504: ServiceUnavailableError}
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """En-tête Retry-After (secondes ou date HTTP) en secondes d'attente"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def error_from_status(status: int, detail: str = '',
+                      headers: Optional[Mapping[str, str]] = None) -> GeminiError:
+    """Erreur typée correspondant à une réponse HTTP en échec"""
+    retry_after = parse_retry_after((headers or {}).get('Retry-After'))
+    message = f"API Error {status}" + (f": {detail[:200]}" if detail else '')
+
+    if status in RETRYABLE_STATUSES:
+        return RETRYABLE_STATUSES[status](message, status, retry_after)
+    if status in (401, 403):
+        return AuthenticationError(message, status)
+    if 400 <= status < 500:
+        return InvalidRequestError(message, status)
+    return ServiceUnavailableError(message, status, retry_after)
+
+def classify_exception(error: Exception, context: str = '') -> GeminiError:
+    """
+    Convertit une exception quelconque (SDK, transport) en GeminiError
+    Les exceptions du SDK Google portent le statut HTTP dans `code`
+    """
+    if isinstance(error, GeminiError):
+        return error
+
+    message = f"{context}: {error}" if context else str(error)
+    status = getattr(error, 'code', None)
+    if isinstance(status, int) and 400 <= status < 600:
+        classified = error_from_status(status)
+        return type(classified)(message, status)
+    if isinstance(error, (OSError, TimeoutError)):
+        # requests et aiohttp dérivent leurs erreurs réseau d'OSError
+        return NetworkError(message)
+    return GeminiError(message)
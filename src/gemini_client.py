@@ -1,18 +1,48 @@
-import google.generativeai as genai
 import os
 import logging
-from typing import Optional
-import requests
-import json
+from typing import Iterator, List, Optional, Sequence
 import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
 
 # Import de la configuration
 from .config import AppConfig
+from .http_transport import ConnectionAbort, HttpTransport
+from .response_cache import ResponseCache, make_cache_key
+from .semantic_cache import SemanticCache
+from .context_window import ContextWindow
+from .image_pipeline import ImagePipeline
+from .path_health import PathSelector
+from .batch_runner import BatchResult, run_batch
+from .errors import CancelledError, classify_exception, error_from_status
+from .request_scheduler import CancellationToken
+from .retry_policy import AdaptiveConcurrency, RetryPolicy
+from .metrics import metrics
+from . import gemini_rest
+from .gemini_rest import DEFAULT_BASE_URL, DEFAULT_GENERATION_CONFIG
 
 logger = logging.getLogger(__name__)
 
+TRANSCRIPTION_PROMPT = (
+    "Transcris exactement les paroles de cet enregistrement, dans leur langue d'origine. "
+    "Réponds uniquement par la transcription, sans commentaire."
+)
+
 class GeminiClient:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None,
+                 transport: Optional[HttpTransport] = None,
+                 base_url: str = DEFAULT_BASE_URL,
+                 cache: Optional[ResponseCache] = None,
+                 context_budget: int = 8000,
+                 summarize_history: bool = False,
+                 image_pipeline: Optional[ImagePipeline] = None,
+                 hedge_requests: bool = False,
+                 hedge_delay: float = 2.0,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 concurrency: Optional[AdaptiveConcurrency] = None,
+                 path_selector: Optional[PathSelector] = None,
+                 semantic_cache: Optional[SemanticCache] = None):
         """Initialise le client Gemini avec Gemini 2.0 Flash"""
         # Configuration automatique
         AppConfig.setup()
@@ -27,13 +57,50 @@ class GeminiClient:
             )
         
         try:
+            # Import différé : le SDK est lourd à charger au démarrage
+            import google.generativeai as genai
+            
             genai.configure(api_key=self.api_key)
             
             # Utilisation de Gemini 2.0 Flash
-            self.model = genai.GenerativeModel('gemini-2.0-flash')
+            self.model = genai.GenerativeModel(gemini_rest.MODEL_NAME)
             
             # URL pour l'API REST (fallback)
-            self.api_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
+            self.api_url = gemini_rest.generate_url(base_url)
+            self.stream_api_url = gemini_rest.stream_url(base_url)
+            
+            # Connexions keep-alive partagées par tous les appels REST
+            self.transport = transport or HttpTransport()
+            
+            # Cache de réponses optionnel (désactivé par défaut)
+            self.cache = cache
+            # Questions proches d'une question déjà posée (texte seul, optionnel)
+            self.semantic_cache = semantic_cache
+            
+            # Budget de tokens de l'historique envoyé par send_message
+            self.context_budget = context_budget
+            self.summarize_history = summarize_history
+            self.last_request_tokens = 0
+            
+            # Images réduites et ré-encodées hors du thread appelant
+            self.image_pipeline = image_pipeline or ImagePipeline()
+            
+            # Disjoncteur par chemin : les requêtes vont directement au chemin sain
+            self.path_selector = path_selector or PathSelector(('sdk', 'rest'))
+            
+            # 429/503 : nouvelles tentatives espacées et concurrence réduite (AIMD)
+            self.retry_policy = retry_policy or RetryPolicy()
+            self.concurrency = concurrency or AdaptiveConcurrency()
+            
+            # Requêtes couvertes : second chemin lancé si le premier dépasse son p95
+            self.hedge_requests = hedge_requests
+            self.hedge_delay = hedge_delay
+            # Deux appels (principal et couverture) par requête admise par le limiteur :
+            # un principal n'attend jamais un thread libre
+            self._hedge_executor = ThreadPoolExecutor(
+                max_workers=2 * self.concurrency.max_limit,
+                thread_name_prefix='okit-hedge'
+            ) if hedge_requests else None
             
             logger.info("✅ Client Gemini 2.0 Flash initialisé")
             
@@ -46,91 +113,499 @@ class GeminiClient:
         Génère du texte avec Gemini 2.0 Flash
         """
         try:
-            start_time = time.time()
+            semantic = self.semantic_cache if not image_path else None
+            if semantic is not None:
+                cached = semantic.get(prompt)
+                if cached is not None:
+                    return cached
             
-            if image_path and os.path.exists(image_path):
-                logger.info(f"🖼️  Analyse d'image: {image_path}")
-                response = self._generate_with_image(prompt, image_path)
+            if self.cache is None:
+                text = self._generate(prompt, image_path)
             else:
-                logger.info(f"💬 Prompt: {prompt[:80]}...")
-                response = self._generate_text_only(prompt)
-            
-            response_time = time.time() - start_time
-            logger.info(f"⏱️  Réponse reçue en {response_time:.2f}s")
-            
-            return response
+                # Les prompts identiques simultanés partagent une seule requête
+                text = self.cache.get_or_compute(
+                    self._cache_key(prompt, image_path),
+                    lambda: self._generate(prompt, image_path)
+                )
             
+            if semantic is not None:
+                semantic.put(prompt, text)
+            return text
         except Exception as e:
-            logger.error(f"❌ Erreur génération: {e}")
-            # Fallback vers l'API REST
+            return f"❌ Erreur: {str(e)}"
+    
+    def iter_batch(self, prompts: Sequence[str], max_concurrency: int = 4,
+                   requests_per_minute: Optional[float] = None,
+                   checkpoint_path: Optional[str] = None) -> Iterator[BatchResult]:
+        """
+        Traite une liste de prompts en parallèle
+        Produit les BatchResult(index, prompt, text, ok) dès leur achèvement
+        """
+        return run_batch(
+            self.generate_text, prompts,
+            max_concurrency=max_concurrency,
+            requests_per_minute=requests_per_minute,
+            checkpoint_path=checkpoint_path
+        )
+    
+    def generate_batch(self, prompts: Sequence[str], max_concurrency: int = 4,
+                       requests_per_minute: Optional[float] = None,
+                       checkpoint_path: Optional[str] = None,
+                       on_result=None) -> List[str]:
+        """
+        Traite une liste de prompts en parallèle, résultats dans l'ordre d'entrée
+        
+        on_result(BatchResult) est appelé à chaque achèvement ;
+        checkpoint_path permet de reprendre un lot interrompu
+        """
+        results = [None] * len(prompts)
+        for result in self.iter_batch(prompts, max_concurrency, requests_per_minute, checkpoint_path):
+            results[result.index] = result.text
+            if on_result:
+                on_result(result)
+        return results
+    
+    def _generate(self, prompt: str, image_path: Optional[str] = None) -> str:
+        """Génération via le chemin le plus sain ; lève une exception si tous échouent"""
+        if image_path and os.path.exists(image_path):
+            logger.info(f"🖼️  Analyse d'image: {image_path}")
+        else:
+            logger.info(f"💬 Prompt: {prompt[:80]}...")
+            image_path = None
+        
+        paths = self.path_selector.order()
+        if self.hedge_requests and len(paths) > 1:
+            return self._generate_hedged(prompt, image_path, paths)
+        
+        last_error = None
+        for i, path in enumerate(paths):
+            is_last = i == len(paths) - 1
+            if not self.path_selector.breakers[path].allow_request() and not is_last:
+                continue
+            try:
+                # Un autre chemin reste à essayer : bascule immédiate plutôt que nouvelles tentatives
+                return self._call_path(path, prompt, image_path, retry=is_last)
+            except Exception as e:
+                logger.error(f"❌ Erreur génération ({path}): {e}")
+                last_error = e
+        raise last_error
+    
+    def _call_path(self, path: str, prompt: str, image_path: Optional[str] = None,
+                   retry: bool = True) -> str:
+        """
+        Appel sur un chemin donné et mise à jour de son disjoncteur
+        retry: nouvelles tentatives sur les erreurs temporaires (dernier chemin
+        seulement : sinon le repli attendrait jusqu'à l'échéance de RetryPolicy)
+        """
+        breaker = self.path_selector.breakers[path]
+        if path == 'rest':
+            call = lambda: self._generate_via_rest_api(prompt, image_path)
+        elif image_path:
+            call = lambda: self._generate_with_image(prompt, image_path)
+        else:
+            call = lambda: self._generate_text_only(prompt)
+        
+        labels = {'path': path, 'kind': 'image' if image_path else 'text'}
+        attempts = 0
+        
+        def attempt():
+            nonlocal attempts
+            attempts += 1
+            if attempts > 1:
+                metrics.counter('gemini_retries_total', **labels).inc()
+            queued = time.perf_counter()
+            with self.concurrency.slot():
+                metrics.histogram('queue_wait_seconds', queue='concurrency', **labels).record(
+                    time.perf_counter() - queued)
+                return call()
+        
+        start_time = time.time()
+        try:
+            response = self.retry_policy.call(attempt) if retry else attempt()
+        except Exception as e:
+            breaker.record_failure()
+            metrics.counter('gemini_errors_total', error=type(e).__name__, **labels).inc()
+            raise
+        
+        response_time = time.time() - start_time
+        breaker.record_success(response_time)
+        self._record_success(labels, 'unary', response_time)
+        logger.info(f"⏱️  Réponse reçue en {response_time:.2f}s ({path})")
+        return response
+    
+    def _record_success(self, labels: dict, mode: str, response_time: float):
+        metrics.histogram('gemini_request_seconds', mode=mode, **labels).record(response_time)
+        if labels['path'] != self.path_selector.paths[0]:
+            # Réponse servie par un chemin de repli
+            metrics.counter('gemini_fallback_total', **labels).inc()
+    
+    def _generate_hedged(self, prompt: str, image_path: Optional[str], paths: list) -> str:
+        """
+        Lance le chemin principal, puis le second s'il dépasse son p95 ;
+        garde la première réponse valide
+        """
+        primary, secondary = paths[0], paths[1]
+        delay = self.path_selector.breakers[primary].p95() or self.hedge_delay
+        
+        started = threading.Event()
+        
+        def call_primary():
+            started.set()
+            return self._call_path(primary, prompt, image_path, False)
+        
+        futures = {self._hedge_executor.submit(call_primary): primary}
+        # Délai compté à partir du démarrage effectif du principal, pas de sa mise en file
+        started.wait()
+        done, _ = wait(futures, timeout=delay)
+        if not done:
+            logger.info(f"🪂 {primary} au-delà de {delay:.2f}s, requête couverte via {secondary}")
+            futures[self._hedge_executor.submit(self._call_path, secondary, prompt, image_path)] = secondary
+        elif next(iter(done)).exception() is not None:
+            # Échec rapide du principal : bascule immédiate
+            futures[self._hedge_executor.submit(self._call_path, secondary, prompt, image_path)] = secondary
+        
+        last_error = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    # La requête perdante se termine en arrière-plan
+                    return future.result()
+                last_error = future.exception()
+        raise last_error
+    
+    def _cache_key(self, prompt: str, image_path: Optional[str] = None) -> str:
+        return make_cache_key(gemini_rest.MODEL_NAME, prompt, image_path, DEFAULT_GENERATION_CONFIG)
+    
+    def generate_text_stream(self, prompt: str, image_path: Optional[str] = None,
+                             history: Optional[list] = None,
+                             cancel: Optional[CancellationToken] = None) -> Iterator[str]:
+        """
+        Génère du texte en streaming avec Gemini 2.0 Flash
+        Les fragments sont produits dès leur réception
+        history: tours précédents d'une session (ContextWindow.build) ; la réponse
+        dépend alors du contexte et ne passe pas par les caches
+        cancel: son annulation coupe la connexion HTTP ou le flux SDK en cours,
+        y compris avant le premier fragment ; le flux se termine alors sans erreur
+        """
+        cache_key = None
+        if self.cache is not None and not history:
+            cache_key = self._cache_key(prompt, image_path)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        semantic = self.semantic_cache if not image_path and not history else None
+        if semantic is not None:
+            cached = semantic.get(prompt)
+            if cached is not None:
+                yield cached
+                return
+        
+        if image_path and os.path.exists(image_path):
+            logger.info(f"🖼️  Analyse d'image (stream): {image_path}")
+        else:
+            logger.info(f"💬 Prompt (stream): {prompt[:80]}...")
+            image_path = None
+        
+        received = []
+        completed = False
+        last_error = None
+        paths = self.path_selector.order()
+        
+        for i, path in enumerate(paths):
+            if cancel is not None and cancel.cancelled:
+                return
+            breaker = self.path_selector.breakers[path]
+            if not breaker.allow_request() and i < len(paths) - 1:
+                continue
+            
+            labels = {'path': path, 'kind': 'image' if image_path else 'text'}
+            start_time = time.time()
+            has_emitted = False
+            # Verdict rendu au disjoncteur ; sinon la requête d'essai éventuelle est libérée
+            settled = False
             try:
-                return self._generate_via_rest_api(prompt)
-            except Exception as rest_error:
-                return f"❌ Erreur: {str(rest_error)}"
+                if path == 'rest':
+                    chunks = self._stream_via_rest_api(prompt, image_path, history,
+                                                       retry=i == len(paths) - 1, cancel=cancel)
+                elif image_path:
+                    chunks = self._stream_with_image(prompt, image_path, history, cancel)
+                else:
+                    chunks = self._stream_text_only(prompt, history, cancel)
+                
+                for chunk in chunks:
+                    if not has_emitted:
+                        first_chunk_time = time.time() - start_time
+                        breaker.record_success(first_chunk_time)
+                        settled = True
+                        metrics.histogram('gemini_ttfb_seconds', **labels).record(first_chunk_time)
+                        logger.info(f"⚡ Premier fragment reçu en {first_chunk_time:.2f}s ({path})")
+                        has_emitted = True
+                    received.append(chunk)
+                    yield chunk
+                
+                if not has_emitted:
+                    # Réponse vide mais valide : le chemin reste sain
+                    breaker.record_success(time.time() - start_time)
+                    settled = True
+                completed = True
+                response_time = time.time() - start_time
+                self._record_success(labels, 'stream', response_time)
+                metrics.histogram('gemini_response_bytes', **labels).record(
+                    sum(len(chunk.encode('utf-8')) for chunk in received))
+                logger.info(f"⏱️  Réponse complète reçue en {response_time:.2f}s")
+                break
+                
+            except CancelledError:
+                # Arrêt demandé par l'appelant : ni échec du chemin, ni repli
+                logger.info(f"⏹️ Génération annulée ({path})")
+                return
+            except Exception as e:
+                logger.error(f"❌ Erreur génération (stream, {path}): {e}")
+                breaker.record_failure()
+                settled = True
+                metrics.counter('gemini_errors_total', error=type(e).__name__, **labels).inc()
+                if has_emitted:
+                    # Une partie de la réponse est déjà affichée : pas de rejeu
+                    yield f"\n❌ Erreur: {str(e)}"
+                    return
+                last_error = e
+            finally:
+                if not settled:
+                    # Annulation ou flux abandonné avant le premier fragment : un chemin
+                    # semi-ouvert ne doit pas rester bloqué sur un essai sans issue
+                    breaker.release_probe()
+        
+        if not completed and last_error is not None:
+            yield f"❌ Erreur: {str(last_error)}"
+        
+        # Seules les réponses complètes sont mises en cache
+        if completed and cache_key is not None:
+            self.cache.put(cache_key, ''.join(received))
+        if completed and semantic is not None:
+            semantic.put(prompt, ''.join(received))
     
     def _generate_text_only(self, prompt: str) -> str:
         """Génération via SDK Google"""
         try:
             response = self.model.generate_content(prompt)
-            return self._process_response(response)
+            return self._record_sdk_bytes(prompt, self._process_response(response), 'text')
         except Exception as e:
-            raise Exception(f"Erreur SDK: {str(e)}")
+            raise classify_exception(e, "Erreur SDK") from e
     
     def _generate_with_image(self, prompt: str, image_path: str) -> str:
         """Génération avec image"""
         try:
-            import PIL.Image
-            
-            img = PIL.Image.open(image_path)
-            response = self.model.generate_content([prompt, img])
-            return self._process_response(response)
+            blob = self._image_blob(image_path)
+            response = self.model.generate_content([prompt, blob])
+            return self._record_sdk_bytes(prompt, self._process_response(response), 'image', len(blob['data']))
             
         except Exception as e:
-            raise Exception(f"Erreur analyse image: {str(e)}")
+            raise classify_exception(e, "Erreur analyse image") from e
+    
+    def _record_sdk_bytes(self, prompt: str, text: str, kind: str, image_bytes: int = 0) -> str:
+        """Tailles approximatives côté SDK (le corps exact n'est pas exposé)"""
+        metrics.histogram('gemini_request_bytes', path='sdk', kind=kind).record(
+            len(prompt.encode('utf-8')) + image_bytes)
+        metrics.histogram('gemini_response_bytes', path='sdk', kind=kind).record(len(text.encode('utf-8')))
+        return text
     
-    def _generate_via_rest_api(self, prompt: str) -> str:
+    def _image_blob(self, image_path: str) -> dict:
+        """Image réduite et encodée, au format blob accepté par le SDK"""
+        prepared = self.image_pipeline.prepare(image_path)
+        return {'mime_type': prepared.mime_type, 'data': prepared.data}
+    
+    def _rest_payload(self, prompt: str, image_path: Optional[str] = None,
+                      extra_parts: Optional[list] = None, history: Optional[list] = None) -> dict:
+        """Corps de requête REST, image préparée incluse"""
+        extra_parts = list(extra_parts or [])
+        if image_path:
+            prepared = self.image_pipeline.prepare(image_path)
+            extra_parts.append(gemini_rest.image_part(prepared.data, prepared.mime_type))
+        return gemini_rest.prompt_payload(prompt, extra_parts, history)
+    
+    def _generate_via_rest_api(self, prompt: str, image_path: Optional[str] = None,
+                               extra_parts: Optional[list] = None) -> str:
         """Génération via API REST directe"""
         try:
-            headers = {
-                'Content-Type': 'application/json',
-                'x-goog-api-key': self.api_key
-            }
-            
-            data = {
-                "contents": [
-                    {
-                        "parts": [
-                            {
-                                "text": prompt
-                            }
-                        ]
-                    }
-                ],
-                "generationConfig": {
-                    "temperature": 0.7,
-                    "topK": 40,
-                    "topP": 0.95,
-                    "maxOutputTokens": 1024,
-                }
-            }
-            
-            response = requests.post(
+            response = self.transport.post(
                 self.api_url,
-                headers=headers,
-                json=data,
-                timeout=30
+                headers=gemini_rest.headers(self.api_key),
+                json=self._rest_payload(prompt, image_path, extra_parts)
             )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result['candidates'][0]['content']['parts'][0]['text']
-            else:
-                error_msg = f"API Error {response.status_code}"
-                logger.error(f"{error_msg}: {response.text}")
-                raise Exception(error_msg)
+        except Exception as e:
+            raise classify_exception(e, "Erreur API REST") from e
+        
+        kind = 'image' if image_path else 'text'
+        metrics.histogram('gemini_request_bytes', path='rest', kind=kind).record(len(response.request.body or b''))
+        if response.status_code != 200:
+            logger.error(f"API Error {response.status_code}: {response.text}")
+            raise error_from_status(response.status_code, response.text, response.headers)
+        metrics.histogram('gemini_response_bytes', path='rest', kind=kind).record(len(response.content))
+        return gemini_rest.extract_text(response.json())
+    
+    def _sdk_stream(self, content, history: Optional[list] = None):
+        """Réponse en flux du SDK, dans une session si un historique est fourni"""
+        if history:
+            return self.model.start_chat(history=history).send_message(content, stream=True)
+        return self.model.generate_content(content, stream=True)
+    
+    def _open_sdk_stream(self, content, history: Optional[list] = None,
+                         cancel: Optional[CancellationToken] = None):
+        """
+        Le SDK ne rend la main qu'au premier fragment : avec un jeton, l'ouverture
+        se fait sur un thread dédié et l'attente s'arrête dès l'annulation
+        """
+        if cancel is None:
+            return self._sdk_stream(content, history)
+        
+        opened = Future()
+        woken = threading.Event()
+        opened.add_done_callback(lambda future: woken.set())
+        
+        def open_stream():
+            try:
+                opened.set_result(self._sdk_stream(content, history))
+            except Exception as e:
+                opened.set_exception(e)
+                return
+            if cancel.cancelled:
+                # Appelant parti pendant l'attente : le flux ouvert est abandonné
+                self._sdk_stream_abort(opened.result())()
+        
+        threading.Thread(target=open_stream, name="okit-sdk-stream", daemon=True).start()
+        with cancel.cancel_callback(woken.set):
+            woken.wait()
+        if cancel.cancelled:
+            raise CancelledError("Erreur SDK: requête annulée")
+        return opened.result()
+    
+    @staticmethod
+    def _sdk_stream_abort(response):
+        """Annule le flux gRPC d'une réponse du SDK (sans effet si elle n'en expose pas)"""
+        stream = getattr(response, '_iterator', None)
+        return getattr(stream, 'cancel', None) or (lambda: None)
+    
+    @staticmethod
+    def _on_cancel(cancel: Optional[CancellationToken], abort):
+        """Bloc pendant lequel l'annulation de cancel appelle abort()"""
+        return cancel.cancel_callback(abort) if cancel is not None else nullcontext()
+    
+    @staticmethod
+    def _stream_error(error: Exception, context: str,
+                      cancel: Optional[CancellationToken] = None) -> Exception:
+        """Erreur d'un flux ; une coupure provoquée par l'annulation devient CancelledError"""
+        if cancel is not None and cancel.cancelled:
+            return CancelledError(f"{context}: requête annulée")
+        return classify_exception(error, context)
+    
+    def _stream_text_only(self, prompt: str, history: Optional[list] = None,
+                          cancel: Optional[CancellationToken] = None) -> Iterator[str]:
+        """Streaming via SDK Google"""
+        try:
+            response = self._open_sdk_stream(prompt, history, cancel)
+            with self._on_cancel(cancel, self._sdk_stream_abort(response)):
+                for chunk in response:
+                    text = self._process_chunk(chunk)
+                    if text:
+                        yield text
+        except Exception as e:
+            raise self._stream_error(e, "Erreur SDK", cancel) from e
+    
+    def _stream_with_image(self, prompt: str, image_path: str, history: Optional[list] = None,
+                           cancel: Optional[CancellationToken] = None) -> Iterator[str]:
+        """Streaming avec image"""
+        try:
+            response = self._open_sdk_stream([prompt, self._image_blob(image_path)], history, cancel)
+            with self._on_cancel(cancel, self._sdk_stream_abort(response)):
+                for chunk in response:
+                    text = self._process_chunk(chunk)
+                    if text:
+                        yield text
+        except Exception as e:
+            raise self._stream_error(e, "Erreur analyse image", cancel) from e
+    
+    def _stream_via_rest_api(self, prompt: str, image_path: Optional[str] = None,
+                             history: Optional[list] = None, retry: bool = True,
+                             cancel: Optional[CancellationToken] = None) -> Iterator[str]:
+        """
+        Streaming via l'endpoint REST streamGenerateContent (Server-Sent Events)
+        retry: ouverture rejouée sur erreur temporaire (pas de chemin de repli restant)
+        cancel: son annulation coupe la connexion, en attente des en-têtes comme en lecture
+        """
+        payload = self._rest_payload(prompt, image_path, history=history)
+        abort = ConnectionAbort()
+        
+        def open_stream():
+            # Seule l'ouverture est rejouée : aucun fragment n'a encore été produit
+            if cancel is not None and cancel.cancelled:
+                raise CancelledError("Erreur API REST: requête annulée")
+            with self.concurrency.slot():
+                try:
+                    response = self.transport.post(
+                        self.stream_api_url,
+                        headers=gemini_rest.headers(self.api_key),
+                        json=payload,
+                        stream=True,
+                        abort=abort
+                    )
+                except Exception as e:
+                    raise self._stream_error(e, "Erreur API REST", cancel) from e
                 
+                if response.status_code != 200:
+                    logger.error(f"API Error {response.status_code}: {response.text}")
+                    response.close()
+                    raise error_from_status(response.status_code, response.text, response.headers)
+                return response
+        
+        with self._on_cancel(cancel, abort):
+            response = self.retry_policy.call(open_stream) if retry else open_stream()
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    text = gemini_rest.parse_sse_line(line)
+                    if text:
+                        yield text
+            except Exception as e:
+                raise self._stream_error(e, "Erreur API REST", cancel) from e
+            finally:
+                response.close()
+    
+    def transcribe_audio(self, audio: bytes, mime_type: str = 'audio/wav') -> str:
+        """Transcrit un énoncé audio (SDK, puis REST en repli) ; lève une exception si les deux échouent"""
+        def via_sdk():
+            try:
+                response = self.model.generate_content(
+                    [TRANSCRIPTION_PROMPT, {'mime_type': mime_type, 'data': audio}]
+                )
+                return self._process_response(response)
+            except Exception as e:
+                raise classify_exception(e, "Erreur SDK") from e
+        
+        def via_rest():
+            return self._generate_via_rest_api(
+                TRANSCRIPTION_PROMPT, extra_parts=[gemini_rest.inline_part(audio, mime_type)]
+            )
+        
+        start_time = time.time()
+        try:
+            # Repli REST immédiat ; les nouvelles tentatives sont réservées au dernier chemin
+            text = via_sdk()
         except Exception as e:
-            raise Exception(f"Erreur API REST: {str(e)}")
+            logger.warning(f"Transcription SDK impossible, repli REST: {e}")
+            text = self.retry_policy.call(via_rest)
+        metrics.histogram('voice_transcription_seconds').record(time.time() - start_time)
+        return text.strip()
+    
+    def _process_chunk(self, chunk) -> str:
+        """Extrait le texte d'un fragment de réponse SDK"""
+        try:
+            return chunk.text
+        except Exception:
+            # Fragments sans texte (métadonnées, raison d'arrêt...)
+            return ""
     
     def _process_response(self, response) -> str:
         """Traite la réponse de l'API"""
@@ -147,10 +622,23 @@ class GeminiClient:
             logger.error(f"Erreur traitement réponse: {e}")
             return f"Erreur traitement: {str(e)}"
     
-    def start_chat(self):
-        """Démarrer une session de chat"""
+    def create_context(self, history: Optional[list] = None, pinned: Optional[list] = None) -> ContextWindow:
+        """Fenêtre de contexte d'une session, avec le budget et le résumé du client"""
+        return ContextWindow.from_history(
+            history,
+            token_budget=self.context_budget,
+            pinned=pinned,
+            summarizer=self._summarize_turns if self.summarize_history else None
+        )
+    
+    def start_chat(self, history: Optional[list] = None, pinned: Optional[list] = None):
+        """
+        Démarrer une session de chat (reprise possible depuis un historique sauvegardé)
+        pinned: tours toujours envoyés en tête (persona, consignes)
+        """
+        self.context = self.create_context(history, pinned)
         self.chat = self.model.start_chat(history=[])
-        logger.info("💬 Session de chat démarrée")
+        logger.info(f"💬 Session de chat démarrée ({len(history or [])} messages repris)")
     
     def send_message(self, message: str) -> str:
         """Envoyer un message dans le chat"""
@@ -158,10 +646,45 @@ class GeminiClient:
             self.start_chat()
         
         try:
+            # Historique borné par le budget de tokens au lieu de l'historique complet
+            history, tokens = self.context.build(message)
+            self.chat = self.model.start_chat(history=history)
+            self.last_request_tokens = tokens
+            logger.info(f"🧮 Requête chat: ~{tokens} tokens ({len(history)} tours d'historique)")
+            
             response = self.chat.send_message(message)
-            return self._process_response(response)
+            reply = self._process_response(response)
         except Exception as e:
             return f"Erreur chat: {str(e)}"
+        
+        self.context.add('user', message)
+        self.context.add('model', reply)
+        return reply
+    
+    def _summarize_turns(self, previous_summary: str, turns: list) -> str:
+        """Résume les anciens tours d'une session (utilisé par ContextWindow)"""
+        transcript = '\n'.join(
+            f"{'Utilisateur' if turn['role'] == 'user' else 'Assistant'}: {turn['parts'][0]}"
+            for turn in turns
+        )
+        prompt = (
+            "Résume en quelques phrases les informations utiles de cet échange, "
+            "en complétant le résumé existant.\n"
+            f"Résumé existant : {previous_summary or 'aucun'}\n"
+            f"Échange :\n{transcript}"
+        )
+        return self._generate(prompt)
+    
+    def close(self):
+        """Libère les connexions HTTP et le cache du client"""
+        self.transport.close()
+        self.image_pipeline.close()
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+        if self.cache is not None:
+            self.cache.close()
+        if self.semantic_cache is not None:
+            self.semantic_cache.close()
     
     def check_api_status(self) -> bool:
         """Vérifier si l'API fonctionne"""
@@ -0,0 +1,95 @@
+"""
+Format des requêtes et réponses de l'API REST Gemini
+Partagé par les clients synchrone et asynchrone
+"""
+import base64
+import json
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Racine de l'API REST (remplaçable par un serveur local de substitution)
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+MODEL_NAME = "gemini-2.0-flash"
+
+# Paramètres de génération utilisés par l'API REST
+DEFAULT_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "topK": 40,
+    "topP": 0.95,
+    "maxOutputTokens": 1024,
+}
+
+def generate_url(base_url: str = DEFAULT_BASE_URL) -> str:
+    return f"{base_url}/models/{MODEL_NAME}:generateContent"
+
+def stream_url(base_url: str = DEFAULT_BASE_URL) -> str:
+    return f"{base_url}/models/{MODEL_NAME}:streamGenerateContent?alt=sse"
+
+def headers(api_key: str) -> dict:
+    return {
+        'Content-Type': 'application/json',
+        'x-goog-api-key': api_key
+    }
+
+def text_part(text: str) -> dict:
+    return {"text": text}
+
+def image_part(data: bytes, mime_type: str) -> dict:
+    return inline_part(data, mime_type)
+
+def inline_part(data: bytes, mime_type: str) -> dict:
+    """Données binaires (image, audio) encodées en ligne"""
+    return {
+        "inline_data": {
+            "mime_type": mime_type,
+            "data": base64.b64encode(data).decode('ascii')
+        }
+    }
+
+def build_payload(contents: List[dict], generation_config: Optional[dict] = None) -> dict:
+    """Construit le corps de requête à partir d'une liste de contenus"""
+    return {
+        "contents": contents,
+        "generationConfig": dict(generation_config or DEFAULT_GENERATION_CONFIG)
+    }
+
+def history_contents(history: List[dict]) -> List[dict]:
+    """Historique au format start_chat ({'role', 'parts': [texte]}) vers les contenus REST"""
+    return [
+        {
+            "role": turn['role'],
+            "parts": [text_part(part) if isinstance(part, str) else part for part in turn['parts']]
+        }
+        for turn in history
+    ]
+
+def prompt_payload(prompt: str, extra_parts: Optional[List[dict]] = None,
+                   history: Optional[List[dict]] = None) -> dict:
+    """Corps de requête pour un prompt (texte et éventuelles images), après un historique optionnel"""
+    parts = [text_part(prompt)] + list(extra_parts or [])
+    if not history:
+        return build_payload([{"parts": parts}])
+    return build_payload(history_contents(history) + [{"role": "user", "parts": parts}])
+
+def extract_text(result: dict) -> str:
+    """Extrait le texte du premier candidat d'une réponse"""
+    parts = result['candidates'][0]['content'].get('parts', [])
+    return ''.join(part.get('text', '') for part in parts)
+
+def parse_sse_line(line: Optional[str]) -> str:
+    """Extrait le texte d'une ligne 'data: {...}' du flux SSE"""
+    if not line or not line.startswith('data:'):
+        return ""
+
+    payload = line[len('data:'):].strip()
+    if not payload or payload == '[DONE]':
+        return ""
+
+    try:
+        return extract_text(json.loads(payload))
+    except (ValueError, KeyError, IndexError) as e:
+        logger.warning(f"Fragment SSE ignoré: {e}")
+        return ""
@@ -0,0 +1,150 @@
+"""
+Transport HTTP persistant pour l'API REST Gemini
+Réutilise les connexions TCP/TLS (keep-alive) entre les requêtes
+"""
+import functools
+import socket
+import threading
+import time
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Requête en cours d'envoi sur ce thread : ses connexions sont rattachées à son ConnectionAbort
+_tracking = threading.local()
+
+class ConnectionAbort:
+    """
+    Coupe, depuis n'importe quel thread, les connexions d'une requête en cours
+    Fermer la réponse ne réveille pas un thread bloqué en lecture ; couper le
+    socket, si : l'attente des en-têtes ou d'un fragment échoue aussitôt
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connections = []
+        self.aborted = False
+
+    def attach(self, connection):
+        with self._lock:
+            self._connections.append(connection)
+            aborted = self.aborted
+        if aborted:
+            _shutdown(connection)
+
+    def __call__(self):
+        with self._lock:
+            self.aborted = True
+            connections = list(self._connections)
+        for connection in connections:
+            _shutdown(connection)
+
+def _shutdown(connection):
+    sock = getattr(connection, 'sock', None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+@functools.lru_cache(maxsize=1)
+def _tracking_adapter_class():
+    """HTTPAdapter dont les pools signalent la connexion utilisée par chaque requête"""
+    from requests.adapters import HTTPAdapter
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    def tracking(pool_class):
+        class TrackingPool(pool_class):
+            def _make_request(self, conn, *args, **kwargs):
+                abort = getattr(_tracking, 'abort', None)
+                if abort is not None:
+                    abort.attach(conn)
+                return super()._make_request(conn, *args, **kwargs)
+        return TrackingPool
+
+    pool_classes = {'http': tracking(HTTPConnectionPool), 'https': tracking(HTTPSConnectionPool)}
+
+    class TrackingAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = pool_classes
+
+    return TrackingAdapter
+
+class HttpTransport:
+    def __init__(self, pool_size: int = 4, connect_timeout: float = 5.0,
+                 read_timeout: float = 30.0, idle_timeout: float = 60.0):
+        """
+        Pool de connexions keep-alive possédé par le client
+
+        pool_size: nombre de connexions conservées par hôte
+        connect_timeout / read_timeout: délais séparés (secondes)
+        idle_timeout: au-delà, les connexions inactives sont fermées
+        """
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.idle_timeout = idle_timeout
+
+        self._lock = threading.Lock()
+        self._session = None
+        self._last_used = 0.0
+
+    @property
+    def timeout(self):
+        """Tuple (connexion, lecture) attendu par requests"""
+        return (self.connect_timeout, self.read_timeout)
+
+    def _create_session(self):
+        """Crée une session avec un pool dimensionné"""
+        # Import différé : requests n'est chargé qu'au premier appel REST
+        import requests
+
+        session = requests.Session()
+        adapter = _tracking_adapter_class()(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _get_session(self):
+        """Retourne la session active, en évinçant un pool resté inactif"""
+        with self._lock:
+            now = time.monotonic()
+            if self._session is not None and now - self._last_used > self.idle_timeout:
+                # Le serveur a probablement fermé ces connexions entre-temps
+                logger.info("🔌 Connexions inactives fermées")
+                self._session.close()
+                self._session = None
+
+            if self._session is None:
+                self._session = self._create_session()
+
+            self._last_used = now
+            return self._session
+
+    def post(self, url: str, abort: Optional[ConnectionAbort] = None, **kwargs):
+        """
+        POST via le pool de connexions
+        abort: rattaché à la connexion utilisée, pour couper la requête (et la
+        lecture d'une réponse en flux) depuis un autre thread
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        session = self._get_session()
+        if abort is None:
+            return session.post(url, **kwargs)
+        _tracking.abort = abort
+        try:
+            return session.post(url, **kwargs)
+        finally:
+            _tracking.abort = None
+
+    def close(self):
+        """Ferme toutes les connexions du pool"""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
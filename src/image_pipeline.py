@@ -0,0 +1,167 @@
+"""
+Préparation des images avant envoi à Gemini
+Lecture des dimensions/EXIF sans décodage complet, réduction à une taille
+maximale, ré-encodage JPEG/WebP et cache des octets encodés
+"""
+import io
+import os
+import threading
+import time
+import logging
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from .response_cache import hash_file
+
+logger = logging.getLogger(__name__)
+
+PreparedImage = namedtuple(
+    'PreparedImage',
+    ['data', 'mime_type', 'size', 'original_size', 'original_bytes', 'timings']
+)
+
+MIME_TYPES = {'JPEG': 'image/jpeg', 'WEBP': 'image/webp', 'PNG': 'image/png'}
+
+# Tag EXIF d'orientation
+EXIF_ORIENTATION = 0x0112
+
+class UnreadableImageError(ValueError):
+    """Le fichier n'est pas une image décodable (format inconnu, tronqué, trop grand)"""
+
+def _process_image(image_path: str, max_edge: int, fmt: str, quality: int):
+    """
+    Réduit et ré-encode une image (exécuté dans le pool)
+    Retourne (octets, type MIME, taille finale, taille d'origine, durées par étape)
+    """
+    import PIL.Image
+
+    try:
+        return _reencode_image(image_path, max_edge, fmt, quality)
+    except (OSError, SyntaxError, ValueError, PIL.Image.DecompressionBombError) as e:
+        # PIL.UnidentifiedImageError dérive d'OSError
+        raise UnreadableImageError(f"Image illisible: {e}") from e
+
+def _reencode_image(image_path: str, max_edge: int, fmt: str, quality: int):
+    import PIL.Image
+    import PIL.ImageOps
+
+    timings = {}
+
+    start = time.perf_counter()
+    # open() ne lit que l'en-tête : dimensions et EXIF sans décoder les pixels
+    img = PIL.Image.open(image_path)
+    original_size = img.size
+    orientation = img.getexif().get(EXIF_ORIENTATION, 1)
+    timings['probe'] = time.perf_counter() - start
+
+    if max(original_size) <= max_edge and img.format == fmt and orientation == 1:
+        # Déjà conforme : aucun décodage ni ré-encodage
+        img.close()
+        with open(image_path, 'rb') as f:
+            data = f.read()
+        return data, MIME_TYPES[fmt], original_size, original_size, timings
+
+    start = time.perf_counter()
+    if img.format == 'JPEG':
+        # Décodage JPEG directement à l'échelle 1/2, 1/4 ou 1/8 (DCT)
+        scale = max(original_size) / max_edge
+        img.draft('RGB', (int(original_size[0] / scale), int(original_size[1] / scale)))
+    img = PIL.ImageOps.exif_transpose(img)
+    img.thumbnail((max_edge, max_edge), PIL.Image.LANCZOS)
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    timings['decode_resize'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    buffer = io.BytesIO()
+    img.save(buffer, format=fmt, quality=quality, optimize=True)
+    timings['encode'] = time.perf_counter() - start
+
+    return buffer.getvalue(), MIME_TYPES[fmt], img.size, original_size, timings
+
+class ImagePipeline:
+    def __init__(self, max_edge: int = 1536, fmt: str = 'JPEG', quality: int = 85,
+                 max_workers: int = 2, use_processes: bool = False, cache_entries: int = 32):
+        """
+        max_edge: plus grand côté après réduction (pixels)
+        fmt: 'JPEG' ou 'WEBP'
+        quality: qualité d'encodage (1-100)
+        use_processes: pool de processus au lieu de threads
+        cache_entries: nombre d'images encodées conservées
+        """
+        if fmt not in MIME_TYPES:
+            raise ValueError(f"Format d'image non supporté: {fmt}")
+
+        self.max_edge = max_edge
+        self.fmt = fmt
+        self.quality = quality
+        self.cache_entries = cache_entries
+
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self._executor = executor_class(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self.stats = {
+            'images': 0,
+            'cache_hits': 0,
+            'bytes_in': 0,
+            'bytes_out': 0,
+        }
+
+    def submit(self, image_path: str) -> Future:
+        """Prépare l'image dans le pool ; retourne un Future de PreparedImage"""
+        start = time.perf_counter()
+        file_hash = hash_file(image_path)
+        hash_time = time.perf_counter() - start
+
+        result = Future()
+        key = (file_hash, self.max_edge, self.fmt, self.quality)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats['cache_hits'] += 1
+                result.set_result(cached)
+                return result
+
+        original_bytes = os.path.getsize(image_path)
+
+        def on_done(work):
+            try:
+                data, mime_type, size, original_size, timings = work.result()
+            except Exception as e:
+                result.set_exception(e)
+                return
+
+            timings = dict(timings, hash=hash_time)
+            prepared = PreparedImage(data, mime_type, size, original_size, original_bytes, timings)
+            with self._lock:
+                self._cache[key] = prepared
+                while len(self._cache) > self.cache_entries:
+                    self._cache.popitem(last=False)
+                self.stats['images'] += 1
+                self.stats['bytes_in'] += original_bytes
+                self.stats['bytes_out'] += len(data)
+
+            stages = ', '.join(f"{name} {duration * 1000:.0f} ms" for name, duration in timings.items())
+            logger.info(
+                f"🖼️  {original_size[0]}x{original_size[1]} → {size[0]}x{size[1]}, "
+                f"{original_bytes / 1024:.0f} Ko → {len(data) / 1024:.0f} Ko ({stages})"
+            )
+            result.set_result(prepared)
+
+        self._executor.submit(
+            _process_image, image_path, self.max_edge, self.fmt, self.quality
+        ).add_done_callback(on_done)
+        return result
+
+    def prepare(self, image_path: str) -> PreparedImage:
+        """Prépare l'image et attend le résultat"""
+        return self.submit(image_path).result()
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.stats['bytes_in'] - self.stats['bytes_out']
+
+    def close(self):
+        self._executor.shutdown(wait=False)
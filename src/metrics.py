@@ -0,0 +1,169 @@
+"""
+Métriques légères : compteurs et histogrammes de latence
+Histogrammes à précision relative fixe (style HDR) : enregistrement O(1),
+mémoire bornée, percentiles à ~1 % près ; export JSON ou texte Prometheus
+"""
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+class Counter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+class Histogram:
+    def __init__(self, significant_digits: int = 2, lowest: float = 1e-6):
+        """
+        significant_digits: précision relative des percentiles (2 → ~1 %)
+        lowest: plus petite valeur distinguée (les valeurs inférieures y sont ramenées)
+        """
+        # Buckets logarithmiques : largeur relative constante
+        self._growth = math.log1p(10 ** -significant_digits)
+        self._lowest = lowest
+        self._lock = threading.Lock()
+        self._buckets: Dict[int, int] = {}
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, value: float) -> int:
+        return int(math.log(max(value, self._lowest) / self._lowest) / self._growth)
+
+    def _bucket_value(self, index: int) -> float:
+        # Milieu géométrique du bucket
+        return self._lowest * math.exp((index + 0.5) * self._growth)
+
+    def record(self, value: float):
+        index = self._index(value)
+        with self._lock:
+            self._buckets[index] = self._buckets.get(index, 0) + 1
+            self.count += 1
+            self.sum += value
+            self.min = min(self.min, value)
+            self.max = max(self.max, value)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Valeur au p-ième centile (0-100), None sans données"""
+        with self._lock:
+            if not self.count:
+                return None
+            target = max(1, math.ceil(self.count * p / 100))
+            seen = 0
+            for index in sorted(self._buckets):
+                seen += self._buckets[index]
+                if seen >= target:
+                    return min(max(self._bucket_value(index), self.min), self.max)
+            return self.max
+
+    def snapshot(self) -> dict:
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.sum / self.count,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+        }
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelSet, Counter]] = {}
+        self._histograms: Dict[str, Dict[LabelSet, Histogram]] = {}
+
+    @staticmethod
+    def _labels(labels: dict) -> LabelSet:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def counter(self, name: str, **labels) -> Counter:
+        key = self._labels(labels)
+        with self._lock:
+            return self._counters.setdefault(name, {}).setdefault(key, Counter())
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        key = self._labels(labels)
+        with self._lock:
+            return self._histograms.setdefault(name, {}).setdefault(key, Histogram())
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Mesure la durée du bloc (secondes) dans l'histogramme `name`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(name, **labels).record(time.perf_counter() - start)
+
+    def snapshot(self) -> dict:
+        """{'counters': {nom: [{labels, value}]}, 'histograms': {nom: [{labels, ...}]}}"""
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: dict(series) for name, series in self._histograms.items()}
+        return {
+            'timestamp': time.time(),
+            'counters': {
+                name: [{'labels': dict(labels), 'value': counter.value}
+                       for labels, counter in series.items()]
+                for name, series in counters.items()
+            },
+            'histograms': {
+                name: [dict(labels=dict(labels), **histogram.snapshot())
+                       for labels, histogram in series.items()]
+                for name, series in histograms.items()
+            },
+        }
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self) -> str:
+        """Format texte Prometheus ; histogrammes exportés en summary (quantiles)"""
+        snapshot = self.snapshot()
+        lines = []
+        for name, series in sorted(snapshot['counters'].items()):
+            lines.append(f"# TYPE {name} counter")
+            for entry in series:
+                lines.append(f"{name}{_format_labels(entry['labels'])} {entry['value']:g}")
+        for name, series in sorted(snapshot['histograms'].items()):
+            lines.append(f"# TYPE {name} summary")
+            for entry in series:
+                if not entry['count']:
+                    continue
+                for quantile, key in (('0.5', 'p50'), ('0.9', 'p90'), ('0.99', 'p99')):
+                    labels = dict(entry['labels'], quantile=quantile)
+                    lines.append(f"{name}{_format_labels(labels)} {entry[key]:.6g}")
+                lines.append(f"{name}_sum{_format_labels(entry['labels'])} {entry['sum']:.6g}")
+                lines.append(f"{name}_count{_format_labels(entry['labels'])} {entry['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ''
+    pairs = []
+    for key, value in sorted(labels.items()):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{key}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+# Registre partagé par l'application
+metrics = MetricsRegistry()
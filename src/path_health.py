@@ -0,0 +1,102 @@
+"""
+Santé des chemins d'accès à Gemini (SDK, REST)
+Disjoncteur par chemin : mémorise échecs et latences récents pour
+envoyer directement les requêtes vers le transport sain
+"""
+import threading
+import time
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 latency_window: int = 50):
+        """
+        failure_threshold: échecs consécutifs avant ouverture
+        reset_timeout: délai avant une requête d'essai (semi-ouvert)
+        latency_window: nombre de latences conservées pour le p95
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._latencies = deque(maxlen=latency_window)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Le chemin peut-il être essayé maintenant ?"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = HALF_OPEN
+            # Semi-ouvert : une seule requête d'essai à la fois
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+            self._failures = 0
+            self._probe_in_flight = False
+            if self._state != CLOSED:
+                logger.info(f"🟢 Chemin {self.name} rétabli")
+            self._state = CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning(f"🔴 Chemin {self.name} désactivé pour {self.reset_timeout:.0f}s")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def release_probe(self):
+        """Requête d'essai abandonnée sans verdict (annulation) : ni succès ni échec"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def p95(self) -> Optional[float]:
+        """Latence au 95e centile des succès récents (None sans données)"""
+        with self._lock:
+            if not self._latencies:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+class PathSelector:
+    def __init__(self, paths: Sequence[str] = ('sdk', 'rest'), **breaker_options):
+        """paths: chemins par ordre de préférence"""
+        self.paths = list(paths)
+        self.breakers: Dict[str, CircuitBreaker] = {
+            path: CircuitBreaker(path, **breaker_options) for path in self.paths
+        }
+
+    def order(self) -> List[str]:
+        """Chemins à essayer : les sains d'abord, les désactivés en dernier recours"""
+        healthy = [path for path in self.paths if self.breakers[path].state != OPEN]
+        return healthy + [path for path in self.paths if path not in healthy]
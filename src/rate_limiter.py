@@ -0,0 +1,80 @@
+"""
+Limiteur de débit à seau de jetons
+Autorise des rafales jusqu'à `capacity` puis un débit moyen de `rate` requêtes/s
+"""
+import asyncio
+import threading
+import time
+from typing import Optional
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        rate: jetons ajoutés par seconde
+        capacity: taille maximale du seau (rafale), par défaut max(1, rate)
+        """
+        if rate <= 0:
+            raise ValueError("Le débit doit être positif")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: float, burst: Optional[float] = None) -> 'TokenBucket':
+        return cls(requests_per_minute / 60.0, burst)
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Prend des jetons sans attendre ; False si le seau est vide"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def _wait_time(self, tokens: float, deadline: Optional[float]) -> Optional[float]:
+        """0 si les jetons sont pris, sinon l'attente avant de réessayer (None : délai dépassé)"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            wait = (tokens - self._tokens) / self.rate
+
+        if deadline is not None:
+            remaining = deadline - now
+            if remaining <= 0:
+                return None
+            wait = min(wait, remaining)
+        return wait
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Attend que des jetons soient disponibles ; False si timeout est dépassé"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._wait_time(tokens, deadline)
+            if wait is None:
+                return False
+            if not wait:
+                return True
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Variante asyncio d'acquire : attend sans bloquer la boucle"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._wait_time(tokens, deadline)
+            if wait is None:
+                return False
+            if not wait:
+                return True
+            await asyncio.sleep(wait)
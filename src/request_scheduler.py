@@ -0,0 +1,194 @@
+"""
+Ordonnanceur de requêtes Okit AI
+Pool de workers borné, file d'attente bornée et annulation par requête
+"""
+import queue
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class SchedulerBusyError(Exception):
+    """La file d'attente est pleine : la requête n'a pas été acceptée"""
+
+class CancellationToken:
+    """Jeton d'annulation partagé entre l'appelant et la tâche"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    def cancel(self):
+        """Demande l'arrêt de la tâche"""
+        with self._lock:
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            self._run(callback)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    @contextmanager
+    def cancel_callback(self, callback: Callable[[], None]):
+        """
+        callback() est appelé si le jeton est annulé pendant le bloc, depuis le
+        thread qui annule : il interrompt une attente bloquante (réponse HTTP, flux SDK)
+        """
+        with self._lock:
+            registered = not self._event.is_set()
+            if registered:
+                self._callbacks.append(callback)
+        if not registered:
+            self._run(callback)
+        try:
+            yield self
+        finally:
+            with self._lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+
+    @staticmethod
+    def _run(callback):
+        try:
+            callback()
+        except Exception as e:
+            logger.warning(f"Callback d'annulation en échec: {e}")
+
+class RequestHandle:
+    """Référence vers une requête soumise"""
+
+    def __init__(self, channel: str, seq: int):
+        self.channel = channel
+        self.seq = seq
+        self.token = CancellationToken()
+
+    def cancel(self):
+        self.token.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+class _Task:
+    def __init__(self, handle, fn, args, on_result, on_error, on_cancel):
+        self.handle = handle
+        self.fn = fn
+        self.args = args
+        self.on_result = on_result
+        self.on_error = on_error
+        self.on_cancel = on_cancel
+        self.submitted_at = time.perf_counter()
+
+class RequestScheduler:
+    def __init__(self, max_workers: int = 3, max_queue: int = 8,
+                 dispatch: Optional[Callable[[Callable[[], None]], None]] = None):
+        """
+        max_workers: nombre maximal de requêtes exécutées en parallèle
+        max_queue: nombre maximal de requêtes en attente (contre-pression)
+        dispatch: remet un callback au thread UI (ex: Clock.schedule_once)
+        """
+        self.max_workers = max_workers
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._dispatch = dispatch or (lambda callback: callback())
+
+        self._submit_lock = threading.Lock()
+        self._deliver_lock = threading.Lock()
+        # Numérotation et livraison ordonnées, par canal
+        self._next_submit = {}
+        self._next_deliver = {}
+        self._completed = {}
+
+        self._workers = []
+        for i in range(max_workers):
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"okit-worker-{i}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+        logger.info(f"🧵 Ordonnanceur démarré ({max_workers} workers, file de {max_queue})")
+
+    def submit(self, fn: Callable, *args, on_result: Optional[Callable] = None,
+               on_error: Optional[Callable] = None, on_cancel: Optional[Callable] = None,
+               channel: str = 'default', block: bool = False,
+               timeout: Optional[float] = None) -> RequestHandle:
+        """
+        Soumet fn(token, *args) au pool
+
+        Les callbacks sont remis via dispatch dans l'ordre de soumission
+        du canal. Lève SchedulerBusyError si la file est pleine.
+        """
+        with self._submit_lock:
+            seq = self._next_submit.get(channel, 0)
+            handle = RequestHandle(channel, seq)
+            task = _Task(handle, fn, args, on_result, on_error, on_cancel)
+            try:
+                self._queue.put(task, block=block, timeout=timeout)
+            except queue.Full:
+                raise SchedulerBusyError("Trop de requêtes en attente")
+            self._next_submit[channel] = seq + 1
+        return handle
+
+    def _worker_loop(self):
+        while True:
+            task = self._queue.get()
+            if task is None:
+                break
+
+            callback = None
+            handle = task.handle
+            metrics.histogram('queue_wait_seconds', queue='scheduler', channel=handle.channel).record(
+                time.perf_counter() - task.submitted_at)
+            if handle.cancelled:
+                # Annulée avant démarrage : aucune ressource consommée
+                if task.on_cancel:
+                    callback = task.on_cancel
+            else:
+                try:
+                    result = task.fn(handle.token, *task.args)
+                    if handle.cancelled and task.on_cancel:
+                        callback = task.on_cancel
+                    elif task.on_result:
+                        callback = lambda r=result, cb=task.on_result: cb(r)
+                except Exception as e:
+                    logger.error(f"❌ Erreur tâche {handle.channel}#{handle.seq}: {e}")
+                    if task.on_error:
+                        callback = lambda err=e, cb=task.on_error: cb(err)
+
+            self._complete(handle, callback)
+
+    def _complete(self, handle: RequestHandle, callback: Optional[Callable]):
+        """Enregistre un résultat et livre tous ceux qui sont prêts, dans l'ordre"""
+        with self._deliver_lock:
+            completed = self._completed.setdefault(handle.channel, {})
+            completed[handle.seq] = callback
+
+            next_seq = self._next_deliver.get(handle.channel, 0)
+            while next_seq in completed:
+                ready = completed.pop(next_seq)
+                if ready is not None:
+                    self._dispatch(ready)
+                next_seq += 1
+            self._next_deliver[handle.channel] = next_seq
+
+    def pending_count(self) -> int:
+        """Nombre de requêtes en attente d'un worker"""
+        return self._queue.qsize()
+
+    def shutdown(self):
+        """Arrête les workers une fois la file vidée"""
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
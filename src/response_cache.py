@@ -0,0 +1,205 @@
+"""
+Cache des réponses Gemini à deux niveaux
+Mémoire (LRU borné) + disque (SQLite, persistant entre les redémarrages)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+import logging
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalise un prompt : Unicode NFC et espaces fusionnés"""
+    return unicodedata.normalize('NFC', ' '.join(prompt.split()))
+
+def hash_file(path: str) -> str:
+    """Empreinte SHA-256 du contenu d'un fichier"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def make_cache_key(model: str, prompt: str, image_path: Optional[str] = None,
+                   generation_config: Optional[dict] = None) -> str:
+    """Clé de cache : modèle, prompt normalisé, image et paramètres de génération"""
+    image_hash = hash_file(image_path) if image_path and os.path.exists(image_path) else ''
+    material = json.dumps(
+        [model, normalize_prompt(prompt), image_hash, generation_config or {}],
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+class _InFlight:
+    """Requête en cours partagée par les appels identiques simultanés"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 256, ttl: float = 24 * 3600,
+                 db_path: Optional[str] = None, max_disk_entries: int = 5000):
+        """
+        max_entries: taille maximale du niveau mémoire (LRU)
+        ttl: durée de validité d'une réponse (secondes)
+        db_path: fichier SQLite du niveau disque (désactivé si None)
+        max_disk_entries: nombre maximal de réponses conservées sur disque
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._inflight = {}
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+        }
+
+        self._db = None
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path: str):
+        """Ouvre le niveau disque et purge les entrées expirées"""
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at)"
+        )
+        self._db.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+        self._db.commit()
+        logger.info(f"🗄️  Cache disque ouvert: {db_path}")
+
+    def get(self, key: str) -> Optional[str]:
+        """Retourne la réponse en cache, ou None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if now - created_at < self.ttl:
+                    self._memory.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    metrics.counter('cache_lookups_total', result='memory').inc()
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created_at = row
+                    if now - created_at < self.ttl:
+                        self._remember(key, value, created_at)
+                        self.stats['disk_hits'] += 1
+                        metrics.counter('cache_lookups_total', result='disk').inc()
+                        return value
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.stats['misses'] += 1
+
+            metrics.counter('cache_lookups_total', result='miss').inc()
+            return None
+
+    def put(self, key: str, value: str):
+        """Enregistre une réponse dans les deux niveaux"""
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, value, created_at)
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, value, created_at)
+                )
+                self._db.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,)
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, value: str, created_at: float):
+        """Insère dans le LRU mémoire (verrou déjà pris)"""
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_or_compute(self, key: str, compute: Callable[[], str]) -> str:
+        """
+        Retourne la réponse en cache ou la calcule
+
+        Les appels simultanés pour la même clé attendent la première requête
+        au lieu d'en envoyer une nouvelle. Les exceptions ne sont pas mises en cache.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            inflight = self._inflight.get(key)
+            is_owner = inflight is None
+            if is_owner:
+                inflight = _InFlight()
+                self._inflight[key] = inflight
+            else:
+                self.stats['coalesced'] += 1
+                metrics.counter('cache_lookups_total', result='coalesced').inc()
+
+        if not is_owner:
+            inflight.event.wait()
+            if inflight.error is not None:
+                raise inflight.error
+            return inflight.result
+
+        try:
+            inflight.result = compute()
+            self.put(key, inflight.result)
+            return inflight.result
+        except Exception as e:
+            inflight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            inflight.event.set()
+
+    def clear(self):
+        """Vide les deux niveaux"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,150 @@
+"""
+Nouvelles tentatives et concurrence adaptative
+Backoff exponentiel avec gigue sous une échéance globale, respect de
+Retry-After, et limite de requêtes en vol ajustée en AIMD
+"""
+import asyncio
+import random
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Callable, Optional, TypeVar
+
+from .errors import GeminiError, RateLimitError, classify_exception
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+SUCCESS = 'success'
+THROTTLED = 'throttled'
+FAILED = 'failed'
+
+def is_throttling(error: GeminiError) -> bool:
+    """Le service demande de ralentir (429, ou 503 surcharge)"""
+    return isinstance(error, RateLimitError) or error.status == 503
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.5,
+                 max_delay: float = 20.0, deadline: float = 60.0):
+        """
+        max_attempts: nombre total d'essais
+        base_delay / max_delay: bornes du backoff exponentiel (secondes)
+        deadline: durée totale maximale, attentes comprises
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def backoff(self, attempt: int, error: GeminiError) -> float:
+        """Attente avant l'essai suivant (attempt commence à 1)"""
+        if error.retry_after is not None:
+            # Le serveur sait mieux que nous : petite gigue pour désynchroniser les clients
+            return error.retry_after + random.uniform(0, self.base_delay)
+        # « Full jitter » : uniforme entre 0 et le plafond exponentiel
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _next_delay(self, attempt: int, error: GeminiError, started: float) -> Optional[float]:
+        """Attente avant le prochain essai, ou None s'il faut abandonner"""
+        if not error.retryable or attempt >= self.max_attempts:
+            return None
+        remaining = self.deadline - (time.monotonic() - started)
+        delay = self.backoff(attempt, error)
+        if error.retry_after is not None and delay > remaining:
+            # Le serveur ne sera pas prêt avant l'échéance
+            return None
+        delay = min(delay, remaining)
+        if delay <= 0:
+            return None
+        logger.warning(f"🔁 {error} — nouvel essai {attempt + 1}/{self.max_attempts} dans {delay:.1f}s")
+        return delay
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """Exécute fn() avec nouvelles tentatives ; lève la dernière GeminiError"""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return fn()
+            except Exception as e:
+                error = classify_exception(e)
+                delay = self._next_delay(attempt, error, started)
+                if delay is None:
+                    raise error from e
+                time.sleep(delay)
+
+    async def call_async(self, fn):
+        """Variante asyncio : fn() retourne une coroutine"""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await fn()
+            except Exception as e:
+                error = classify_exception(e)
+                delay = self._next_delay(attempt, error, started)
+                if delay is None:
+                    raise error from e
+                await asyncio.sleep(delay)
+
+class AdaptiveConcurrency:
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 32,
+                 decrease_factor: float = 0.5):
+        """
+        Limite AIMD des requêtes en vol :
+        +1 par fenêtre de succès (limite atteinte), ×decrease_factor sur limitation
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+
+        self._condition = threading.Condition()
+        self._limit = float(initial)
+        self._in_flight = 0
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Réserve une place en vol ; False si timeout est dépassé"""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._in_flight < self.limit, timeout):
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self, outcome: str = SUCCESS):
+        """Libère une place ; outcome : SUCCESS, THROTTLED ou FAILED (limite inchangée)"""
+        with self._condition:
+            self._in_flight -= 1
+            if outcome == THROTTLED:
+                previous = self.limit
+                self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+                if self.limit != previous:
+                    logger.info(f"🐢 Concurrence réduite à {self.limit}")
+            elif outcome == SUCCESS:
+                # Croissance additive : ~+1 après `limit` succès
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """Réserve une place ; la limite s'ajuste selon l'issue de la requête"""
+        self.acquire()
+        outcome = SUCCESS
+        try:
+            yield
+        except BaseException as e:
+            outcome = THROTTLED if is_throttling(classify_exception(e)) else FAILED
+            raise
+        finally:
+            self.release(outcome)
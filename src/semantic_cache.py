@@ -0,0 +1,317 @@
+"""
+Cache sémantique des réponses
+Les prompts sont convertis en vecteurs (embedder local par hachage, ou appels
+d'embedding mis en cache) et rangés dans un index NumPy : une question proche
+d'une question déjà posée reçoit immédiatement la réponse enregistrée.
+"""
+import json
+import os
+import re
+import threading
+import unicodedata
+import zlib
+import logging
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Dépendance optionnelle : cache sémantique indisponible
+    np = None
+
+from .metrics import metrics
+from .response_cache import normalize_prompt
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r'\w+')
+# Mots pour la vérification lexicale : « C++ » et « C# » ne sont pas « C »
+_LEXICAL_WORD = re.compile(r'\w+(?:\+\+|#)?')
+
+# Négations : jamais confondues avec un autre mot, ni ajoutées ou retirées
+NEGATIONS = frozenset("ne n pas plus jamais rien aucun aucune sans non not no never without".split())
+
+# Seuls mots qu'une reformulation peut ajouter ou retirer : politesse et tournures sans contenu
+FILLER_WORDS = frozenset(
+    "bonjour bonsoir salut coucou hello hi hey merci thanks thank please stp svp s il te vous plait "
+    "dis dites moi peux pouvez tu est ce que qu alors donc eh bien okit ok"
+    .split()
+)
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Le cache sémantique nécessite numpy (pip install numpy)")
+
+def _fold(text: str) -> str:
+    """Minuscules sans accents : « Où » et « ou » donnent les mêmes traits"""
+    decomposed = unicodedata.normalize('NFKD', normalize_prompt(text).casefold())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+def _words(text: str) -> set:
+    return set(_LEXICAL_WORD.findall(_fold(text)))
+
+def _close(word: str, other: str) -> bool:
+    """
+    Même mot à une faute de frappe près (substitution, inversion, ajout ou oubli d'une lettre)
+    Les nombres et les négations doivent être identiques (« 2024 » n'est pas « 2025 »)
+    """
+    if abs(len(word) - len(other)) > 1 or min(len(word), len(other)) < 3:
+        return False
+    if any(c.isdigit() for c in word + other) or word in NEGATIONS or other in NEGATIONS:
+        return False
+    if len(word) == len(other):
+        diffs = [i for i, (a, b) in enumerate(zip(word, other)) if a != b]
+        return len(diffs) == 1 or (
+            len(diffs) == 2 and diffs[1] == diffs[0] + 1
+            and word[diffs[0]] == other[diffs[1]] and word[diffs[1]] == other[diffs[0]]
+        )
+    shorter, longer = sorted((word, other), key=len)
+    i = next((i for i, (a, b) in enumerate(zip(shorter, longer)) if a != b), len(shorter))
+    return shorter[i:] == longer[i + 1:]
+
+def is_rewording(query: str, stored: str) -> bool:
+    """
+    Vérification lexicale d'un candidat : fautes de frappe, casse, accents et
+    formules de politesse acceptés ; tout mot de contenu, nombre ou négation
+    ajouté, retiré ou remplacé est refusé (« 2+2 » / « 2+3 », « trie » /
+    « ne trie pas », « demain »), car les embeddings par hachage jugent ces
+    questions très proches
+    """
+    query_words, stored_words = _words(query), _words(stored)
+    only_query = query_words - stored_words
+    only_stored = stored_words - query_words
+    unmatched = [w for w in only_query if not any(_close(w, v) for v in only_stored)]
+    unmatched += [v for v in only_stored if not any(_close(v, w) for w in only_query)]
+    return all(word in FILLER_WORDS for word in unmatched)
+
+class HashingEmbedder:
+    def __init__(self, dim: int = 256, ngram: int = 3, ngram_weight: float = 0.5):
+        """
+        Embedder local sans modèle : mots et n-grammes de caractères hachés
+        dans `dim` dimensions (signe aléatoire stable), vecteur normalisé
+        Robuste à la casse, aux accents, à la ponctuation et aux fautes de frappe
+        """
+        _require_numpy()
+        self.dim = dim
+        self.ngram = ngram
+        self.ngram_weight = ngram_weight
+
+    def _features(self, text: str) -> List[Tuple[str, float]]:
+        features = []
+        for word in _WORD.findall(_fold(text)):
+            features.append((word, 1.0))
+            padded = f' {word} '
+            for i in range(len(padded) - self.ngram + 1):
+                features.append(('#' + padded[i:i + self.ngram], self.ngram_weight))
+        return features
+
+    def embed(self, text: str):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        features = self._features(text)
+        if not features:
+            return vector
+        hashes = np.fromiter((zlib.crc32(f.encode('utf-8')) for f, _ in features),
+                             dtype=np.uint32, count=len(features))
+        weights = np.fromiter((w for _, w in features), dtype=np.float32, count=len(features))
+        # Un bit du hachage donne le signe : les collisions se compensent en moyenne
+        signs = np.where((hashes >> 31) & 1, -1.0, 1.0).astype(np.float32)
+        np.add.at(vector, hashes % self.dim, signs * weights)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+class CachedEmbedder:
+    def __init__(self, embed_fn: Callable[[str], List[float]], dim: int, max_entries: int = 4096):
+        """
+        Embedder distant (API d'embedding) : un seul appel par prompt normalisé
+        embed_fn(texte) -> liste de `dim` flottants
+        """
+        _require_numpy()
+        self.embed_fn = embed_fn
+        self.dim = dim
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+
+    def embed(self, text: str):
+        key = normalize_prompt(text)
+        with self._lock:
+            vector = self._cache.get(key)
+            if vector is not None:
+                self._cache.move_to_end(key)
+                return vector
+
+        vector = np.asarray(self.embed_fn(key), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+        with self._lock:
+            self._cache[key] = vector
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return vector
+
+class VectorIndex:
+    def __init__(self, dim: int, capacity: int):
+        """
+        Index de similarité cosinus à capacité fixe (vecteurs normalisés)
+        Matrice préallouée ; le slot le moins récemment utilisé est réutilisé
+        """
+        _require_numpy()
+        self.dim = dim
+        self.capacity = capacity
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        # Horloge logique du dernier accès de chaque slot (éviction LRU)
+        self.last_used = np.zeros(capacity, dtype=np.int64)
+        self.values: List[Optional[list]] = [None] * capacity
+        self.size = 0
+        self._clock = 0
+
+    def search(self, vector, k: int = 1, min_score: float = -1.0) -> List[Tuple[int, float]]:
+        """Les k slots les plus proches (similarité décroissante, au moins min_score)"""
+        if self.size == 0:
+            return []
+        scores = self.vectors[:self.size] @ vector
+        k = min(k, self.size)
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(int(slot), float(scores[slot])) for slot in top if scores[slot] >= min_score]
+
+    def touch(self, slot: int):
+        self._clock += 1
+        self.last_used[slot] = self._clock
+
+    def next_slot(self) -> int:
+        """Slot qu'occupera le prochain ajout (libre, sinon le moins récemment utilisé)"""
+        if self.size < self.capacity:
+            return self.size
+        return int(np.argmin(self.last_used))
+
+    def add(self, vector, value) -> int:
+        slot = self.next_slot()
+        if slot == self.size:
+            self.size += 1
+        self.vectors[slot] = vector
+        self.values[slot] = value
+        self.touch(slot)
+        return slot
+
+    def save(self, path: str):
+        """Écriture atomique (fichier temporaire puis renommage)"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                vectors=self.vectors[:self.size],
+                last_used=self.last_used[:self.size],
+                # Réponses en JSON UTF-8 brut (pas de pickle, pas d'UTF-32)
+                values=np.frombuffer(json.dumps(self.values[:self.size], ensure_ascii=False).encode('utf-8'),
+                                     dtype=np.uint8)
+            )
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> bool:
+        with np.load(path, allow_pickle=False) as data:
+            vectors = data['vectors']
+            if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+                logger.warning(f"Index sémantique ignoré (dimension {vectors.shape[-1]} ≠ {self.dim})")
+                return False
+            last_used = data['last_used']
+            values = json.loads(data['values'].tobytes().decode('utf-8'))
+
+        # Capacité réduite depuis l'enregistrement : on garde les plus récents
+        keep = np.argsort(last_used)[-self.capacity:]
+        self.size = len(keep)
+        self.vectors[:self.size] = vectors[keep]
+        self.last_used[:self.size] = last_used[keep]
+        self.values[:self.size] = [values[i] for i in keep]
+        self._clock = int(self.last_used[:self.size].max()) if self.size else 0
+        return True
+
+class SemanticCache:
+    def __init__(self, embedder=None, threshold: float = 0.85, max_entries: int = 5000,
+                 path: Optional[str] = None, lexical_check: bool = True, candidates: int = 4):
+        """
+        embedder: objet exposant dim et embed(texte) (HashingEmbedder par défaut)
+        threshold: similarité cosinus minimale pour réutiliser une réponse
+        max_entries: capacité de l'index (LRU au-delà)
+        path: fichier .npz de persistance (chargé à l'ouverture, écrit par save/close)
+        lexical_check: écarte les candidats dont un mot de contenu diffère (is_rewording)
+        candidates: nombre de voisins examinés au-dessus du seuil
+        """
+        _require_numpy()
+        self.embedder = embedder or HashingEmbedder()
+        self.threshold = threshold
+        self.lexical_check = lexical_check
+        self.candidates = candidates
+        self.path = path
+        self.index = VectorIndex(self.embedder.dim, max_entries)
+        self._lock = threading.Lock()
+        self._dirty = False
+        # Prompt normalisé -> slot : une question reposée remplace sa réponse
+        self._slots = {}
+        self.stats = {'hits': 0, 'misses': 0}
+
+        if path and os.path.exists(path):
+            try:
+                if self.index.load(path):
+                    self._slots = {normalize_prompt(self.index.values[slot][0]): slot
+                                   for slot in range(self.index.size)}
+                    logger.info(f"🧭 Index sémantique chargé: {self.index.size} réponses")
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Index sémantique illisible, ignoré: {e}")
+
+    def get(self, prompt: str) -> Optional[str]:
+        """Réponse d'une question suffisamment proche, ou None"""
+        vector = self.embedder.embed(prompt)
+        with self._lock:
+            for slot, score in self.index.search(vector, self.candidates, self.threshold):
+                stored_prompt, answer = self.index.values[slot]
+                if self.lexical_check and not is_rewording(prompt, stored_prompt):
+                    continue
+                self.index.touch(slot)
+                self.stats['hits'] += 1
+                metrics.counter('semantic_cache_lookups_total', result='hit').inc()
+                metrics.histogram('semantic_cache_hit_similarity').record(score)
+                return answer
+
+            self.stats['misses'] += 1
+            metrics.counter('semantic_cache_lookups_total', result='miss').inc()
+            return None
+
+    def put(self, prompt: str, answer: str):
+        key = normalize_prompt(prompt)
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is not None:
+                self.index.values[slot] = [prompt, answer]
+                self.index.touch(slot)
+                self._dirty = True
+                return
+
+        vector = self.embedder.embed(prompt)
+        with self._lock:
+            if key in self._slots:
+                return
+            evicted = self.index.values[self.index.next_slot()]
+            if evicted is not None:
+                self._slots.pop(normalize_prompt(evicted[0]), None)
+            self._slots[key] = self.index.add(vector, [prompt, answer])
+            self._dirty = True
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.index.save(self.path)
+            self._dirty = False
+
+    def close(self):
+        try:
+            self.save()
+        except OSError as e:
+            logger.warning(f"Enregistrement de l'index sémantique impossible: {e}")
@@ -0,0 +1,417 @@
+"""
+Service HTTP sans interface (poste de travail, serveur)
+API JSON locale au-dessus d'AsyncGeminiClient : génération, sessions de chat,
+images et streaming SSE. Tous les clients partagent le pool de connexions,
+le cache de réponses et le limiteur de débit.
+
+    python -m src.service --port 8080
+"""
+import argparse
+import asyncio
+import base64
+import binascii
+import json
+import os
+import tempfile
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from aiohttp import web
+
+from .async_gemini_client import AsyncGeminiClient
+from .context_window import ContextWindow
+from .errors import (AuthenticationError, GeminiError, InvalidRequestError, NetworkError,
+                     RateLimitError, ServiceUnavailableError)
+from .gemini_rest import DEFAULT_BASE_URL, DEFAULT_GENERATION_CONFIG, MODEL_NAME
+from .metrics import metrics
+from .rate_limiter import TokenBucket
+from .response_cache import ResponseCache, make_cache_key
+
+logger = logging.getLogger(__name__)
+
+# Statut HTTP renvoyé au client pour chaque erreur Gemini
+ERROR_STATUSES = [
+    (RateLimitError, 429),
+    (ServiceUnavailableError, 503),
+    (NetworkError, 502),
+    (AuthenticationError, 502),
+    (InvalidRequestError, 400),
+    (GeminiError, 502),
+]
+
+# Corps de requête maximal (images encodées en base64)
+MAX_BODY_BYTES = 20 * 1024 * 1024
+
+def _error_response(status: int, message: str, retry_after: Optional[float] = None) -> web.Response:
+    headers = {'Retry-After': f"{max(1, round(retry_after))}"} if retry_after else None
+    return web.json_response({'error': message}, status=status, headers=headers)
+
+def _gemini_error_response(error: GeminiError) -> web.Response:
+    status = next(status for error_class, status in ERROR_STATUSES if isinstance(error, error_class))
+    return _error_response(status, str(error), error.retry_after)
+
+def _bad_request(message: str) -> web.HTTPBadRequest:
+    return web.HTTPBadRequest(text=json.dumps({'error': message}), content_type='application/json')
+
+def _sse(data: dict, event: Optional[str] = None) -> bytes:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n".encode('utf-8')
+
+class _ChatSession:
+    __slots__ = ('context', 'lock', 'last_used')
+
+    def __init__(self, context: ContextWindow):
+        self.context = context
+        # Les tours d'une même session sont traités l'un après l'autre
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+class OkitService:
+    def __init__(self, client: AsyncGeminiClient,
+                 cache: Optional[ResponseCache] = None,
+                 limiter: Optional[TokenBucket] = None,
+                 max_concurrency: int = 32,
+                 queue_timeout: float = 30.0,
+                 max_sessions: int = 1000,
+                 session_ttl: float = 3600.0,
+                 context_budget: int = 8000):
+        """
+        client: client asynchrone partagé (un seul pool de connexions)
+        cache: cache des réponses sans historique (texte et images)
+        limiter: débit maximal des appels à Gemini, tous clients confondus
+        max_concurrency: appels à Gemini en vol ; les suivants attendent leur tour
+        queue_timeout: attente maximale (limiteur et file) avant un 429
+        max_sessions: sessions de chat gardées en mémoire (LRU au-delà)
+        session_ttl: durée d'inactivité après laquelle une session est oubliée
+        context_budget: budget de tokens de la fenêtre de contexte de chaque session
+        """
+        self.client = client
+        self.cache = cache
+        self.limiter = limiter
+        self.queue_timeout = queue_timeout
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self.context_budget = context_budget
+        self.max_concurrency = max_concurrency
+        self._slots = None
+        self._sessions = OrderedDict()
+        # Requêtes identiques simultanées : un seul appel à Gemini
+        self._inflight = {}
+        self.closing = False
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware], client_max_size=MAX_BODY_BYTES)
+        app.add_routes([
+            web.get('/health', self.health),
+            web.get('/metrics', self.export_metrics),
+            web.post('/v1/generate', self.generate),
+            web.post('/v1/sessions', self.create_session),
+            web.post('/v1/sessions/{session_id}/messages', self.send_message),
+            web.delete('/v1/sessions/{session_id}', self.delete_session),
+        ])
+        app.on_startup.append(self._on_startup)
+        app.on_shutdown.append(self._on_shutdown)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+    async def _on_startup(self, app):
+        # Sémaphore créé dans la boucle du serveur
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        logger.info("🌐 Service Okit AI démarré")
+
+    async def _on_shutdown(self, app):
+        # Plus de nouvelles requêtes ; celles en cours ont shutdown_timeout pour finir
+        self.closing = True
+        logger.info("🛑 Arrêt du service : fin des requêtes en cours")
+
+    async def _on_cleanup(self, app):
+        await self.client.close()
+        if self.cache is not None:
+            self.cache.close()
+        logger.info("✅ Service arrêté, connexions fermées")
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        resource = request.match_info.route.resource
+        route = resource.canonical if resource is not None else 'unknown'
+        start = time.perf_counter()
+        # Statut conservé si le client se déconnecte en cours de réponse
+        status = 'disconnected'
+        try:
+            if self.closing:
+                response = _error_response(503, "Service en cours d'arrêt")
+            else:
+                try:
+                    response = await handler(request)
+                except GeminiError as e:
+                    response = _gemini_error_response(e)
+                except (web.HTTPException, ConnectionResetError):
+                    raise
+                except Exception:
+                    logger.exception(f"❌ Erreur interne ({route})")
+                    response = _error_response(500, "Erreur interne")
+            status = response.status
+            return response
+        except web.HTTPException as e:
+            status = e.status
+            raise
+        finally:
+            metrics.counter('service_requests_total', route=route, status=status).inc()
+            metrics.histogram('service_request_seconds', route=route).record(time.perf_counter() - start)
+
+    @asynccontextmanager
+    async def _upstream(self):
+        """Place dans le limiteur de débit et parmi les appels en vol, ou 429"""
+        deadline = time.monotonic() + self.queue_timeout
+        if self.limiter is not None and not await self.limiter.acquire_async(timeout=self.queue_timeout):
+            raise RateLimitError("Débit maximal atteint, réessayez plus tard",
+                                 retry_after=1 / self.limiter.rate)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            raise RateLimitError("Trop de requêtes en cours, réessayez plus tard", retry_after=1)
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    async def _read_json(self, request: web.Request) -> dict:
+        try:
+            data = await request.json()
+        except ValueError:
+            raise _bad_request("Corps JSON invalide")
+        if not isinstance(data, dict):
+            raise _bad_request("Un objet JSON est attendu")
+        return data
+
+    @staticmethod
+    def _text(data: dict, name: str) -> str:
+        value = data.get(name)
+        if not isinstance(value, str) or not value.strip():
+            raise _bad_request(f"Champ '{name}' manquant ou vide")
+        return value
+
+    @asynccontextmanager
+    async def _image_file(self, data: dict):
+        """Image base64 du champ 'image' écrite dans un fichier temporaire (ou None)"""
+        encoded = data.get('image')
+        if not encoded:
+            yield None
+            return
+        try:
+            raw = base64.b64decode(encoded, validate=True)
+        except (binascii.Error, TypeError, ValueError):
+            raise _bad_request("Champ 'image' : base64 invalide")
+
+        loop = asyncio.get_running_loop()
+        path = await loop.run_in_executor(None, _write_temp_file, raw)
+        try:
+            yield path
+        finally:
+            await loop.run_in_executor(None, os.remove, path)
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({'status': 'ok', 'sessions': len(self._sessions)})
+
+    async def export_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=metrics.to_prometheus(), content_type='text/plain', charset='utf-8')
+
+    async def generate(self, request: web.Request) -> web.StreamResponse:
+        """{prompt, image?, stream?} -> {text, cached} ou flux SSE"""
+        data = await self._read_json(request)
+        prompt = self._text(data, 'prompt')
+        async with self._image_file(data) as image_path:
+            loop = asyncio.get_running_loop()
+            key = None
+            if self.cache is not None:
+                key = await loop.run_in_executor(
+                    None, make_cache_key, MODEL_NAME, prompt, image_path, DEFAULT_GENERATION_CONFIG
+                )
+                cached = await loop.run_in_executor(None, self.cache.get, key)
+                if cached is not None:
+                    if data.get('stream'):
+                        return await self._stream_cached(request, cached)
+                    return web.json_response({'text': cached, 'cached': True})
+
+            if data.get('stream'):
+                return await self._stream_reply(request, prompt, image_path, cache_key=key)
+            text = await self._complete_once(key, prompt, image_path)
+            return web.json_response({'text': text, 'cached': False})
+
+    async def _complete_once(self, key: Optional[str], prompt: str, image_path: Optional[str]) -> str:
+        """Appel à Gemini partagé par les requêtes identiques simultanées"""
+        if key is None:
+            async with self._upstream():
+                return await self.client.complete(prompt, image_path)
+
+        future = self._inflight.get(key)
+        if future is not None:
+            metrics.counter('service_coalesced_total').inc()
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            async with self._upstream():
+                text = await self.client.complete(prompt, image_path)
+            await asyncio.get_running_loop().run_in_executor(None, self.cache.put, key, text)
+            future.set_result(text)
+            return text
+        except BaseException as e:
+            future.set_exception(e)
+            # Erreur déjà remontée à ce client : les autres la reçoivent via future
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _open_stream(self, request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(headers={
+            'Content-Type': 'text/event-stream; charset=utf-8',
+            'Cache-Control': 'no-cache',
+        })
+        await response.prepare(request)
+        return response
+
+    async def _stream_cached(self, request: web.Request, text: str) -> web.StreamResponse:
+        response = await self._open_stream(request)
+        await response.write(_sse({'text': text}))
+        await response.write(_sse({'cached': True}, event='done'))
+        await response.write_eof()
+        return response
+
+    async def _stream_reply(self, request: web.Request, prompt: str, image_path: Optional[str],
+                            history: Optional[List[dict]] = None,
+                            cache_key: Optional[str] = None) -> web.StreamResponse:
+        """
+        Fragments envoyés en SSE dès leur réception, puis un événement 'done'
+        Une erreur avant le premier fragment donne une réponse d'erreur JSON,
+        après lui un événement 'error'. Réponse complète dans request['reply']
+        """
+        async with self._upstream():
+            chunks = self.client.stream(prompt, image_path, history)
+            try:
+                # Flux ouvert au client seulement une fois Gemini joint
+                try:
+                    received = [await chunks.__anext__()]
+                except StopAsyncIteration:
+                    received = []
+                response = await self._open_stream(request)
+                if received:
+                    await response.write(_sse({'text': received[0]}))
+                try:
+                    async for chunk in chunks:
+                        received.append(chunk)
+                        await response.write(_sse({'text': chunk}))
+                except GeminiError as e:
+                    await response.write(_sse({'error': str(e)}, event='error'))
+                    await response.write_eof()
+                    return response
+            finally:
+                # Libère la connexion à Gemini si le client s'est déconnecté
+                await chunks.aclose()
+
+        reply = ''.join(received)
+        request['reply'] = reply
+        if cache_key is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.cache.put, cache_key, reply)
+        await response.write(_sse({'cached': False}, event='done'))
+        await response.write_eof()
+        return response
+
+    def _evict_sessions(self):
+        expired_before = time.monotonic() - self.session_ttl
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and session.last_used >= expired_before:
+                break
+            del self._sessions[session_id]
+
+    def _session(self, request: web.Request) -> _ChatSession:
+        session_id = request.match_info['session_id']
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise web.HTTPNotFound(text=json.dumps({'error': "Session inconnue ou expirée"}),
+                                   content_type='application/json')
+        session.last_used = time.monotonic()
+        self._sessions.move_to_end(session_id)
+        return session
+
+    async def create_session(self, request: web.Request) -> web.Response:
+        """{history?: [{role, text}]} -> {session_id}"""
+        data = await self._read_json(request) if request.body_exists else {}
+        history = data.get('history') or []
+        try:
+            turns = [{'role': turn['role'], 'parts': [turn['text']]} for turn in history]
+        except (KeyError, TypeError):
+            raise _bad_request("Champ 'history' : liste de {role, text} attendue")
+
+        session_id = uuid.uuid4().hex
+        self._sessions[session_id] = _ChatSession(
+            ContextWindow.from_history(turns, token_budget=self.context_budget)
+        )
+        self._evict_sessions()
+        return web.json_response({'session_id': session_id}, status=201)
+
+    async def delete_session(self, request: web.Request) -> web.Response:
+        self._session(request)
+        del self._sessions[request.match_info['session_id']]
+        return web.Response(status=204)
+
+    async def send_message(self, request: web.Request) -> web.StreamResponse:
+        """{message, image?, stream?} -> {text} ou flux SSE ; le tour n'est gardé qu'en cas de succès"""
+        session = self._session(request)
+        data = await self._read_json(request)
+        message = self._text(data, 'message')
+        async with session.lock, self._image_file(data) as image_path:
+            history, _ = session.context.build(message)
+            if data.get('stream'):
+                response = await self._stream_reply(request, message, image_path, history)
+                reply = request.get('reply')
+            else:
+                async with self._upstream():
+                    reply = await self.client.complete(message, image_path, history)
+                response = web.json_response({'text': reply})
+            if reply:
+                session.context.add('user', message)
+                session.context.add('model', reply)
+            return response
+
+def _write_temp_file(data: bytes) -> str:
+    fd, path = tempfile.mkstemp(prefix='okit-image-')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Service HTTP Okit AI (sans interface)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help="Racine de l'API REST Gemini")
+    parser.add_argument('--pool-size', type=int, default=64, help="Connexions keep-alive vers Gemini")
+    parser.add_argument('--max-concurrency', type=int, default=32, help="Appels à Gemini en vol")
+    parser.add_argument('--requests-per-minute', type=float, help="Débit maximal vers Gemini")
+    parser.add_argument('--cache-db', help="Fichier SQLite du cache de réponses (mémoire seule sinon)")
+    parser.add_argument('--max-sessions', type=int, default=1000)
+    parser.add_argument('--shutdown-timeout', type=float, default=30.0,
+                        help="Délai laissé aux requêtes en cours à l'arrêt (secondes)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    service = OkitService(
+        AsyncGeminiClient(base_url=args.base_url, pool_size=args.pool_size),
+        cache=ResponseCache(db_path=args.cache_db),
+        limiter=TokenBucket.per_minute(args.requests_per_minute) if args.requests_per_minute else None,
+        max_concurrency=args.max_concurrency,
+        max_sessions=args.max_sessions
+    )
+    # SIGINT/SIGTERM : arrêt de l'écoute, fin des requêtes en cours, puis nettoyage
+    web.run_app(service.create_app(), host=args.host, port=args.port,
+                shutdown_timeout=args.shutdown_timeout)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Conversations multiples
+Chaque conversation est une session : vue de chat, file de mises à jour et
+fenêtre de contexte Gemini. Seules les sessions actives ou récemment utilisées
+sont hydratées en mémoire ; les autres sont rechargées depuis le store à la demande
+"""
+import time
+import logging
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+from .conversation_store import DEFAULT_TITLE, ConversationStore
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class ChatSession:
+    """Conversation hydratée ; view, queue et context sont libérés à l'éviction"""
+
+    def __init__(self, conversation_id: int, title: str):
+        self.conversation_id = conversation_id
+        self.title = title
+        self.view = None
+        self.queue = None
+        self.context = None
+        # Réponses en cours : une session occupée n'est jamais évincée
+        self.active_requests = []
+        # Réponses terminées pendant que la conversation était en arrière-plan
+        self.unread = 0
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.active_requests)
+
+class SessionManager:
+    def __init__(self, store: ConversationStore, view_factory: Callable,
+                 context_factory: Optional[Callable] = None,
+                 max_hydrated: int = 3, page_size: int = 30, history_turns: int = 20):
+        """
+        view_factory() -> (vue, file de mises à jour) d'une nouvelle session
+        context_factory(historique) -> fenêtre de contexte (None tant que le client n'est pas prêt)
+        max_hydrated: sessions gardées en mémoire, la session active comprise
+        page_size: messages affichés à l'hydratation d'une session
+        history_turns: derniers messages repris dans la fenêtre de contexte
+        """
+        self.store = store
+        self.view_factory = view_factory
+        self.context_factory = context_factory
+        self.max_hydrated = max_hydrated
+        self.page_size = page_size
+        self.history_turns = history_turns
+        # Sessions hydratées, de la moins à la plus récemment utilisée
+        self._sessions = OrderedDict()
+        self.active: Optional[ChatSession] = None
+
+    def hydrated(self) -> List[int]:
+        return list(self._sessions)
+
+    def get(self, conversation_id: int) -> Optional[ChatSession]:
+        return self._sessions.get(conversation_id)
+
+    def activate(self, conversation_id: int) -> ChatSession:
+        """Session affichée ; hydratée depuis le store si elle avait été évincée"""
+        start = time.perf_counter()
+        session = self._sessions.get(conversation_id)
+        hydrated = session is None
+        if hydrated:
+            session = self._hydrate(conversation_id)
+            self._sessions[conversation_id] = session
+        self._sessions.move_to_end(conversation_id)
+        session.unread = 0
+        self.active = session
+        self.evict_idle()
+
+        elapsed = time.perf_counter() - start
+        metrics.histogram('session_switch_seconds', hydrated='yes' if hydrated else 'no').record(elapsed)
+        logger.info(f"🗂️ Conversation {conversation_id} affichée en {elapsed * 1000:.1f} ms"
+                    f"{' (rechargée)' if hydrated else ''}")
+        return session
+
+    def create(self, title: str = DEFAULT_TITLE) -> ChatSession:
+        return self.activate(self.store.create_conversation(title))
+
+    def _hydrate(self, conversation_id: int) -> ChatSession:
+        conversation = self.store.conversation(conversation_id)
+        session = ChatSession(conversation_id, conversation.title if conversation else DEFAULT_TITLE)
+        session.view, session.queue = self.view_factory()
+        messages = self.store.tail(self.page_size, conversation_id)
+        session.view.load_messages(
+            [(m.text, m.role == 'user', m.id) for m in messages],
+            has_older=len(messages) == self.page_size
+        )
+        return session
+
+    def context(self, session: ChatSession):
+        """Fenêtre de contexte de la session, créée au premier message envoyé"""
+        if session.context is None and self.context_factory is not None:
+            session.context = self.context_factory(
+                self.store.chat_history(self.history_turns, session.conversation_id)
+            )
+        return session.context
+
+    def evict_idle(self):
+        """Libère les sessions les moins récemment utilisées au-delà de max_hydrated"""
+        excess = len(self._sessions) - self.max_hydrated
+        for conversation_id in list(self._sessions):
+            if excess <= 0:
+                break
+            session = self._sessions[conversation_id]
+            # Les réponses en arrière-plan continuent : la session reste hydratée
+            if session is self.active or session.busy:
+                continue
+            del self._sessions[conversation_id]
+            session.view = session.queue = session.context = None
+            excess -= 1
+            logger.info(f"💤 Conversation {conversation_id} évincée de la mémoire")
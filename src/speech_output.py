@@ -0,0 +1,282 @@
+"""
+Synthèse vocale en flux
+La réponse est découpée en phrases au fil de la génération ; chaque phrase
+est synthétisée et mise en file pendant que la suite arrive encore.
+Interruption immédiate (barge-in) quand l'utilisateur reprend la parole.
+"""
+import queue
+import re
+import threading
+import time
+import logging
+from typing import List, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Fin de phrase : ponctuation finale suivie d'un espace, ou saut de ligne
+_SENTENCE_END = re.compile(r'(?<=[.!?…])["»)\]]*\s+|\n+')
+# Abréviations courantes qui ne terminent pas une phrase
+_ABBREVIATION = re.compile(r'(?:\b[A-Z]|\b(?:Mme|Mlle|Dr|Pr|St|etc|ex|cf|p|vs|env))\.$')
+# Marques Markdown et emojis inutiles à l'oral
+_UNSPOKEN = re.compile(r'[*_#`>|~]+|[\U0001F000-\U0001FAFF☀-➿]')
+
+class SentenceSplitter:
+    def __init__(self, min_chars: int = 20, max_chars: int = 300):
+        """
+        min_chars: phrases plus courtes regroupées avec la suivante (« Oui. », « M. »)
+        max_chars: au-delà, coupe à la dernière virgule ou espace
+        """
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ''
+
+    def feed(self, text: str) -> List[str]:
+        """Ajoute du texte ; retourne les phrases complètes"""
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            if _ABBREVIATION.search(self._buffer, start, match.start()):
+                continue
+            if match.end() - start >= self.min_chars:
+                sentences.append(self._buffer[start:match.end()])
+                start = match.end()
+        self._buffer = self._buffer[start:]
+
+        while len(self._buffer) > self.max_chars:
+            cut = max(self._buffer.rfind(',', 0, self.max_chars), self._buffer.rfind(' ', 0, self.max_chars))
+            cut = cut + 1 if cut > 0 else self.max_chars
+            sentences.append(self._buffer[:cut])
+            self._buffer = self._buffer[cut:]
+
+        return [s for s in (_clean(sentence) for sentence in sentences) if s]
+
+    def flush(self) -> List[str]:
+        """Texte restant en fin de réponse"""
+        rest, self._buffer = _clean(self._buffer), ''
+        return [rest] if rest else []
+
+    def reset(self):
+        self._buffer = ''
+
+def _clean(text: str) -> str:
+    return ' '.join(_UNSPOKEN.sub(' ', text).split())
+
+class TTSBackend:
+    """
+    Moteur de synthèse : speak() bloque jusqu'à la fin de la phrase ou stop()
+    prepare() réarme le moteur avant chaque phrase ; un stop() reçu ensuite,
+    même avant speak(), coupe cette phrase
+    """
+
+    def prepare(self):
+        pass
+
+    def speak(self, text: str, on_start=None):
+        raise NotImplementedError
+
+    def stop(self):
+        pass
+
+class FakeTTSBackend(TTSBackend):
+    def __init__(self, chars_per_second: float = 15.0, setup_delay: float = 0.0):
+        """Moteur simulé (tests, benchmarks) : durée proportionnelle au texte"""
+        self.chars_per_second = chars_per_second
+        self.setup_delay = setup_delay
+        self.spoken: List[str] = []
+        self._stopped = threading.Event()
+
+    def prepare(self):
+        self._stopped.clear()
+
+    def speak(self, text: str, on_start=None):
+        if self._stopped.wait(self.setup_delay):
+            return
+        if on_start:
+            on_start()
+        self.spoken.append(text)
+        self._stopped.wait(len(text) / self.chars_per_second)
+
+    def stop(self):
+        self._stopped.set()
+
+class AndroidTTSBackend(TTSBackend):
+    def __init__(self, language: str = 'fr', init_timeout: float = 5.0):
+        """
+        TextToSpeech Android via pyjnius
+        Le moteur s'initialise en arrière-plan : la langue n'est appliquée
+        qu'une fois onInit reçu, sinon elle serait ignorée
+        """
+        from jnius import PythonJavaClass, autoclass, java_method
+
+        self._TextToSpeech = autoclass('android.speech.tts.TextToSpeech')
+        locale = autoclass('java.util.Locale')(language)
+        activity = autoclass('org.kivy.android.PythonActivity').mActivity
+        self.init_timeout = init_timeout
+        self._ready = threading.Event()
+        self._init_ok = False
+
+        backend = self
+
+        class InitListener(PythonJavaClass):
+            __javainterfaces__ = ['android/speech/tts/TextToSpeech$OnInitListener']
+            __javacontext__ = 'app'
+
+            @java_method('(I)V')
+            def onInit(self, status):
+                backend._on_init(status, locale)
+
+        # Référence conservée : le listener ne doit pas être collecté avant l'appel
+        self._init_listener = InitListener()
+        self._tts = self._TextToSpeech(activity, self._init_listener)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._counter = 0
+
+    def _on_init(self, status: int, locale):
+        if status == self._TextToSpeech.SUCCESS:
+            result = self._tts.setLanguage(locale)
+            if result in (self._TextToSpeech.LANG_MISSING_DATA, self._TextToSpeech.LANG_NOT_SUPPORTED):
+                logger.warning(f"Synthèse vocale : langue {locale.toString()} indisponible, langue par défaut")
+            self._init_ok = True
+        else:
+            logger.error(f"❌ Initialisation de la synthèse vocale impossible (statut {status})")
+        self._ready.set()
+
+    def prepare(self):
+        self._stopped.clear()
+
+    def speak(self, text: str, on_start=None):
+        if not self._ready.wait(self.init_timeout) or not self._init_ok:
+            logger.warning("🔇 Synthèse vocale non initialisée, phrase ignorée")
+            return
+        with self._lock:
+            # stop() reçu depuis prepare() : la phrase n'est jamais confiée au moteur
+            if self._stopped.is_set():
+                return
+            self._counter += 1
+            self._tts.speak(text, self._TextToSpeech.QUEUE_ADD, None, f"okit-{self._counter}")
+        # Pas d'UtteranceProgressListener sans classe Java : scrutation légère
+        started = False
+        deadline = time.monotonic() + 2.0
+        while not self._stopped.is_set():
+            speaking = self._tts.isSpeaking()
+            if speaking and not started:
+                started = True
+                if on_start:
+                    on_start()
+            elif not speaking and (started or time.monotonic() > deadline):
+                return
+            self._stopped.wait(0.02)
+
+    def stop(self):
+        with self._lock:
+            self._stopped.set()
+            self._tts.stop()
+
+class SpeechPipeline:
+    def __init__(self, backend: TTSBackend, splitter: Optional[SentenceSplitter] = None,
+                 max_queue: int = 32):
+        """
+        File de phrases lue par un thread dédié
+        begin() / feed() / finish() pour une réponse ; cancel() pour l'interrompre
+        """
+        self.backend = backend
+        self.splitter = splitter or SentenceSplitter()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        # Chaque réponse a sa génération : cancel() invalide les phrases en file
+        self._generation = 0
+        # Réponse en cours de lecture ; après cancel(), ses fragments sont ignorés
+        self._active = False
+        self._requested_at = None
+        self._first_spoken = True
+
+        self._thread = threading.Thread(target=self._run, name="okit-tts", daemon=True)
+        self._thread.start()
+
+    def begin(self, requested_at: Optional[float] = None):
+        """Nouvelle réponse ; requested_at : instant de la question (mesure de latence)"""
+        self.cancel()
+        with self._lock:
+            self._requested_at = requested_at or time.perf_counter()
+            self._first_spoken = False
+            self._active = True
+
+    def feed(self, text: str):
+        """Fragment de réponse en cours de génération (tout thread)"""
+        with self._lock:
+            if not self._active:
+                return
+            sentences = self.splitter.feed(text)
+            generation = self._generation
+        for sentence in sentences:
+            self._enqueue(generation, sentence)
+
+    def finish(self):
+        with self._lock:
+            if not self._active:
+                return
+            sentences = self.splitter.flush()
+            generation = self._generation
+            self._active = False
+        for sentence in sentences:
+            self._enqueue(generation, sentence)
+
+    def speak(self, text: str):
+        """Lit un texte complet"""
+        self.begin()
+        self.feed(text)
+        self.finish()
+
+    def cancel(self):
+        """Barge-in : coupe la phrase en cours et vide la file"""
+        with self._lock:
+            self._generation += 1
+            self._active = False
+            self.splitter.reset()
+            # Sous le verrou : ne peut ni précéder le prepare() d'une phrase
+            # périmée, ni couper une phrase de la réponse suivante
+            self.backend.stop()
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _enqueue(self, generation: int, sentence: str):
+        try:
+            self._queue.put((generation, sentence), timeout=1.0)
+        except queue.Full:
+            logger.warning("🔇 File de synthèse pleine, phrase ignorée")
+
+    def _on_start(self, generation: int):
+        with self._lock:
+            if generation != self._generation or self._first_spoken:
+                return
+            self._first_spoken = True
+            latency = time.perf_counter() - self._requested_at
+        metrics.histogram('tts_speech_start_seconds').record(latency)
+        logger.info(f"🔊 Parole démarrée {latency:.2f}s après la question")
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            generation, sentence = item
+            with self._lock:
+                if generation != self._generation:
+                    continue
+                # Réarmé avec la vérification : un cancel() ultérieur coupe cette phrase
+                self.backend.prepare()
+            try:
+                self.backend.speak(sentence, on_start=lambda g=generation: self._on_start(g))
+            except Exception as e:
+                logger.error(f"❌ Erreur synthèse vocale: {e}")
+
+    def close(self):
+        self.cancel()
+        self._queue.put(None)
@@ -0,0 +1,39 @@
+"""
+Mesure du temps de démarrage Okit AI
+Chronomètre chaque phase (imports, construction UI, première frame, services)
+"""
+import time
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+class StartupTimer:
+    def __init__(self, origin: float = None):
+        """origin: instant de référence (perf_counter), par défaut maintenant"""
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name: str):
+        """Chronomètre un bloc de code"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, duration: float):
+        self.phases.append((name, duration))
+        logger.info(f"🚀 {name}: {duration * 1000:.1f} ms")
+
+    def mark(self, name: str):
+        """Enregistre le temps écoulé depuis l'origine (ex: première frame)"""
+        self.record(name, time.perf_counter() - self.origin)
+
+    def report(self) -> dict:
+        """Durées par phase, en millisecondes"""
+        return {name: round(duration * 1000, 1) for name, duration in self.phases}
+
+# Chronomètre global du processus, démarré au premier import
+startup_timer = StartupTimer()
@@ -0,0 +1,32 @@
+"""
+Images de l'interface
+Les icônes sont lues dans l'atlas de la densité de l'écran (créé par
+create_assets.py) : une seule texture partagée, à la bonne résolution.
+Repli sur les PNG d'origine si l'atlas n'a pas été généré.
+"""
+import os
+
+from kivy.metrics import Metrics
+
+# Doit correspondre à DENSITIES dans create_assets.py
+DENSITIES = [('mdpi', 1.0), ('hdpi', 1.5), ('xhdpi', 2.0), ('xxhdpi', 3.0), ('xxxhdpi', 4.0)]
+
+FALLBACK = {
+    'wolf': 'assets/wolf_icon.png',
+    'user': 'assets/user_icon.png',
+    'logo': 'assets/wolf_icon.png',
+}
+
+def density_bucket(density: float) -> str:
+    """Plus petite densité disponible couvrant celle de l'écran"""
+    for name, scale in DENSITIES:
+        if scale >= density - 0.01:
+            return name
+    return DENSITIES[-1][0]
+
+def image_source(name: str) -> str:
+    """Source Kivy (atlas:// ou chemin PNG) de l'icône `name`"""
+    atlas = f'assets/okit-{density_bucket(Metrics.density)}'
+    if os.path.exists(atlas + '.atlas'):
+        return f'atlas://{atlas}/{name}'
+    return FALLBACK[name]
@@ -0,0 +1,544 @@
+"""
+Historique de chat virtualisé (RecycleView)
+Seules les bulles visibles existent en tant que widgets ; les messages
+sont de simples dictionnaires dans `data`, recyclés au défilement
+"""
+import time
+
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.factory import Factory
+from kivy.graphics import Color, RoundedRectangle
+from kivy.metrics import dp, sp
+from kivy.properties import ListProperty, NumericProperty, StringProperty
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.image import Image
+from kivy.uix.label import Label
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.scrollview import ScrollView
+
+from .assets import image_source
+from .markdown import CODE, CODE_FONT, PARAGRAPH, IncrementalMarkdown, MarkdownRenderer, parse_markdown
+from .text_layout import TextMeasurer
+from ..metrics import metrics
+
+# Régions de l'atlas de la densité courante, résolues une fois
+USER_AVATAR = image_source('user')
+BOT_AVATAR = image_source('wolf')
+
+# Géométrie des bulles, partagée par les widgets et le calcul des hauteurs
+LIST_PADDING = [dp(5), dp(10)]
+ROW_PADDING = [dp(10), dp(5)]
+ROW_SPACING = dp(10)
+AVATAR_SIZE = dp(45)
+BUBBLE_PADDING = [dp(15), dp(10)]
+BUBBLE_HINT = 0.7
+FILLER_HINT = 0.1
+FONT_SIZE = sp(14)
+CODE_FONT_SIZE = sp(12)
+# Espace entre blocs Markdown, marge intérieure et barre de défilement des blocs de code
+BLOCK_SPACING = dp(6)
+CODE_PADDING = dp(6)
+CODE_BAR = dp(4)
+
+# Nombre de bulles re-mesurées par frame après un redimensionnement
+RELAYOUT_BATCH = 200
+
+class ChatBubble(RecycleDataViewBehavior, BoxLayout):
+    """Bulle de message recyclable ; construite une fois, remplie à chaque réutilisation"""
+    text = StringProperty('')
+    message_id = NumericProperty(None, allownone=True)
+    text_width = NumericProperty(0)
+    text_height = NumericProperty(0)
+    is_user = False
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.orientation = 'horizontal'
+        self.size_hint_y = None
+        self.padding = ROW_PADDING
+        self.spacing = ROW_SPACING
+
+        if self.is_user:
+            self.build_user_message()
+        else:
+            self.build_bot_message()
+
+    def refresh_view_attrs(self, rv, index, data):
+        # Les clés privées (_markdown, _blocks) restent dans les données
+        super().refresh_view_attrs(rv, index, {k: v for k, v in data.items() if not k.startswith('_')})
+
+    def build_user_message(self):
+        """Message utilisateur (à droite)"""
+        self.add_widget(BoxLayout(size_hint_x=FILLER_HINT))
+        self.add_widget(self._build_bubble(
+            color=(0.1, 0.5, 0.9, 1),  # Bleu Okit
+            radius=[dp(20), dp(20), dp(5), dp(20)],
+            halign='right',
+            text_color=(1, 1, 1, 1)
+        ))
+        self.add_widget(self._build_avatar(USER_AVATAR))
+
+    def build_bot_message(self):
+        """Message bot (à gauche)"""
+        self.add_widget(self._build_avatar(BOT_AVATAR))
+        self.add_widget(self._build_bubble(
+            color=(0.9, 0.9, 0.9, 1),  # Gris clair
+            radius=[dp(5), dp(20), dp(20), dp(20)],
+            halign='left',
+            text_color=(0.1, 0.1, 0.1, 1)
+        ))
+        self.add_widget(BoxLayout(size_hint_x=FILLER_HINT))
+
+    def _build_avatar(self, source):
+        return Image(
+            source=source,
+            size_hint=(None, None),
+            size=(AVATAR_SIZE, AVATAR_SIZE)
+        )
+
+    def _build_bubble(self, color, radius, halign, text_color):
+        bubble = BoxLayout(
+            orientation='vertical',
+            size_hint_x=BUBBLE_HINT,
+            padding=BUBBLE_PADDING
+        )
+
+        with bubble.canvas.before:
+            Color(*color)
+            self.rect = RoundedRectangle(
+                pos=bubble.pos,
+                size=bubble.size,
+                radius=radius
+            )
+
+        bubble.bind(pos=self.update_rect, size=self.update_rect)
+        self._build_content(bubble, halign, text_color)
+        return bubble
+
+    def _build_content(self, bubble, halign, text_color):
+        # Taille fixée par les données : pas de liaison sur texture_size
+        self.message = Label(
+            text=self.text,
+            size_hint_y=None,
+            halign=halign,
+            valign='middle',
+            color=text_color,
+            font_size=FONT_SIZE
+        )
+        bubble.add_widget(self.message)
+        self.bind(
+            text=self.message.setter('text'),
+            text_width=self.update_text_size,
+            text_height=self.message.setter('height')
+        )
+
+    def update_text_size(self, instance, width):
+        self.message.text_size = (width, None)
+
+    def update_rect(self, bubble, *args):
+        self.rect.pos = bubble.pos
+        self.rect.size = bubble.size
+
+class UserBubble(ChatBubble):
+    is_user = True
+
+class BotBubble(ChatBubble):
+    """Réponse rendue en Markdown : un widget par bloc, réutilisé tant que le bloc ne change pas"""
+    is_user = False
+    # [(type, balisage)] et hauteurs calculées par ChatView._measure
+    blocks = ListProperty([])
+    block_heights = ListProperty([])
+
+    def _build_content(self, bubble, halign, text_color):
+        self.text_color = text_color
+        self.content = BoxLayout(orientation='vertical', size_hint_y=None, spacing=BLOCK_SPACING)
+        self._block_widgets = []
+        bubble.add_widget(self.content)
+        self.bind(
+            blocks=self._sync_blocks,
+            block_heights=self._sync_blocks,
+            text_width=self._sync_blocks,
+            text_height=self.content.setter('height')
+        )
+
+    def _sync_blocks(self, *args):
+        if len(self.block_heights) != len(self.blocks):
+            # Propriétés appliquées une à une par refresh_view_attrs
+            return
+
+        widgets = []
+        for i, ((kind, markup), height) in enumerate(zip(self.blocks, self.block_heights)):
+            widget = self._block_widgets[i] if i < len(self._block_widgets) else None
+            if widget is None or (widget.block_kind == CODE) != (kind == CODE):
+                widget = self._build_code_block() if kind == CODE else self._build_text_block()
+            widget.block_kind = kind
+            # Texte identique : Kivy ne recalcule pas la texture
+            widget.label.text = markup
+            widget.height = height
+            if kind != CODE:
+                widget.text_size = (self.text_width, None)
+            widgets.append(widget)
+
+        if widgets != self._block_widgets:
+            self.content.clear_widgets()
+            for widget in widgets:
+                self.content.add_widget(widget)
+            self._block_widgets = widgets
+
+    def _build_text_block(self):
+        label = Label(
+            markup=True,
+            size_hint_y=None,
+            halign='left',
+            valign='top',
+            color=self.text_color,
+            font_size=FONT_SIZE
+        )
+        label.label = label
+        return label
+
+    def _build_code_block(self):
+        """Bloc de code : pas de repli, défilement horizontal"""
+        scroll = ScrollView(
+            size_hint_y=None,
+            do_scroll_x=True,
+            do_scroll_y=False,
+            bar_width=CODE_BAR,
+            scroll_type=['bars', 'content']
+        )
+        with scroll.canvas.before:
+            Color(0.8, 0.8, 0.8, 1)
+            background = RoundedRectangle(radius=[dp(6)])
+        scroll.bind(
+            pos=lambda w, value: setattr(background, 'pos', value),
+            size=lambda w, value: setattr(background, 'size', value)
+        )
+
+        label = Label(
+            markup=True,
+            size_hint=(None, None),
+            padding=(CODE_PADDING, CODE_PADDING),
+            color=self.text_color,
+            font_name=CODE_FONT,
+            font_size=CODE_FONT_SIZE
+        )
+        # Largeur naturelle du code, qui dépasse la bulle si besoin
+        label.bind(texture_size=label.setter('size'))
+        scroll.add_widget(label)
+        scroll.label = label
+        return scroll
+
+Factory.register('UserBubble', cls=UserBubble)
+Factory.register('BotBubble', cls=BotBubble)
+
+def bubble_text_width(view_width: float) -> float:
+    """Largeur de repli du texte pour une largeur de liste donnée"""
+    row_width = view_width - 2 * LIST_PADDING[0]
+    available = row_width - 2 * ROW_PADDING[0] - 2 * ROW_SPACING - AVATAR_SIZE
+    bubble_width = available * BUBBLE_HINT / (BUBBLE_HINT + FILLER_HINT)
+    return max(bubble_width - 2 * BUBBLE_PADDING[0], dp(20))
+
+class ChatView(RecycleView):
+    """Liste de messages pilotée par les données"""
+    # Émis quand l'utilisateur atteint le haut (ou le bas) de l'historique chargé
+    __events__ = ('on_reach_top', 'on_reach_bottom')
+    _measurers = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.do_scroll_x = False
+        self.key_viewclass = 'viewclass'
+        self.has_older = False
+        self._loading_older = False
+        # Fenêtre ouverte sur un résultat de recherche : messages plus récents non chargés
+        self.has_newer = False
+        self._loading_newer = False
+        self.bind(scroll_y=self._check_reach_top)
+
+        # Instants d'ajout en attente de la prochaine frame affichée
+        self._frame_pending = []
+
+        # Caches de mesure partagés par les vues de toutes les conversations
+        self.measurer, self.renderer, self.markup_measurer, self.code_measurer = self._shared_measurers()
+        self._text_width = bubble_text_width(self.width)
+        self._relayout_next = -1
+        self._relayout_event = None
+        # Redimensionnement : une seule re-mesure, différée et par lots
+        self._resize_trigger = Clock.create_trigger(self._start_relayout, 0.15)
+        self.bind(width=lambda *args: self._resize_trigger())
+
+        layout = RecycleBoxLayout(
+            orientation='vertical',
+            spacing=dp(10),
+            padding=LIST_PADDING,
+            size_hint_y=None,
+            default_size=(None, dp(90)),
+            default_size_hint=(1, None)
+        )
+        layout.bind(minimum_height=layout.setter('height'))
+        self.add_widget(layout)
+
+    @classmethod
+    def _shared_measurers(cls):
+        if cls._measurers is None:
+            cls._measurers = (
+                TextMeasurer(FONT_SIZE),
+                # Réponses du bot : balisage et hauteur mis en cache par bloc Markdown
+                MarkdownRenderer(FONT_SIZE),
+                TextMeasurer(FONT_SIZE, markup=True),
+                TextMeasurer(CODE_FONT_SIZE, font_name=CODE_FONT, markup=True),
+            )
+        return cls._measurers
+
+    def _measure(self, item: dict, store: bool = True) -> dict:
+        """Calcule les dimensions d'un message (en place)"""
+        if item['viewclass'] == 'BotBubble':
+            text_height = self._measure_blocks(item)
+        else:
+            text_height = self.measurer.measure(item['text'] or ' ', self._text_width, store)
+        item['text_width'] = self._text_width
+        item['text_height'] = text_height
+        item['height'] = max(text_height + 2 * BUBBLE_PADDING[1], AVATAR_SIZE) + 2 * ROW_PADDING[1]
+        return item
+
+    def _measure_blocks(self, item: dict) -> float:
+        """
+        Blocs Markdown d'une réponse et leur hauteur
+        Les blocs terminés sont mis en cache (balisage et hauteur) : pendant le
+        streaming, seul le dernier bloc, encore ouvert, est re-mesuré
+        """
+        parser = item.get('_markdown')
+        if parser is not None:
+            blocks = parser.blocks
+            open_from = len(parser.finished)
+        else:
+            if '_blocks' not in item:
+                item['_blocks'] = parse_markdown(item['text'])
+            blocks = item['_blocks']
+            open_from = len(blocks)
+
+        rendered = []
+        heights = []
+        for i, block in enumerate(blocks):
+            store = i < open_from
+            markup = self.renderer.render(block, store)
+            if block.kind == CODE:
+                height = self.code_measurer.measure(markup or ' ', None, store) + 2 * CODE_PADDING + CODE_BAR
+            else:
+                height = self.markup_measurer.measure(markup, self._text_width, store)
+            rendered.append((block.kind, markup))
+            heights.append(height)
+
+        if not rendered:
+            rendered = [(PARAGRAPH, '')]
+            heights = [self.markup_measurer.measure(' ', self._text_width)]
+
+        item['blocks'] = rendered
+        item['block_heights'] = heights
+        return sum(heights) + BLOCK_SPACING * (len(heights) - 1)
+
+    def _row(self, text, is_user, message_id=None) -> dict:
+        return self._measure({
+            'viewclass': 'UserBubble' if is_user else 'BotBubble',
+            'text': text,
+            'message_id': message_id,
+        })
+
+    def add_message(self, text, is_user=False, message_id=None) -> int:
+        """Ajoute un message et retourne son index"""
+        return self.add_messages([(text, is_user, message_id)])
+
+    def add_messages(self, messages) -> int:
+        """
+        Ajoute plusieurs messages en une seule modification de `data`
+        messages: [(texte, is_user, message_id)] ; retourne l'index du premier
+        """
+        if not self._frame_pending:
+            Window.bind(on_flip=self._on_frame_shown)
+        now = time.perf_counter()
+        rows = [self._row(*message) for message in messages]
+        self._frame_pending.extend([now] * len(rows))
+        first = len(self.data)
+        self.data.extend(rows)
+        return first
+
+    def _on_frame_shown(self, *args):
+        """Délai entre add_message et l'affichage effectif de la frame"""
+        Window.unbind(on_flip=self._on_frame_shown)
+        now = time.perf_counter()
+        histogram = metrics.histogram('ui_add_message_to_frame_seconds')
+        for added_at in self._frame_pending:
+            histogram.record(now - added_at)
+        self._frame_pending = []
+
+    def load_messages(self, messages, has_older=False, has_newer=False):
+        """
+        Remplace l'historique en une seule mise à jour
+        messages: [(texte, is_user, message_id)]
+        """
+        # Nouvelles lignes mesurées à la largeur courante : la remise en page en cours est caduque
+        self._cancel_relayout()
+        self.data = [self._row(*message) for message in messages]
+        self.has_older = has_older
+        self.has_newer = has_newer
+        self._loading_older = False
+        self._loading_newer = False
+
+    def append_page(self, messages, has_newer=False):
+        """Ajoute en bas une page de messages plus récents (fenêtre de recherche)"""
+        self.has_newer = has_newer
+        self._loading_newer = False
+        if messages:
+            self.add_messages(messages)
+
+    def prepend_messages(self, messages, has_older=False):
+        """Insère une page de messages plus anciens sans déplacer la vue"""
+        rows = [self._row(*message) for message in messages]
+        self.has_older = has_older
+        self._loading_older = False
+        if not rows:
+            return
+
+        # Conserver la distance au haut du contenu pour éviter un saut visuel
+        layout = self.layout_manager
+        scrollable = max(layout.height - self.height, 1)
+        offset_from_top = (1 - self.scroll_y) * scrollable
+        added = sum(row['height'] for row in rows) + len(rows) * layout.spacing
+
+        self.data = rows + self.data
+        if self._relayout_event is not None:
+            # Les lignes restant à remettre en page sont décalées d'autant
+            self._relayout_next += len(rows)
+        new_scrollable = max(layout.height + added - self.height, 1)
+        self.scroll_y = 1 - min((offset_from_top + added) / new_scrollable, 1)
+
+    def oldest_message_id(self):
+        """Id du plus ancien message persistant affiché"""
+        for row in self.data:
+            if row.get('message_id') is not None:
+                return row['message_id']
+        return None
+
+    def newest_message_id(self):
+        """Id du plus récent message persistant affiché"""
+        for row in reversed(self.data):
+            if row.get('message_id') is not None:
+                return row['message_id']
+        return None
+
+    def index_of(self, message_id):
+        for index, row in enumerate(self.data):
+            if row.get('message_id') == message_id:
+                return index
+        return None
+
+    def scroll_to_message(self, message_id) -> bool:
+        """
+        Centre la vue sur un message chargé
+        Position calculée à partir des hauteurs connues des lignes : valable
+        aussi avant la mise en page de données tout juste remplacées
+        """
+        index = self.index_of(message_id)
+        if index is None:
+            return False
+
+        spacing = self.layout_manager.spacing
+        heights = [row['height'] for row in self.data]
+        content = sum(heights) + spacing * (len(heights) - 1) + 2 * LIST_PADDING[1]
+        scrollable = content - self.height
+        if scrollable > 0:
+            top = LIST_PADDING[1] + sum(heights[:index]) + spacing * index
+            target = top - (self.height - heights[index]) / 2
+            self.scroll_y = 1 - min(max(target / scrollable, 0), 1)
+        return True
+
+    def set_message_id(self, index, message_id):
+        item = self.data[index]
+        item['message_id'] = message_id
+        parser = item.pop('_markdown', None)
+        if parser is not None:
+            # Réponse terminée : le dernier bloc est clos et mis en cache
+            parser.close()
+            item['_blocks'] = parser.finished
+            self._measure(item)
+            self.refresh_from_data()
+
+    def _check_reach_top(self, instance, scroll_y):
+        if scroll_y >= 0.98 and self.has_older and not self._loading_older:
+            self._loading_older = True
+            self.dispatch('on_reach_top')
+        elif scroll_y <= 0.02 and self.has_newer and not self._loading_newer:
+            self._loading_newer = True
+            self.dispatch('on_reach_bottom')
+
+    def on_reach_top(self):
+        pass
+
+    def on_reach_bottom(self):
+        pass
+
+    def append_text(self, index, text):
+        """Complète un message existant (réponse en streaming)"""
+        self.append_texts({index: text})
+
+    def append_texts(self, texts: dict):
+        """Complète plusieurs messages {index: texte} avec un seul rafraîchissement"""
+        for index, text in texts.items():
+            item = self.data[index]
+            if item['viewclass'] == 'BotBubble':
+                # Analyse incrémentale : seules les nouvelles lignes sont traitées
+                parser = item.get('_markdown')
+                if parser is None:
+                    parser = item['_markdown'] = IncrementalMarkdown()
+                    parser.feed(item['text'])
+                    item.pop('_blocks', None)
+                parser.feed(text)
+            item['text'] += text
+            self._measure(item, store=False)
+        self.refresh_from_data()
+
+    def is_at_bottom(self) -> bool:
+        """La vue montre-t-elle les derniers messages ?"""
+        return self.scroll_y <= 0.02 or self.layout_manager.height <= self.height
+
+    def _start_relayout(self, dt):
+        text_width = bubble_text_width(self.width)
+        if text_width == self._text_width:
+            return
+        self._text_width = text_width
+
+        # Des messages les plus récents (visibles) vers les plus anciens
+        self._relayout_next = len(self.data) - 1
+        if self._relayout_event is None:
+            self._relayout_event = Clock.schedule_interval(self._relayout_batch, 0)
+
+    def _cancel_relayout(self):
+        if self._relayout_event is not None:
+            self._relayout_event.cancel()
+            self._relayout_event = None
+        self._relayout_next = -1
+
+    def _relayout_batch(self, dt):
+        # Historique raccourci entre deux lots : on reprend à sa fin
+        self._relayout_next = min(self._relayout_next, len(self.data) - 1)
+        stop = max(self._relayout_next - RELAYOUT_BATCH, -1)
+        for index in range(self._relayout_next, stop, -1):
+            self._measure(self.data[index])
+        self._relayout_next = stop
+        self.refresh_from_data()
+
+        if stop < 0:
+            self._relayout_event = None
+            return False
+
+    def scroll_to_bottom(self, *args):
+        """Scroller vers le bas"""
+        if self.data:
+            self.scroll_y = 0
+
+    @property
+    def message_count(self) -> int:
+        return len(self.data)
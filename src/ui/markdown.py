@@ -0,0 +1,210 @@
+"""
+Rendu Markdown incrémental des réponses Gemini
+Le texte est découpé en blocs (paragraphe, titre, liste, citation, code) au fil
+de son arrivée ; les blocs terminés ne changent plus et leur balisage Kivy
+est mis en cache. Module sans dépendance Kivy (benchmarks, tests).
+"""
+import re
+from collections import OrderedDict, namedtuple
+from typing import List
+
+Block = namedtuple('Block', ['kind', 'source', 'lang'])
+
+PARAGRAPH = 'paragraph'
+HEADING = 'heading'
+LIST = 'list'
+QUOTE = 'quote'
+CODE = 'code'
+RULE = 'rule'
+
+CODE_FONT = 'RobotoMono-Regular'
+HEADING_SCALE = {1: 1.4, 2: 1.25, 3: 1.1}
+
+_FENCE = re.compile(r'^\s*(```|~~~)\s*([\w+#.-]*)')
+_HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+_RULE = re.compile(r'^\s*([-*_])(\s*\1){2,}\s*$')
+_LIST_ITEM = re.compile(r'^(\s*)([-*+]|\d+[.)])\s+(.*)$')
+_QUOTE = re.compile(r'^\s*>\s?(.*)$')
+
+class IncrementalMarkdown:
+    def __init__(self):
+        """Découpe en blocs d'un texte Markdown reçu par fragments"""
+        # Blocs terminés : liste en ajout seul, jamais modifiée
+        self.finished: List[Block] = []
+        self._partial_line = ''
+        self._kind = None
+        self._lines = []
+        self._fence = None
+        self._lang = ''
+
+    def feed(self, text: str):
+        """Ajoute un fragment ; seules les lignes complètes font avancer l'analyse"""
+        text = self._partial_line + text
+        lines = text.split('\n')
+        self._partial_line = lines.pop()
+        for line in lines:
+            self._process_line(line)
+
+    def close(self):
+        """Fin du texte : la dernière ligne et le bloc ouvert sont terminés"""
+        if self._partial_line:
+            self._process_line(self._partial_line)
+            self._partial_line = ''
+        self._finish()
+
+    @property
+    def blocks(self) -> List[Block]:
+        """Blocs terminés suivis du bloc ouvert (provisoire, avec la ligne incomplète)"""
+        lines = self._lines + ([self._partial_line] if self._partial_line else [])
+        if not lines:
+            return list(self.finished)
+
+        kind = self._kind
+        if kind is None:
+            kind = CODE if _FENCE.match(lines[0]) else PARAGRAPH
+            if kind == CODE:
+                lines = lines[1:]
+        return self.finished + [Block(kind, '\n'.join(lines), self._lang)]
+
+    @property
+    def open_count(self) -> int:
+        """Nombre de blocs provisoires en fin de `blocks` (0 ou 1)"""
+        return len(self.blocks) - len(self.finished)
+
+    def _finish(self):
+        if self._kind is not None and (self._lines or self._kind == CODE):
+            self.finished.append(Block(self._kind, '\n'.join(self._lines), self._lang))
+        self._kind = None
+        self._lines = []
+        self._fence = None
+        self._lang = ''
+
+    def _start(self, kind: str, line: str):
+        self._finish()
+        self._kind = kind
+        self._lines = [line]
+
+    def _process_line(self, line: str):
+        if self._kind == CODE:
+            if line.strip().startswith(self._fence):
+                self._finish()
+            else:
+                self._lines.append(line)
+            return
+
+        fence = _FENCE.match(line)
+        if fence:
+            self._finish()
+            self._kind = CODE
+            self._fence = fence.group(1)
+            self._lang = fence.group(2)
+            return
+
+        if not line.strip():
+            self._finish()
+            return
+
+        heading = _HEADING.match(line)
+        if heading:
+            self._start(HEADING, line)
+            self._finish()
+        elif _RULE.match(line):
+            self._start(RULE, line)
+            self._finish()
+        elif _LIST_ITEM.match(line):
+            if self._kind == LIST:
+                self._lines.append(line)
+            else:
+                self._start(LIST, line)
+        elif _QUOTE.match(line):
+            if self._kind == QUOTE:
+                self._lines.append(line)
+            else:
+                self._start(QUOTE, line)
+        elif self._kind in (PARAGRAPH, LIST, QUOTE):
+            # Continuation (paresseuse pour les listes et citations)
+            self._lines.append(line)
+        else:
+            self._start(PARAGRAPH, line)
+
+def parse_markdown(text: str) -> List[Block]:
+    """Découpe complète d'un texte terminé"""
+    parser = IncrementalMarkdown()
+    parser.feed(text)
+    parser.close()
+    return parser.finished
+
+def escape_markup(text: str) -> str:
+    """Échappe les caractères du balisage Kivy (comme kivy.utils.escape_markup)"""
+    return text.replace('&', '&amp;').replace('[', '&bl;').replace(']', '&br;')
+
+_CODE_SPAN = re.compile(r'`([^`\n]+)`')
+_BOLD = re.compile(r'(\*\*|__)(?=\S)(.+?)(?<=\S)\1')
+_ITALIC = re.compile(r'(?<![\w*])([*_])(?=\S)(.+?)(?<=\S)\1(?![\w*])')
+_LINK = re.compile(r'&bl;([^&\n]+?)&br;\(([^)\s]+)\)')
+
+def inline_markup(text: str) -> str:
+    """Gras, italique, code et liens en ligne vers le balisage Kivy"""
+    spans = []
+
+    def keep_code(match):
+        spans.append(f"[font={CODE_FONT}]{escape_markup(match.group(1))}[/font]")
+        return f"\x00{len(spans) - 1}\x00"
+
+    text = _CODE_SPAN.sub(keep_code, text)
+    text = escape_markup(text)
+    text = _BOLD.sub(r'[b]\2[/b]', text)
+    text = _ITALIC.sub(r'[i]\2[/i]', text)
+    text = _LINK.sub(r'[u]\1[/u]', text)
+    return re.sub('\x00(\\d+)\x00', lambda m: spans[int(m.group(1))], text)
+
+def block_markup(block: Block, font_size: float) -> str:
+    """Balisage Kivy d'un bloc"""
+    if block.kind == CODE:
+        return escape_markup(block.source)
+    if block.kind == HEADING:
+        level, title = _HEADING.match(block.source).groups()
+        size = font_size * HEADING_SCALE.get(len(level), 1.0)
+        return f"[size={int(size)}][b]{inline_markup(title)}[/b][/size]"
+    if block.kind == RULE:
+        return "[color=999999]" + '─' * 24 + "[/color]"
+    if block.kind == LIST:
+        items = []
+        for line in block.source.split('\n'):
+            item = _LIST_ITEM.match(line)
+            if item:
+                indent, marker, content = item.groups()
+                bullet = marker if marker[0].isdigit() else '•'
+                items.append(f"{'    ' * (len(indent) // 2)}{bullet} {inline_markup(content)}")
+            elif items:
+                items[-1] += ' ' + inline_markup(line.strip())
+        return '\n'.join(items)
+    if block.kind == QUOTE:
+        lines = [_QUOTE.sub(r'\1', line) for line in block.source.split('\n')]
+        return f"[color=555555][i]{inline_markup(' '.join(lines))}[/i][/color]"
+    # Paragraphe : retours à la ligne simples conservés
+    return inline_markup(block.source)
+
+class MarkdownRenderer:
+    def __init__(self, font_size: float, max_entries: int = 2048):
+        """Balisage des blocs, en cache LRU (un bloc terminé n'est converti qu'une fois)"""
+        self.font_size = font_size
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, block: Block, store: bool = True) -> str:
+        markup = self._cache.get(block)
+        if markup is not None:
+            self._cache.move_to_end(block)
+            self.hits += 1
+            return markup
+
+        self.misses += 1
+        markup = block_markup(block, self.font_size)
+        if store:
+            self._cache[block] = markup
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return markup
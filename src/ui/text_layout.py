@@ -0,0 +1,57 @@
+"""
+Mesure du texte des bulles de chat
+La hauteur du texte replié est calculée une seule fois par
+(texte, largeur, police) puis mise en cache
+"""
+from collections import OrderedDict
+
+from typing import Optional
+
+from kivy.core.text import Label as CoreLabel
+from kivy.core.text.markup import MarkupLabel
+
+class TextMeasurer:
+    def __init__(self, font_size: float, font_name: str = 'Roboto', max_entries: int = 4096,
+                 markup: bool = False):
+        """markup: texte au balisage Kivy ([b], [size=...], ...)"""
+        self.font_size = font_size
+        self.font_name = font_name
+        self.markup = markup
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def measure(self, text: str, width: Optional[float], store: bool = True) -> float:
+        """
+        Hauteur du texte replié à `width` pixels (None : sans repli, blocs de code)
+
+        store=False pour un texte transitoire (réponse en cours de streaming)
+        """
+        width = int(width) if width is not None else None
+        key = (text, width, self.font_size, self.font_name)
+        height = self._cache.get(key)
+        if height is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return height
+
+        self.misses += 1
+        label = (MarkupLabel if self.markup else CoreLabel)(
+            text=text,
+            font_size=self.font_size,
+            font_name=self.font_name,
+            text_size=(width, None)
+        )
+        label.resolve_font_name()
+        # render() calcule seulement la mise en page, sans créer de texture
+        height = label.render()[1]
+
+        if store:
+            self._cache[key] = height
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return height
+
+    def clear(self):
+        self._cache.clear()
@@ -0,0 +1,139 @@
+"""
+File de mises à jour de l'historique, appliquée une fois par frame
+Les ajouts et compléments de messages (depuis n'importe quel thread) sont
+regroupés : une seule modification de `data`, un seul défilement au plus
+"""
+import threading
+import weakref
+
+from kivy.clock import Clock
+
+class MessageRef:
+    """Référence à un message ajouté via la file ; index connu une fois appliqué"""
+    __slots__ = ('index', '__weakref__')
+
+    def __init__(self):
+        self.index = None
+
+class UIUpdateQueue:
+    def __init__(self, chat_view):
+        self.chat_view = chat_view
+        self._lock = threading.Lock()
+        self._ops = []
+        self._scheduled = False
+        # Références vivantes, décalées quand des messages anciens sont insérés en tête
+        self._refs = weakref.WeakSet()
+
+    def _push(self, op):
+        with self._lock:
+            self._ops.append(op)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        # Clock.schedule_once est utilisable depuis n'importe quel thread
+        Clock.schedule_once(self._apply, 0)
+
+    def add_message(self, text, is_user=False, message_id=None, scroll=None) -> MessageRef:
+        """
+        Ajoute un message à la prochaine frame
+        scroll: force (True) ou empêche (False) le défilement ; par défaut,
+        défile seulement si la vue est déjà en bas (ou si c'est l'utilisateur qui écrit)
+        """
+        ref = MessageRef()
+        self._refs.add(ref)
+        self._push(('add', ref, [text, is_user, message_id], is_user if scroll is None else scroll))
+        return ref
+
+    def append_text(self, ref: MessageRef, text: str):
+        """Complète un message (fragments de streaming fusionnés par frame)"""
+        self._push(('append', ref, text))
+
+    def set_message_id(self, ref: MessageRef, message_id):
+        self._push(('id', ref, message_id))
+
+    def prepend_messages(self, messages, has_older=False):
+        """Page de messages anciens en tête ; les références existantes sont décalées"""
+        self._push(('prepend', list(messages), has_older))
+
+    def append_page(self, messages, has_newer=False):
+        """Page de messages plus récents en bas (fenêtre de recherche), sans défilement"""
+        self._push(('page', list(messages), has_newer))
+
+    def load_messages(self, messages, has_older=False, has_newer=False, focus_id=None):
+        """
+        Remplace l'historique affiché, centré sur focus_id s'il est fourni
+        Les références existantes sont invalidées : leurs compléments sont ignorés
+        """
+        self._push(('load', list(messages), has_older, has_newer, focus_id))
+
+    def _apply(self, dt):
+        with self._lock:
+            ops, self._ops = self._ops, []
+            self._scheduled = False
+
+        view = self.chat_view
+        follow = view.is_at_bottom()
+        force_scroll = False
+        new_rows = []
+        appends = {}
+
+        def flush():
+            # Les insertions en tête décalent les index : tout ce qui précède est appliqué
+            if new_rows:
+                view.add_messages(new_rows)
+                new_rows.clear()
+            if appends:
+                view.append_texts(appends)
+                appends.clear()
+
+        for op in ops:
+            kind = op[0]
+            if kind == 'add':
+                _, ref, row, scroll = op
+                ref.index = len(view.data) + len(new_rows)
+                new_rows.append(row)
+                force_scroll = force_scroll or scroll is True
+                if scroll is False:
+                    follow = False
+            elif kind == 'prepend':
+                flush()
+                _, messages, has_older = op
+                view.prepend_messages(messages, has_older)
+                for ref in list(self._refs):
+                    if ref.index is not None:
+                        ref.index += len(messages)
+                follow = False
+            elif kind == 'page':
+                flush()
+                _, messages, has_newer = op
+                view.append_page(messages, has_newer)
+                follow = False
+            elif kind == 'load':
+                flush()
+                _, messages, has_older, has_newer, focus_id = op
+                view.load_messages(messages, has_older, has_newer)
+                for ref in list(self._refs):
+                    ref.index = None
+                follow = focus_id is None
+                if focus_id is not None:
+                    view.scroll_to_message(focus_id)
+            else:
+                _, ref, value = op
+                if ref.index is None:
+                    # Message retiré de l'affichage par un rechargement
+                    continue
+                pending = ref.index - len(view.data)
+                if kind == 'append':
+                    if pending >= 0:
+                        new_rows[pending][0] += value
+                    else:
+                        appends[ref.index] = appends.get(ref.index, '') + value
+                elif pending >= 0:
+                    new_rows[pending][2] = value
+                else:
+                    view.set_message_id(ref.index, value)
+        flush()
+
+        # Un seul défilement par frame, et jamais si l'utilisateur lit plus haut
+        if force_scroll or follow:
+            view.scroll_to_bottom()
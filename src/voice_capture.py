@@ -0,0 +1,353 @@
+"""
+Capture vocale en continu
+Source PCM interchangeable (micro Android, fichier WAV), tampon circulaire
+préalloué, détection d'activité vocale par énergie et découpage automatique
+des énoncés ; aucune allocation par trame au-delà d'une taille fixe
+"""
+import io
+import math
+import threading
+import time
+import wave
+import logging
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # PCM 16 bits signé, mono
+
+class AudioSource:
+    """Source de trames PCM 16 bits mono"""
+    sample_rate = SAMPLE_RATE
+
+    def request_permission(self, on_result: Callable[[bool], None]):
+        """Demande l'accès à la source ; on_result(accordé), éventuellement depuis un autre thread"""
+        on_result(True)
+
+    def open(self):
+        pass
+
+    def read_into(self, buffer: bytearray) -> int:
+        """Remplit buffer (en place) ; retourne le nombre d'octets lus, 0 en fin de flux"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class WavFileSource(AudioSource):
+    def __init__(self, path: str, realtime: bool = False):
+        """
+        Lit un fichier WAV PCM 16 bits mono (tests, démonstrations)
+        realtime: cadence la lecture comme un micro
+        """
+        self.path = path
+        self.realtime = realtime
+        self._wav = None
+        self._next_frame_at = 0.0
+
+    def open(self):
+        self._wav = wave.open(self.path, 'rb')
+        if self._wav.getsampwidth() != SAMPLE_WIDTH or self._wav.getnchannels() != 1:
+            self._wav.close()
+            raise ValueError("Le WAV doit être en PCM 16 bits mono")
+        self.sample_rate = self._wav.getframerate()
+        self._next_frame_at = time.monotonic()
+
+    def read_into(self, buffer: bytearray) -> int:
+        data = self._wav.readframes(len(buffer) // SAMPLE_WIDTH)
+        buffer[:len(data)] = data
+        if self.realtime and data:
+            self._next_frame_at += len(data) / SAMPLE_WIDTH / self.sample_rate
+            time.sleep(max(0.0, self._next_frame_at - time.monotonic()))
+        return len(data)
+
+    def close(self):
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+class AndroidMicSource(AudioSource):
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        """Micro Android via AudioRecord (pyjnius) ; permission RECORD_AUDIO requise"""
+        self.sample_rate = sample_rate
+        self._record = None
+        self._java_buffer = None
+
+    def request_permission(self, on_result: Callable[[bool], None]):
+        """RECORD_AUDIO est une permission dangereuse : demandée à l'exécution (Android 6+)"""
+        try:
+            from android.permissions import Permission, check_permission, request_permissions
+        except ImportError:
+            # Hors Android (python-for-android absent) : rien à demander
+            on_result(True)
+            return
+        if check_permission(Permission.RECORD_AUDIO):
+            on_result(True)
+            return
+        # Réponse de l'utilisateur livrée sur le thread UI Android
+        request_permissions([Permission.RECORD_AUDIO],
+                            lambda permissions, grants: on_result(bool(grants) and all(grants)))
+
+    def open(self):
+        from jnius import autoclass
+
+        AudioRecord = autoclass('android.media.AudioRecord')
+        AudioFormat = autoclass('android.media.AudioFormat')
+        AudioSourceType = autoclass('android.media.MediaRecorder$AudioSource')
+
+        channel = AudioFormat.CHANNEL_IN_MONO
+        encoding = AudioFormat.ENCODING_PCM_16BIT
+        min_size = AudioRecord.getMinBufferSize(self.sample_rate, channel, encoding)
+        self._record = AudioRecord(
+            # VOICE_COMMUNICATION active l'annulation d'écho : la synthèse vocale
+            # de l'app ne déclenche pas le barge-in
+            AudioSourceType.VOICE_COMMUNICATION, self.sample_rate, channel, encoding, max(min_size, 8192)
+        )
+        self._record.startRecording()
+
+    def read_into(self, buffer: bytearray) -> int:
+        if self._java_buffer is None or len(self._java_buffer) != len(buffer):
+            # Tableau Java réutilisé d'une trame à l'autre
+            self._java_buffer = bytearray(len(buffer))
+        count = self._record.read(self._java_buffer, 0, len(buffer))
+        if count <= 0:
+            return 0
+        buffer[:count] = self._java_buffer[:count]
+        return count
+
+    def close(self):
+        if self._record is not None:
+            self._record.stop()
+            self._record.release()
+            self._record = None
+
+class RingBuffer:
+    def __init__(self, capacity: int):
+        """Tampon circulaire d'octets préalloué ; les plus anciens sont écrasés"""
+        self._data = bytearray(capacity)
+        self.capacity = capacity
+        self._write = 0
+        # Nombre total d'octets écrits depuis la création (position absolue)
+        self.total_written = 0
+
+    def write(self, chunk) -> None:
+        view = memoryview(chunk)
+        if len(view) > self.capacity:
+            view = view[-self.capacity:]
+        first = min(len(view), self.capacity - self._write)
+        self._data[self._write:self._write + first] = view[:first]
+        rest = len(view) - first
+        if rest:
+            self._data[:rest] = view[first:]
+        self._write = (self._write + len(view)) % self.capacity
+        self.total_written += len(chunk)
+
+    def read_since(self, position: int) -> bytes:
+        """Octets écrits depuis la position absolue `position` (bornés à la capacité)"""
+        size = min(self.total_written - position, self.capacity)
+        if size <= 0:
+            return b''
+        start = (self._write - size) % self.capacity
+        if start + size <= self.capacity:
+            return bytes(self._data[start:start + size])
+        return bytes(self._data[start:]) + bytes(self._data[:self._write])
+
+class EnergyVAD:
+    def __init__(self, start_ratio: float = 3.0, min_energy: float = 300.0,
+                 start_frames: int = 3, hangover_frames: int = 30):
+        """
+        Détection d'activité vocale par énergie RMS, avec plancher de bruit adaptatif
+
+        start_ratio: énergie / bruit de fond au-delà de laquelle une trame est parlée
+        min_energy: RMS minimal d'une trame parlée (échelle 16 bits)
+        start_frames: trames parlées consécutives pour ouvrir un énoncé
+        hangover_frames: trames silencieuses consécutives pour le clore
+        """
+        self.start_ratio = start_ratio
+        self.min_energy = min_energy
+        self.start_frames = start_frames
+        self.hangover_frames = hangover_frames
+
+        self.noise_floor = min_energy / start_ratio
+        self.in_speech = False
+        self._voiced_run = 0
+        self._silent_run = 0
+
+    @staticmethod
+    def rms(frame) -> float:
+        samples = memoryview(frame).cast('h')
+        if not len(samples):
+            return 0.0
+        return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+    def process(self, frame) -> Optional[str]:
+        """Analyse une trame ; retourne 'start', 'end' ou None"""
+        energy = self.rms(frame)
+        voiced = energy >= max(self.min_energy, self.noise_floor * self.start_ratio)
+
+        if not voiced:
+            # Le bruit de fond suit lentement les trames silencieuses
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * energy
+
+        if not self.in_speech:
+            self._voiced_run = self._voiced_run + 1 if voiced else 0
+            if self._voiced_run >= self.start_frames:
+                self.in_speech = True
+                self._silent_run = 0
+                return 'start'
+        else:
+            self._silent_run = 0 if voiced else self._silent_run + 1
+            if self._silent_run >= self.hangover_frames:
+                self.in_speech = False
+                self._voiced_run = 0
+                return 'end'
+        return None
+
+    def reset(self):
+        self.in_speech = False
+        self._voiced_run = 0
+        self._silent_run = 0
+
+def pcm_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+class GeminiTranscriber:
+    def __init__(self, client):
+        """Transcription des énoncés par Gemini (audio WAV en ligne)"""
+        self.client = client
+
+    def transcribe(self, pcm: bytes, sample_rate: int) -> str:
+        return self.client.transcribe_audio(pcm_to_wav(pcm, sample_rate), 'audio/wav')
+
+class VoiceCapture:
+    def __init__(self, source: AudioSource, transcribe: Callable[[bytes, int], str],
+                 on_transcript: Callable[[str, bool], None],
+                 vad: Optional[EnergyVAD] = None,
+                 submit: Optional[Callable] = None,
+                 frame_ms: int = 20, preroll: float = 0.3, max_utterance: float = 15.0,
+                 partial_interval: Optional[float] = None,
+                 on_speech_start: Optional[Callable[[], None]] = None):
+        """
+        Boucle de capture (thread dédié) et découpage en énoncés
+
+        transcribe(pcm, sample_rate) -> texte, appelé hors du thread de capture
+        on_transcript(texte, is_final) reçoit transcriptions partielles et finales
+        submit(fn, on_result) exécute fn() en arrière-plan et appelle on_result(texte),
+        ou on_result(None) en cas d'échec
+        preroll: audio conservé avant le début détecté (syllabe d'attaque)
+        max_utterance: durée maximale d'un énoncé, clos d'office au-delà
+        partial_interval: période des transcriptions partielles (None : finales seules)
+        on_speech_start() est appelé dès le début d'un énoncé (barge-in)
+        """
+        self.source = source
+        self.transcribe = transcribe
+        self.on_transcript = on_transcript
+        self.vad = vad or EnergyVAD()
+        self.submit = submit or _thread_submit
+        self.frame_ms = frame_ms
+        self.preroll = preroll
+        self.max_utterance = max_utterance
+        self.partial_interval = partial_interval
+        self.on_speech_start = on_speech_start
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._partial_in_flight = threading.Event()
+        self.utterances = 0
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="okit-voice-capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            self.source.open()
+        except Exception as e:
+            logger.error(f"❌ Micro indisponible: {e}")
+            return
+
+        rate = self.source.sample_rate
+        bytes_per_second = rate * SAMPLE_WIDTH
+        frame = bytearray(bytes_per_second * self.frame_ms // 1000)
+        max_bytes = int(self.max_utterance * bytes_per_second)
+        preroll_bytes = int(self.preroll * bytes_per_second) // SAMPLE_WIDTH * SAMPLE_WIDTH
+        ring = RingBuffer(max_bytes + preroll_bytes)
+
+        utterance_start = None
+        next_partial = 0
+        logger.info("🎙️ Capture vocale démarrée")
+        try:
+            while not self._stop.is_set():
+                count = self.source.read_into(frame)
+                if count == 0:
+                    break
+                chunk = memoryview(frame)[:count]
+                ring.write(chunk)
+                event = self.vad.process(chunk)
+
+                if event == 'start':
+                    if self.on_speech_start:
+                        self.on_speech_start()
+                    utterance_start = max(0, ring.total_written - count * self.vad.start_frames - preroll_bytes)
+                    next_partial = ring.total_written + int((self.partial_interval or 0) * bytes_per_second)
+                elif utterance_start is not None:
+                    if event == 'end' or ring.total_written - utterance_start >= max_bytes:
+                        self._finish(ring.read_since(utterance_start), rate)
+                        utterance_start = None
+                        self.vad.reset()
+                    elif self.partial_interval and ring.total_written >= next_partial:
+                        next_partial = ring.total_written + int(self.partial_interval * bytes_per_second)
+                        self._partial(ring.read_since(utterance_start), rate)
+
+            if utterance_start is not None and not self._stop.is_set():
+                # Fin du flux pendant un énoncé
+                self._finish(ring.read_since(utterance_start), rate)
+        finally:
+            self.source.close()
+            logger.info("🎙️ Capture vocale arrêtée")
+
+    def _finish(self, pcm: bytes, rate: int):
+        self.utterances += 1
+        logger.info(f"🗣️ Énoncé de {len(pcm) / SAMPLE_WIDTH / rate:.1f}s")
+        self.submit(lambda: self.transcribe(pcm, rate),
+                    lambda text: text and self.on_transcript(text, True))
+
+    def _partial(self, pcm: bytes, rate: int):
+        # Une seule transcription partielle à la fois : les suivantes sont sautées
+        if self._partial_in_flight.is_set():
+            return
+        self._partial_in_flight.set()
+
+        def deliver(text):
+            self._partial_in_flight.clear()
+            if text and not self._stop.is_set():
+                self.on_transcript(text, False)
+
+        self.submit(lambda: self.transcribe(pcm, rate), deliver)
+
+def _thread_submit(fn, on_result):
+    """Exécution sans ordonnanceur : un thread par transcription"""
+    def run():
+        try:
+            result = fn()
+        except Exception as e:
+            logger.error(f"❌ Erreur transcription: {e}")
+            result = None
+        on_result(result)
+    threading.Thread(target=run, daemon=True).start()
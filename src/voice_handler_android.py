@@ -1,44 +1,137 @@
 """
 Gestion vocale adaptée pour Android/Kivy
 """
-import threading
-import time
 import logging
+from typing import Callable, Optional
+
+from .voice_capture import AndroidMicSource, AudioSource, EnergyVAD, VoiceCapture
+from .request_scheduler import SchedulerBusyError
+from .speech_output import SpeechPipeline, TTSBackend
 
 logger = logging.getLogger(__name__)
 
 class VoiceHandlerAndroid:
-    def __init__(self):
+    def __init__(self, scheduler=None, transcriber=None,
+                 source_factory: Optional[Callable[[], AudioSource]] = None,
+                 partial_interval: Optional[float] = 1.5,
+                 vad_options: Optional[dict] = None,
+                 tts_backend: Optional[TTSBackend] = None):
+        """
+        scheduler: ordonnanceur partagé (RequestScheduler) pour les transcriptions
+        transcriber: objet exposant transcribe(pcm, sample_rate) -> texte
+        source_factory: crée la source audio (micro Android par défaut, WAV en test)
+        partial_interval: période des transcriptions partielles (None : finales seules)
+        tts_backend: moteur de synthèse vocale (aucune lecture sans moteur)
+        """
         self.is_listening = False
         self.callback = None
+        # Ordonnanceur partagé (RequestScheduler) ; thread dédié sinon
+        self.scheduler = scheduler
+        self.transcriber = transcriber
+        self.source_factory = source_factory or AndroidMicSource
+        self.partial_interval = partial_interval
+        self.vad_options = vad_options or {}
+        self._capture = None
+        # Incrémenté à chaque arrêt : invalide les demandes de permission en cours
+        self._generation = 0
+        self.speech = SpeechPipeline(tts_backend) if tts_backend is not None else None
         logger.info("VoiceHandler: Initialisé pour Android")
-    
-    def start_listening(self, callback):
-        """Démarrer la reconnaissance vocale"""
+
+    def start_listening(self, callback, on_denied: Optional[Callable[[], None]] = None):
+        """
+        Démarrer la reconnaissance vocale
+        callback(texte, is_final) : transcriptions partielles puis finale de chaque énoncé
+        on_denied() est appelé si l'accès au micro est refusé (depuis n'importe quel thread)
+        """
+        if self.transcriber is None:
+            logger.error("VoiceHandler: Aucun service de transcription configuré")
+            return
+
+        self.stop_listening()
         self.callback = callback
         self.is_listening = True
-        
-        def listen_thread():
-            logger.info("VoiceHandler: Écoute démarrée")
-            # Simulation - Dans une vraie app, utiliser SpeechRecognition
-            # avec les permissions Android appropriées
-            time.sleep(2)
+        generation = self._generation
+        source = self.source_factory()
+
+        def on_permission(granted):
+            # Écoute arrêtée ou relancée pendant la demande : réponse périmée
+            if generation != self._generation or not self.is_listening:
+                return
+            if not granted:
+                logger.error("VoiceHandler: Permission micro refusée")
+                self.is_listening = False
+                if on_denied:
+                    on_denied()
+                return
+            self._start_capture(source)
+
+        source.request_permission(on_permission)
+
+    def _start_capture(self, source: AudioSource):
+        def deliver(text, is_final):
             if self.is_listening and self.callback:
-                self.callback("Bonjour ! Ceci est une démonstration de la reconnaissance vocale sur Okit AI.")
-        
-        threading.Thread(target=listen_thread, daemon=True).start()
-    
+                self.callback(text, is_final)
+
+        self._capture = VoiceCapture(
+            source,
+            self.transcriber.transcribe,
+            deliver,
+            vad=EnergyVAD(**self.vad_options),
+            submit=self._submit if self.scheduler is not None else None,
+            partial_interval=self.partial_interval,
+            # L'utilisateur reprend la parole : la lecture en cours s'arrête
+            on_speech_start=self.interrupt
+        ).start()
+        logger.info("VoiceHandler: Écoute démarrée")
+
+    def _submit(self, fn, on_result):
+        """Transcription sur le canal 'voice' : résultats livrés dans l'ordre, sur le thread UI"""
+        try:
+            self.scheduler.submit(
+                lambda token: None if token.cancelled else fn(),
+                on_result=on_result,
+                on_error=lambda error: on_result(None),
+                channel='voice',
+                block=True,
+                timeout=5.0
+            )
+        except SchedulerBusyError:
+            logger.warning("VoiceHandler: Transcription abandonnée (file pleine)")
+            on_result(None)
+
     def stop_listening(self):
         """Arrêter l'écoute"""
         self.is_listening = False
-        logger.info("VoiceHandler: Écoute arrêtée")
-    
+        self._generation += 1
+        if self._capture is not None:
+            self._capture.stop()
+            self._capture = None
+            logger.info("VoiceHandler: Écoute arrêtée")
+
     def speak(self, text):
-        """Synthèse vocale"""
+        """Synthèse vocale d'un texte complet"""
         logger.info(f"VoiceHandler: Lecture: {text[:100]}...")
-        # À implémenter avec TTS Android
-        # from jnius import autoclass
-        # TextToSpeech = autoclass('android.speech.tts.TextToSpeech')
+        if self.speech is not None:
+            self.speech.speak(text)
+
+    def begin_reply(self, requested_at=None):
+        """Début d'une réponse lue phrase par phrase pendant sa génération"""
+        if self.speech is not None:
+            self.speech.begin(requested_at)
+
+    def feed_reply(self, text):
+        """Fragment de réponse (depuis n'importe quel thread)"""
+        if self.speech is not None:
+            self.speech.feed(text)
+
+    def end_reply(self):
+        if self.speech is not None:
+            self.speech.finish()
+
+    def interrupt(self):
+        """Barge-in : coupe la lecture en cours"""
+        if self.speech is not None:
+            self.speech.cancel()
 
 # Instance globale pour faciliter l'utilisation
-voice_handler = VoiceHandlerAndroid()
\ No newline at end of file
+voice_handler = VoiceHandlerAndroid()
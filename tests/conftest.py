@@ -0,0 +1,87 @@
+import os
+import sys
+import threading
+
+# Imports `src.…` et `benchmarks.…` depuis la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+class _FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeSdkModel:
+    """
+    Modèle du SDK de substitution : latence et erreur injectées, appels comptés
+    error: exception levée à chaque appel (ou None) ; latency: attente avant la réponse
+    """
+
+    def __init__(self, text='Réponse SDK', latency=0.0, error=None):
+        self.text = text
+        self.latency = latency
+        self.error = error
+        self.calls = 0
+        self._lock = threading.Lock()
+        # Libéré pour interrompre les attentes (fin de test)
+        self.release = threading.Event()
+
+    def generate_content(self, content, stream=False):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            self.release.wait(self.latency)
+        if self.error is not None:
+            raise self.error
+        if stream:
+            return iter([_FakeResponse(word) for word in self.text.split(' ')])
+        return _FakeResponse(self.text)
+
+    def start_chat(self, history=None):
+        model = self
+
+        class _Chat:
+            def send_message(self, content, stream=False):
+                return model.generate_content(content, stream)
+
+        return _Chat()
+
+@pytest.fixture
+def mock_server():
+    """Serveur Gemini simulé local (arrêté en fin de test)"""
+    from benchmarks.mock_gemini_server import MockGeminiServer
+
+    servers = []
+
+    def start(**kwargs):
+        server = MockGeminiServer(**kwargs).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+@pytest.fixture
+def gemini_client(monkeypatch):
+    """GeminiClient pointé vers un serveur simulé (SDK configuré, jamais appelé sur le réseau)"""
+    pytest.importorskip('requests')
+    pytest.importorskip('google.generativeai')
+    monkeypatch.setenv('GEMINI_API_KEY', 'mock-key')
+    from src.gemini_client import GeminiClient
+
+    clients = []
+
+    def create(base_url, sdk=None, **kwargs):
+        """sdk: FakeSdkModel remplaçant le modèle du SDK (chemin 'sdk' sans réseau)"""
+        client = GeminiClient(api_key='mock-key', base_url=base_url, **kwargs)
+        if sdk is not None:
+            client.model = sdk
+        clients.append(client)
+        return client
+
+    yield create
+    for client in clients:
+        if isinstance(client.model, FakeSdkModel):
+            client.model.release.set()
+        client.close()
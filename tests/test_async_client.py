@@ -0,0 +1,35 @@
+"""
+Client asynchrone : N requêtes simultanées prennent à peu près le temps d'une seule
+"""
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from src.async_gemini_client import AsyncGeminiClient  # noqa: E402
+
+LATENCY = 0.3
+
+async def _timings(base_url, concurrency):
+    async with AsyncGeminiClient(api_key='mock-key', base_url=base_url) as client:
+        # Première requête hors mesure : ouverture du pool
+        await client.generate_text("Échauffement")
+
+        start = time.perf_counter()
+        await client.generate_text("Seule")
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        replies = await asyncio.gather(*(client.generate_text(f"Question {i}") for i in range(concurrency)))
+        together = time.perf_counter() - start
+    return single, together, replies
+
+@pytest.mark.parametrize("concurrency", [8, 32])
+def test_concurrent_requests_take_about_one_request_time(mock_server, concurrency):
+    server = mock_server(latency=LATENCY)
+    single, together, replies = asyncio.run(_timings(server.base_url, concurrency))
+
+    assert replies == [f"Réponse simulée : Question {i}" for i in range(concurrency)]
+    assert together < 1.5 * single
@@ -0,0 +1,32 @@
+"""
+Configuration générée par build_apk_with_key.py : même interface que src/config.py
+"""
+import importlib.util
+import inspect
+import os
+
+from build_apk_with_key import update_config_file
+from src.config import AppConfig
+
+API_KEY = "AIza" + "x" * 35
+
+def _load(path):
+    spec = importlib.util.spec_from_file_location('generated_config', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.AppConfig
+
+def _public(config):
+    return {name for name, _ in inspect.getmembers(config) if not name.startswith('_')}
+
+def test_generated_config_keeps_the_app_config_interface(tmp_path, monkeypatch):
+    os.mkdir(tmp_path / 'src')
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('OKIT_SEMANTIC_CACHE', raising=False)
+
+    update_config_file(API_KEY)
+    generated = _load(tmp_path / 'src' / 'config.py')
+
+    assert _public(generated) == _public(AppConfig)
+    assert generated.GEMINI_API_KEY == API_KEY
+    assert generated.semantic_cache_enabled() is False
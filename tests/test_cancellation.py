@@ -0,0 +1,107 @@
+"""
+Annulation d'une réponse en flux : le jeton coupe la connexion HTTP ou le flux
+SDK en cours, y compris pendant l'attente du premier fragment
+"""
+import threading
+import time
+
+from conftest import FakeSdkModel
+from src.path_health import PathSelector
+from src.request_scheduler import CancellationToken, RequestScheduler
+
+CANCEL_AFTER = 0.2
+
+def consume_and_cancel(client, after=CANCEL_AFTER):
+    """Consomme generate_text_stream sur un thread, annule après `after` s ; retourne (fragments, durée)"""
+    token = CancellationToken()
+    chunks = []
+    consumer = threading.Thread(target=lambda: chunks.extend(client.generate_text_stream("Question", cancel=token)))
+    start = time.perf_counter()
+    consumer.start()
+    time.sleep(after)
+    token.cancel()
+    consumer.join(5)
+    assert not consumer.is_alive()
+    return chunks, time.perf_counter() - start
+
+def test_cancel_callback_runs_only_inside_the_block():
+    calls = []
+    token = CancellationToken()
+    with token.cancel_callback(lambda: calls.append('pendant')):
+        token.cancel()
+    assert calls == ['pendant']
+
+    token = CancellationToken()
+    with token.cancel_callback(lambda: calls.append('après')):
+        pass
+    token.cancel()
+    assert calls == ['pendant']
+
+    # Jeton déjà annulé : appel immédiat
+    with token.cancel_callback(lambda: calls.append('déjà annulé')):
+        pass
+    assert calls == ['pendant', 'déjà annulé']
+
+def test_cancel_while_waiting_for_rest_headers(mock_server, gemini_client):
+    server = mock_server(latency=3.0)
+    client = gemini_client(server.base_url, path_selector=PathSelector(('rest',)))
+
+    chunks, elapsed = consume_and_cancel(client)
+
+    assert chunks == []
+    assert elapsed < 1.0
+    # Annulation : ni nouvelle tentative, ni échec imputé au chemin
+    assert server.request_count == 1
+    assert client.path_selector.breakers['rest']._failures == 0
+
+def test_cancel_between_rest_chunks(mock_server, gemini_client):
+    server = mock_server(chunk_delay=3.0, reply_text="un deux trois")
+    client = gemini_client(server.base_url, path_selector=PathSelector(('rest',)))
+
+    chunks, elapsed = consume_and_cancel(client)
+
+    assert len(chunks) == 1 and not chunks[0].startswith("❌")
+    assert elapsed < 1.0
+
+def test_cancel_while_waiting_for_first_sdk_chunk(mock_server, gemini_client):
+    server = mock_server()
+    sdk = FakeSdkModel(latency=3.0)
+    client = gemini_client(server.base_url, sdk=sdk)
+
+    chunks, elapsed = consume_and_cancel(client)
+
+    assert chunks == []
+    assert elapsed < 1.0
+    # Pas de repli REST après une annulation
+    assert server.request_count == 0
+    assert client.path_selector.breakers['sdk']._failures == 0
+
+def test_stop_delivers_on_cancel_without_waiting_for_the_server(mock_server, gemini_client):
+    server = mock_server(latency=3.0)
+    client = gemini_client(server.base_url, path_selector=PathSelector(('rest',)))
+    scheduler = RequestScheduler(max_workers=1)
+    stopped = threading.Event()
+
+    def get_response(token):
+        return list(client.generate_text_stream("Question", cancel=token))
+
+    handle = scheduler.submit(get_response, on_cancel=stopped.set)
+    time.sleep(CANCEL_AFTER)
+    start = time.perf_counter()
+    handle.cancel()
+
+    assert stopped.wait(1.0)
+    assert time.perf_counter() - start < 1.0
+    scheduler.shutdown()
+
+def test_cancelled_probe_does_not_lock_a_half_open_path(mock_server, gemini_client):
+    server = mock_server(latency=3.0)
+    client = gemini_client(server.base_url, path_selector=PathSelector(('rest',), reset_timeout=0.0))
+    breaker = client.path_selector.breakers['rest']
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    # Requête d'essai du chemin semi-ouvert, annulée avant le premier fragment
+    consume_and_cancel(client)
+
+    assert breaker.allow_request()
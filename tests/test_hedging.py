@@ -0,0 +1,84 @@
+"""
+Requêtes couvertes : second chemin après le délai de couverture, compté à partir
+du démarrage effectif du principal ; sans couverture, un seul chemin est appelé
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from conftest import FakeSdkModel
+from src.errors import ServiceUnavailableError
+from src.retry_policy import AdaptiveConcurrency
+
+HEDGE_DELAY = 0.1
+
+def test_slow_primary_is_hedged_via_rest(mock_server, gemini_client):
+    server = mock_server()
+    sdk = FakeSdkModel(latency=2.0)
+    client = gemini_client(server.base_url, sdk=sdk, hedge_requests=True, hedge_delay=HEDGE_DELAY)
+
+    start = time.perf_counter()
+    assert client._generate("Question") == "Réponse simulée : Question"
+    assert time.perf_counter() - start < 1.0
+    assert sdk.calls == 1
+    assert server.request_count == 1
+
+def test_fast_primary_is_not_hedged(mock_server, gemini_client):
+    server = mock_server()
+    sdk = FakeSdkModel()
+    client = gemini_client(server.base_url, sdk=sdk, hedge_requests=True, hedge_delay=HEDGE_DELAY)
+
+    assert client._generate("Question") == "Réponse SDK"
+    assert server.request_count == 0
+
+def test_failing_primary_fails_over_without_waiting(mock_server, gemini_client):
+    server = mock_server()
+    sdk = FakeSdkModel(error=ServiceUnavailableError("SDK indisponible", status=503))
+    client = gemini_client(server.base_url, sdk=sdk, hedge_requests=True, hedge_delay=5.0)
+
+    start = time.perf_counter()
+    assert client._generate("Question") == "Réponse simulée : Question"
+    assert time.perf_counter() - start < 1.0
+    assert sdk.calls == 1
+
+def test_concurrent_hedged_requests_are_not_queued_behind_the_executor(mock_server, gemini_client):
+    server = mock_server()
+    sdk = FakeSdkModel(latency=2.0)
+    client = gemini_client(server.base_url, sdk=sdk, hedge_requests=True, hedge_delay=HEDGE_DELAY,
+                           concurrency=AdaptiveConcurrency(initial=16, max_limit=16))
+
+    # Plus d'appelants simultanés que de threads de l'ancien exécuteur fixe (4)
+    with ThreadPoolExecutor(max_workers=12) as callers:
+        start = time.perf_counter()
+        futures = [callers.submit(client._generate, f"Question {i}") for i in range(12)]
+        wait(futures)
+        elapsed = time.perf_counter() - start
+
+    assert all(f.result().startswith("Réponse simulée") for f in futures)
+    assert elapsed < 1.0
+    assert server.request_count == 12
+
+def test_hedge_timer_starts_when_primary_starts(mock_server, gemini_client):
+    server = mock_server()
+    sdk = FakeSdkModel(latency=0.05)
+    client = gemini_client(server.base_url, sdk=sdk, hedge_requests=True, hedge_delay=HEDGE_DELAY)
+    # Exécuteur saturé : le principal attend 0.3 s un thread libre
+    client._hedge_executor.shutdown(wait=False)
+    client._hedge_executor = ThreadPoolExecutor(max_workers=1)
+    busy = threading.Event()
+    client._hedge_executor.submit(busy.wait, 0.3)
+
+    assert client._generate("Question") == "Réponse SDK"
+    # L'attente dans la file ne déclenche pas de couverture
+    client._hedge_executor.shutdown(wait=True)
+    assert server.request_count == 0
+
+def test_without_hedging_only_the_primary_is_called(mock_server, gemini_client):
+    server = mock_server()
+    sdk = FakeSdkModel(latency=0.3)
+    client = gemini_client(server.base_url, sdk=sdk, hedge_delay=HEDGE_DELAY)
+
+    assert client._hedge_executor is None
+    assert client._generate("Question") == "Réponse SDK"
+    assert sdk.calls == 1
+    assert server.request_count == 0
@@ -0,0 +1,28 @@
+"""
+Transport HTTP : connexions keep-alive réutilisées entre les appels REST
+"""
+import time
+
+from src.http_transport import HttpTransport
+
+def test_rest_calls_reuse_one_connection(mock_server, gemini_client):
+    server = mock_server()
+    client = gemini_client(server.base_url)
+
+    for i in range(10):
+        assert client._generate_via_rest_api(f"Question {i}") == f"Réponse simulée : Question {i}"
+
+    assert server.request_count == 10
+    assert len(server.connections) == 1
+
+def test_new_connection_after_idle_timeout(mock_server, gemini_client):
+    server = mock_server()
+    client = gemini_client(server.base_url, transport=HttpTransport(idle_timeout=0.2))
+
+    client._generate_via_rest_api("Avant")
+    client._generate_via_rest_api("Avant, encore")
+    assert len(server.connections) == 1
+
+    time.sleep(0.3)
+    client._generate_via_rest_api("Après une pause")
+    assert len(server.connections) == 2
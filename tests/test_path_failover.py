@@ -0,0 +1,63 @@
+"""
+Repli entre chemins (SDK, REST) : bascule immédiate, nouvelles tentatives sur le dernier seulement
+"""
+import time
+
+from conftest import FakeSdkModel
+from src.errors import ServiceUnavailableError
+from src.path_health import OPEN
+from src.retry_policy import RetryPolicy
+
+def _unavailable():
+    return ServiceUnavailableError("SDK indisponible", status=503)
+
+def test_failing_sdk_falls_back_to_rest_without_retrying(mock_server, gemini_client):
+    server = mock_server()
+    sdk = FakeSdkModel(error=_unavailable())
+    client = gemini_client(server.base_url, sdk=sdk)
+
+    start = time.perf_counter()
+    assert client._generate("Question") == "Réponse simulée : Question"
+    assert time.perf_counter() - start < 0.5
+    assert sdk.calls == 1
+    assert server.request_count == 1
+
+def test_breaker_opens_after_threshold_failed_requests(mock_server, gemini_client):
+    server = mock_server()
+    sdk = FakeSdkModel(error=_unavailable())
+    client = gemini_client(server.base_url, sdk=sdk)
+    threshold = client.path_selector.breakers['sdk'].failure_threshold
+
+    for i in range(threshold):
+        client._generate(f"Question {i}")
+    assert client.path_selector.breakers['sdk'].state == OPEN
+
+    # Chemin désactivé : les requêtes suivantes vont directement en REST
+    client._generate("Encore")
+    assert sdk.calls == threshold
+    assert server.request_count == threshold + 1
+
+def test_last_path_keeps_retrying(mock_server, gemini_client):
+    server = mock_server(error_rate=1.0, error_status=503)
+    sdk = FakeSdkModel(error=_unavailable())
+    client = gemini_client(server.base_url, sdk=sdk,
+                           retry_policy=RetryPolicy(max_attempts=3, base_delay=0.01))
+
+    try:
+        client._generate("Question")
+    except ServiceUnavailableError:
+        pass
+    else:
+        raise AssertionError("Les deux chemins échouent : une erreur est attendue")
+    assert sdk.calls == 1
+    assert server.request_count == 3
+
+def test_stream_falls_back_to_rest_without_retrying(mock_server, gemini_client):
+    server = mock_server()
+    sdk = FakeSdkModel(error=_unavailable())
+    client = gemini_client(server.base_url, sdk=sdk)
+
+    start = time.perf_counter()
+    assert ''.join(client.generate_text_stream("Question")) == "Réponse simulée : Question"
+    assert time.perf_counter() - start < 0.5
+    assert sdk.calls == 1
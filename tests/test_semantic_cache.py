@@ -0,0 +1,50 @@
+"""
+Cache sémantique : reformulations acceptées, questions de sens différent refusées
+"""
+import pytest
+
+from src.semantic_cache import is_rewording
+
+np = pytest.importorskip('numpy')
+
+from src.semantic_cache import SemanticCache  # noqa: E402
+
+DIFFERENT_MEANING = [
+    ("Combien font 2+2 ?", "Combien font 2+3 ?"),
+    ("Écris une fonction qui trie une liste", "Écris une fonction qui ne trie pas une liste"),
+    ("Est-ce que le paracétamol est dangereux ?",
+     "Est-ce que le paracétamol est dangereux pour les enfants ?"),
+    ("Quel temps fait-il à Paris ?", "Quel temps fait-il à Paris demain ?"),
+    ("Quel temps fait-il à Paris demain ?", "Quel temps fait-il à Paris ?"),
+    ("Que s'est-il passé en 2024 ?", "Que s'est-il passé en 2025 ?"),
+    ("Comment utiliser asyncio avec Python ?", "Comment utiliser asyncio avec Kotlin ?"),
+    ("Is it safe to run this?", "Is it not safe to run this?"),
+]
+
+REWORDINGS = [
+    ("Comment utiliser asyncio avec Python ?", "comment utiliser asyncio avec python"),
+    ("Quelle est la différence entre TCP et UDP ?", "Quelle est la difference entre TCP et UDP ??"),
+    ("Quelle est la différence entre TCP et UDP ?", "Quelle est la différence entre TPC et UDP ?"),
+    ("Quelle est la différence entre TCP et UDP ?", "Bonjour, quelle est la différence entre TCP et UDP ?"),
+    ("Explique les décorateurs en Python.", "Dis-moi : explique les décorateurs en Python, stp."),
+]
+
+@pytest.mark.parametrize("stored, query", DIFFERENT_MEANING)
+def test_different_meaning_is_not_a_rewording(stored, query):
+    assert not is_rewording(query, stored)
+
+@pytest.mark.parametrize("stored, query", REWORDINGS)
+def test_close_variants_are_rewordings(stored, query):
+    assert is_rewording(query, stored)
+
+@pytest.mark.parametrize("stored, query", DIFFERENT_MEANING)
+def test_cache_misses_on_different_meaning(stored, query):
+    cache = SemanticCache()
+    cache.put(stored, 'ANS')
+    assert cache.get(query) is None
+
+@pytest.mark.parametrize("stored, query", REWORDINGS)
+def test_cache_hits_on_rewording(stored, query):
+    cache = SemanticCache()
+    cache.put(stored, 'ANS')
+    assert cache.get(query) == 'ANS'
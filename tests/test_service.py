@@ -0,0 +1,56 @@
+"""
+Service HTTP : une image base64 valide mais qui n'est pas une image est une
+erreur du client (400), jamais une erreur interne
+"""
+import asyncio
+import base64
+import io
+
+import pytest
+
+pytest.importorskip('aiohttp')
+PIL_Image = pytest.importorskip('PIL.Image')
+
+from aiohttp.test_utils import TestClient, TestServer  # noqa: E402
+
+from src.async_gemini_client import AsyncGeminiClient  # noqa: E402
+from src.service import OkitService  # noqa: E402
+
+NOT_AN_IMAGE = base64.b64encode(b"ceci n'est pas une image").decode()
+
+def _png():
+    buffer = io.BytesIO()
+    PIL_Image.new('RGB', (8, 8), 'red').save(buffer, format='PNG')
+    return base64.b64encode(buffer.getvalue()).decode()
+
+async def _post(base_url, path, body, session=False):
+    service = OkitService(AsyncGeminiClient(api_key='mock-key', base_url=base_url))
+    async with TestClient(TestServer(service.create_app())) as http:
+        if session:
+            response = await http.post('/v1/sessions')
+            path = path.format(session_id=(await response.json())['session_id'])
+        response = await http.post(path, json=body)
+        return response.status, await response.json()
+
+@pytest.mark.parametrize("path, body, session", [
+    ('/v1/generate', {'prompt': "Décris", 'image': NOT_AN_IMAGE}, False),
+    ('/v1/generate', {'prompt': "Décris", 'image': NOT_AN_IMAGE, 'stream': True}, False),
+    ('/v1/sessions/{session_id}/messages', {'message': "Décris", 'image': NOT_AN_IMAGE}, True),
+])
+def test_base64_that_is_not_an_image_is_a_bad_request(mock_server, path, body, session):
+    server = mock_server()
+
+    status, data = asyncio.run(_post(server.base_url, path, body, session))
+
+    assert status == 400
+    assert "Image illisible" in data['error']
+    assert server.request_count == 0
+
+def test_valid_image_is_sent_upstream(mock_server):
+    server = mock_server()
+
+    status, data = asyncio.run(_post(server.base_url, '/v1/generate', {'prompt': "Décris", 'image': _png()}))
+
+    assert status == 200
+    assert data['text'] == "Réponse simulée : Décris"
+    assert server.request_count == 1
@@ -0,0 +1,47 @@
+"""
+Lecture vocale en flux : une réponse annulée n'est jamais lue
+"""
+import threading
+import time
+
+from src.speech_output import FakeTTSBackend, SpeechPipeline
+
+class CancelBeforeSpeaking(FakeTTSBackend):
+    """cancel() reçu après la vérification de génération, avant le début de la phrase"""
+
+    def __init__(self):
+        super().__init__(chars_per_second=1000)
+        self.pipeline = None
+        self.called = threading.Event()
+
+    def speak(self, text, on_start=None):
+        canceller = threading.Thread(target=self.pipeline.cancel)
+        canceller.start()
+        canceller.join()
+        super().speak(text, on_start)
+        self.called.set()
+
+def test_cancel_between_check_and_speak_is_not_lost():
+    backend = CancelBeforeSpeaking()
+    pipeline = backend.pipeline = SpeechPipeline(backend)
+
+    pipeline.speak("Une phrase qui ne doit jamais être lue.")
+
+    assert backend.called.wait(2)
+    assert backend.spoken == []
+    pipeline.close()
+
+def test_reply_after_cancel_is_spoken():
+    backend = FakeTTSBackend(chars_per_second=1000)
+    pipeline = SpeechPipeline(backend)
+    pipeline.begin()
+    pipeline.feed("Première réponse, bientôt interrompue. ")
+    pipeline.cancel()
+
+    pipeline.speak("Seconde réponse, lue en entier.")
+
+    deadline = time.monotonic() + 2
+    while not backend.spoken and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert backend.spoken == ["Seconde réponse, lue en entier."]
+    pipeline.close()
@@ -0,0 +1,144 @@
+"""
+Capture vocale de bout en bout sur des fichiers WAV : WavFileSource,
+EnergyVAD et VoiceCapture découpent les énoncés comme sur le micro
+"""
+import math
+import struct
+import threading
+import wave
+
+from src.voice_capture import (SAMPLE_RATE, SAMPLE_WIDTH, EnergyVAD, VoiceCapture,
+                               WavFileSource)
+from src.voice_handler_android import VoiceHandlerAndroid
+
+def write_wav(path, segments, rate=SAMPLE_RATE):
+    """segments : (durée en s, amplitude) ; amplitude 0 pour un silence"""
+    frames = bytearray()
+    for duration, amplitude in segments:
+        for i in range(int(duration * rate)):
+            frames += struct.pack('<h', int(amplitude * math.sin(2 * math.pi * 440 * i / rate)))
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(rate)
+        wav.writeframes(bytes(frames))
+    return str(path)
+
+def run_capture(path, **kwargs):
+    """Capture synchrone d'un fichier ; retourne (transcriptions, durées des énoncés en s)"""
+    transcripts, durations = [], []
+
+    def transcribe(pcm, rate):
+        durations.append(len(pcm) / SAMPLE_WIDTH / rate)
+        return f"énoncé {len(durations)}"
+
+    capture = VoiceCapture(
+        WavFileSource(path), transcribe,
+        lambda text, is_final: transcripts.append((text, is_final)),
+        vad=EnergyVAD(),
+        submit=lambda fn, on_result: on_result(fn()),
+        **kwargs
+    ).start()
+    capture.join(5)
+    return transcripts, durations
+
+def test_silence_produces_no_utterance(tmp_path):
+    path = write_wav(tmp_path / 'silence.wav', [(1.0, 0)])
+
+    transcripts, _ = run_capture(path)
+
+    assert transcripts == []
+
+def test_speech_between_silences_is_one_utterance(tmp_path):
+    path = write_wav(tmp_path / 'phrase.wav', [(0.5, 0), (0.6, 8000), (1.0, 0)])
+
+    transcripts, durations = run_capture(path)
+
+    assert transcripts == [("énoncé 1", True)]
+    # Parole, préroll (0.3 s) et trames de silence de fin (0.6 s)
+    assert 0.6 <= durations[0] <= 1.6
+
+def test_two_phrases_are_split(tmp_path):
+    path = write_wav(tmp_path / 'deux.wav', [(0.3, 0), (0.5, 8000), (1.0, 0), (0.5, 8000), (1.0, 0)])
+
+    transcripts, _ = run_capture(path)
+
+    assert transcripts == [("énoncé 1", True), ("énoncé 2", True)]
+
+def test_utterance_is_capped_at_max_duration(tmp_path):
+    path = write_wav(tmp_path / 'long.wav', [(0.2, 0), (2.5, 8000), (0.2, 0)])
+
+    transcripts, durations = run_capture(path, max_utterance=1.0)
+
+    assert len(transcripts) >= 2
+    assert max(durations) <= 1.0 + 0.3 + 0.02
+
+def test_end_of_file_during_speech_flushes_utterance(tmp_path):
+    path = write_wav(tmp_path / 'coupe.wav', [(0.3, 0), (0.6, 8000)])
+
+    transcripts, _ = run_capture(path)
+
+    assert transcripts == [("énoncé 1", True)]
+
+class Transcriber:
+    def __init__(self):
+        self.done = threading.Event()
+
+    def transcribe(self, pcm, rate):
+        self.done.set()
+        return "bonjour"
+
+class DeniedWavSource(WavFileSource):
+    opened = False
+
+    def request_permission(self, on_result):
+        on_result(False)
+
+    def open(self):
+        DeniedWavSource.opened = True
+        super().open()
+
+def test_handler_listens_on_wav_source(tmp_path):
+    path = write_wav(tmp_path / 'phrase.wav', [(0.3, 0), (0.6, 8000), (1.0, 0)])
+    transcriber = Transcriber()
+    results = []
+    handler = VoiceHandlerAndroid(transcriber=transcriber, source_factory=lambda: WavFileSource(path),
+                                  partial_interval=None)
+
+    handler.start_listening(lambda text, is_final: results.append((text, is_final)))
+
+    assert transcriber.done.wait(5)
+    handler._capture.join(5)
+    assert results == [("bonjour", True)]
+    handler.stop_listening()
+
+def test_handler_refused_permission_never_opens_source(tmp_path):
+    path = write_wav(tmp_path / 'phrase.wav', [(0.6, 8000)])
+    denied = []
+    handler = VoiceHandlerAndroid(transcriber=Transcriber(), source_factory=lambda: DeniedWavSource(path))
+
+    handler.start_listening(lambda text, is_final: None, on_denied=lambda: denied.append(True))
+
+    assert denied == [True]
+    assert not handler.is_listening
+    assert handler._capture is None
+    assert not DeniedWavSource.opened
+
+def test_stale_permission_answer_is_ignored(tmp_path):
+    path = write_wav(tmp_path / 'phrase.wav', [(0.6, 8000)])
+    answers = []
+
+    class PendingSource(WavFileSource):
+        def request_permission(self, on_result):
+            answers.append(on_result)
+
+    denied = []
+    handler = VoiceHandlerAndroid(transcriber=Transcriber(), source_factory=lambda: PendingSource(path))
+    handler.start_listening(lambda text, is_final: None, on_denied=lambda: denied.append(True))
+    # L'utilisateur coupe le micro avant de répondre à la demande
+    handler.stop_listening()
+
+    answers[0](False)
+
+    assert denied == []
+    assert handler._capture is None